@@ -0,0 +1,149 @@
+from storage import participant_group
+
+# running totals of the reverse-scored ratings for the live statistics panel
+#
+#   aggregates = RunningAggregates.from_responses(responses, config_data)
+#   aggregates.replace(old_response, new_response)    # after a save
+#   aggregates.remove(response)                       # after a delete
+#   aggregates.group_summary(), aggregates.item_summary()
+#
+# per group and per item a (count, sum, sum of squares) triple, plus per group the same triple
+# over participant scores (mean of the answered items, like stats.participant_scores). an update
+# costs one pass over the items of the changed response, whatever the size of the study. entries
+# without a participant number (the blank form) are not counted. pure python, so the main window
+# can show it before numpy is loaded.
+
+
+# stored rating as a number, the same values ratings.parse_rating accepts; None when missing
+def _rating_value(raw_val):
+    if isinstance(raw_val, int):
+        return raw_val
+    if isinstance(raw_val, str) and raw_val.isdigit():
+        return int(raw_val)
+    return None
+
+
+# mean and sample variance of a (count, sum, sum of squares) triple
+def _moments(count, total, total_sq):
+    if not count:
+        return None, None
+    mean = total / count
+    if count < 2:
+        return mean, None
+    # cancellation can leave a tiny negative number for constant values
+    return mean, max(0.0, (total_sq - total * total / count) / (count - 1))
+
+
+def _add(triple, value, sign):
+    triple[0] += sign
+    triple[1] += sign * value
+    triple[2] += sign * value * value
+
+
+class RunningAggregates:
+    def __init__(self, config_data):
+        self.scoring = self.scoring_of(config_data)
+        _, self.end_val, negative = self.scoring
+        self.negative = list(negative)
+        self.keys = [f"rating_{i}" for i in range(1, len(self.negative) + 1)]
+        # label -> {"participants", "complete", "score": triple, "items": [triple per item]}
+        self.groups = {}
+        # triple per item over all groups
+        self.items = [[0, 0.0, 0.0] for _ in self.keys]
+
+    @classmethod
+    def from_responses(cls, responses, config_data):
+        aggregates = cls(config_data)
+        for response in responses:
+            aggregates.add(response)
+        return aggregates
+
+    # the config values the totals depend on; a config with other values needs a rebuild
+    @staticmethod
+    def scoring_of(config_data):
+        rating_settings = config_data.get("rating_settings", {})
+        start_val, end_val = rating_settings.get("default_rating_range", [1, 5])
+        negative = tuple(bool(q.get("is_negative", False)) for q in rating_settings.get("questions", []))
+        return start_val, end_val, negative
+
+    def matches(self, config_data):
+        return self.scoring == self.scoring_of(config_data)
+
+    def add(self, response):
+        self._apply(response, 1)
+
+    def remove(self, response):
+        self._apply(response, -1)
+
+    def replace(self, old, new):
+        self._apply(old, -1)
+        self._apply(new, 1)
+
+    def _apply(self, response, sign):
+        participant_number = response.get("participant_number", "")
+        if not participant_number:
+            return
+        label = participant_group(participant_number)
+        group = self.groups.get(label)
+        if group is None:
+            group = {"participants": 0, "complete": 0, "score": [0, 0.0, 0.0], "items": [[0, 0.0, 0.0] for _ in self.keys]}
+            self.groups[label] = group
+        rating_data = response.get("ratings", {})
+        answered = 0
+        total = 0
+        for i, key in enumerate(self.keys):
+            value = _rating_value(rating_data.get(key, ""))
+            if value is None:
+                continue
+            if self.negative[i]:
+                value = self.end_val + 1 - value
+            _add(group["items"][i], value, sign)
+            _add(self.items[i], value, sign)
+            answered += 1
+            total += value
+        group["participants"] += sign
+        if answered == len(self.keys):
+            group["complete"] += sign
+        if answered:
+            _add(group["score"], total / answered, sign)
+        if not group["participants"]:
+            # start from exact zeros the next time the group appears
+            del self.groups[label]
+
+    # per group, sorted by label: participants, complete (every item answered), and the mean and
+    # variance of participant scores
+    def group_summary(self):
+        summary = []
+        for label in sorted(self.groups):
+            group = self.groups[label]
+            mean, variance = _moments(*group["score"])
+            summary.append({
+                "group": label,
+                "participants": group["participants"],
+                "complete": group["complete"],
+                "n": group["score"][0],
+                "mean": mean,
+                "variance": variance,
+            })
+        return summary
+
+    # the same over every group
+    def total_summary(self):
+        score = [sum(group["score"][i] for group in self.groups.values()) for i in range(3)]
+        mean, variance = _moments(*score)
+        return {
+            "group": "all",
+            "participants": sum(group["participants"] for group in self.groups.values()),
+            "complete": sum(group["complete"] for group in self.groups.values()),
+            "n": score[0],
+            "mean": mean,
+            "variance": variance,
+        }
+
+    # per item over every group: answered count, mean and variance of the scored ratings
+    def item_summary(self):
+        summary = []
+        for key, triple in zip(self.keys, self.items):
+            mean, variance = _moments(*triple)
+            summary.append({"item": key, "n": triple[0], "mean": mean, "variance": variance})
+        return summary
@@ -0,0 +1,84 @@
+import json
+import os
+import threading
+
+from storage import write_json_atomic
+
+# crash protection for the form in progress
+#
+# the app hands the current form state to submit() (debounced on widget changes); a single
+# writer thread writes only the latest state, so a burst of edits becomes one write, and
+# every write goes through a temp file + fsync + rename. submit() and discard() never block
+# on disk, they only swap the pending state and wake the writer.
+
+# pending value telling the writer to remove the draft file
+_DISCARD = object()
+
+
+# index of the stored entry a draft was editing, or None when it was a new entry or that entry is
+# gone. drafts name the entry by its stored participant number: positions are not stable across
+# a reload (the sharded store reads back grouped by shard)
+def draft_target(draft, store, responses):
+    participant_number = draft.get("stored_participant")
+    if not participant_number:
+        return None
+    return store.find(participant_number, responses)
+
+
+class AutosaveWriter:
+    def __init__(self, path, instrumentation=None):
+        self.path = path
+        self.instrumentation = instrumentation
+        self.condition = threading.Condition()
+        self.pending = None
+        self.closed = False
+        self.error = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    # draft left behind by a previous session, or None
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    # replace whatever is waiting to be written with the latest draft
+    def submit(self, draft):
+        with self.condition:
+            self.pending = draft
+            self.condition.notify()
+
+    # the form was saved or abandoned: drop pending writes and remove the draft file
+    def discard(self):
+        self.submit(_DISCARD)
+
+    # write what is pending and stop the writer thread
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.closed:
+                    self.condition.wait()
+                if self.pending is None:
+                    return
+                draft, self.pending = self.pending, None
+            try:
+                if draft is _DISCARD:
+                    if os.path.exists(self.path):
+                        os.remove(self.path)
+                elif self.instrumentation is not None:
+                    with self.instrumentation.timed("autosave", items=1):
+                        write_json_atomic(self.path, draft)
+                else:
+                    write_json_atomic(self.path, draft)
+                self.error = None
+            except OSError as e:
+                # shown in the app's status line (check_writers), the next submit retries
+                self.error = e
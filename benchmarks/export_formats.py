@@ -0,0 +1,54 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from export import export_file  # noqa: E402
+from synthetic import make_config, make_responses  # noqa: E402
+
+# write and read back time plus file size of every export format
+#
+#   python benchmarks/export_formats.py [--count N]
+
+
+def read_back(path):
+    import pandas as pd
+    if path.endswith(".csv"):
+        return pd.read_csv(path)
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    if path.endswith(".feather"):
+        return pd.read_feather(path)
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def main():
+    count = 100_000
+    if "--count" in sys.argv:
+        count = int(sys.argv[sys.argv.index("--count") + 1])
+    config_data = make_config()
+    responses = make_responses(config_data, count)
+    print(f"{count} responses")
+    print(f"{'format':10s} {'write s':>9s} {'load s':>9s} {'size MB':>9s}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for ext in ("csv", "parquet", "feather", "txt"):
+            path = os.path.join(tmp_dir, f"responses.{ext}")
+            start = time.perf_counter()
+            try:
+                export_file(path, responses, config_data)
+            except ImportError as e:
+                print(f"{ext:10s} skipped ({e})")
+                continue
+            write_time = time.perf_counter() - start
+            start = time.perf_counter()
+            read_back(path)
+            load_time = time.perf_counter() - start
+            size = os.path.getsize(path) / 1e6
+            print(f"{ext:10s} {write_time:9.3f} {load_time:9.3f} {size:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from unittest import mock
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import matplotlib  # noqa: E402
+matplotlib.use("Agg")
+
+import main  # noqa: E402
+from export import export_file  # noqa: E402
+from figure_cache import FigureCache, close_figure  # noqa: E402
+from instrument import Instrumentation  # noqa: E402
+from storage import make_store, participant_group  # noqa: E402
+from synthetic import make_config, make_responses  # noqa: E402
+
+# benchmark suite for the app's data paths on synthetic studies, headless (Agg, Tk mocked)
+#
+#   python benchmarks/run.py --sizes 100 1000 10000 100000
+#   python benchmarks/run.py --sizes 1000000 --paths load save_edit save_new combobox --backend journal
+#   python benchmarks/run.py --compare benchmarks/results/old.json benchmarks/results/new.json
+#
+# results go to benchmarks/results/<timestamp>.json: one record per (size, path) with the
+# wall time and the tracemalloc peak, plus enough metadata to compare runs across versions.
+# the save paths time the single-row store.put the app's Save button uses: save_edit on an
+# existing entry, save_new on an entry appended at the end.
+
+RESULTS_DIR = os.path.join(REPO_DIR, "benchmarks", "results")
+PATHS = ["load", "save_edit", "save_new", "combobox", "visualize_open", "visualize_render", "export_csv", "export_parquet"]
+
+
+# a QuestionnaireApp with its data attributes set up but no tk window behind it
+def make_headless_app(config_data, study_dir):
+    app = main.QuestionnaireApp.__new__(main.QuestionnaireApp)
+    app.config_data = config_data
+    app.instrumentation = Instrumentation()
+    app.store = make_store(config_data, os.path.join(study_dir, main.RESPONSES_FILENAME))
+    app.responses = []
+    app.current_index = 0
+    app.loading = False
+    app.load_error = None
+    app.rating_matrix = None
+    app.answer_index = None
+    app.aggregates = None
+    app.search_refresh = None
+    app.sidecar_writer = None
+    app.sidecar_arrays = None
+    app.figure_cache = FigureCache.from_config(config_data)
+    app.sandbox = None
+    app.participant_combobox = mock.MagicMock()
+    app.get_sandbox = mock.MagicMock()
+    return app
+
+
+def render_standard_plots(app):
+    from plots import build_box_plot, build_heatmap, render_png
+    matrix = app.get_rating_matrix().copy()
+    for fig in (build_box_plot(matrix), build_heatmap(matrix, "viridis")):
+        render_png(fig)
+        close_figure(fig)
+
+
+# path name -> callable timing one operation on a loaded app
+def path_runners(app, study_dir):
+    def visualize_open():
+        with mock.patch.object(main, "tk"), mock.patch.object(main, "ttk"), \
+                mock.patch.object(main, "messagebox"):
+            app.open_visualization_options()
+
+    def visualize_render():
+        app.rating_matrix = None
+        render_standard_plots(app)
+
+    def save_edit():
+        index = len(app.responses) // 2
+        app.store.put(index, app.responses[index], app.responses)
+
+    def save_new():
+        # a new participant of an existing group, so the sharded store rewrites one existing shard
+        last = app.responses[-1]
+        response = dict(last, participant_number=f"{participant_group(last['participant_number'])}{10 ** 9 + len(app.responses)}")
+        app.responses.append(response)
+        app.store.put(len(app.responses) - 1, response, app.responses)
+
+    return {
+        "load": lambda: setattr(app, "responses", app.store.load()),
+        "save_edit": save_edit,
+        "save_new": save_new,
+        "combobox": app.update_participant_combobox,
+        "visualize_open": visualize_open,
+        "visualize_render": visualize_render,
+        "export_csv": lambda: export_file(os.path.join(study_dir, "out.csv"), app.responses, app.config_data),
+        "export_parquet": lambda: export_file(os.path.join(study_dir, "out.parquet"), app.responses, app.config_data),
+    }
+
+
+def measure(run, with_memory):
+    gc.collect()
+    start = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - start
+    peak_mb = None
+    if with_memory:
+        gc.collect()
+        tracemalloc.start()
+        run()
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    return seconds, peak_mb
+
+
+def run_size(size, args):
+    config_data = make_config(args.ratings, args.open)
+    config_data["storage_settings"] = {"backend": args.backend}
+    responses = make_responses(config_data, size, num_groups=args.groups)
+    records = []
+    with tempfile.TemporaryDirectory() as study_dir:
+        app = make_headless_app(config_data, study_dir)
+        app.store.save(responses)
+        app.store.close()
+        app.store = make_store(config_data, os.path.join(study_dir, main.RESPONSES_FILENAME))
+        runners = path_runners(app, study_dir)
+        # load first so every later path works on the stored data
+        for path in ["load"] + [p for p in args.paths if p != "load"]:
+            try:
+                seconds, peak_mb = measure(runners[path], not args.no_memory)
+            except ImportError as e:
+                print(f"{size:>9d} {path:18s} skipped ({e})")
+                continue
+            if path not in args.paths:
+                continue
+            records.append({"size": size, "path": path, "seconds": seconds, "peak_mb": peak_mb})
+            peak = f"{peak_mb:10.1f}" if peak_mb is not None else f"{'-':>10s}"
+            print(f"{size:>9d} {path:18s} {seconds:10.4f} {peak}")
+        app.store.close()
+    return records
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"], cwd=REPO_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save_results(records, args):
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = args.out or os.path.join(RESULTS_DIR, f"{timestamp}.json")
+    with open(path, "w") as f:
+        json.dump({
+            "meta": {
+                "revision": git_revision(),
+                "timestamp": timestamp,
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "backend": args.backend,
+                "ratings": args.ratings,
+                "open": args.open,
+                "groups": args.groups,
+            },
+            "results": records
+        }, f, indent=2)
+    return path
+
+
+# print new/old time ratios per (size, path); exit code 1 when any exceeds the threshold
+def compare(old_path, new_path, threshold):
+    with open(old_path, "r") as f:
+        old = {(r["size"], r["path"]): r for r in json.load(f)["results"]}
+    with open(new_path, "r") as f:
+        new = {(r["size"], r["path"]): r for r in json.load(f)["results"]}
+    regressions = 0
+    print(f"{'size':>9s} {'path':18s} {'old s':>10s} {'new s':>10s} {'ratio':>7s}")
+    for key in sorted(old.keys() & new.keys()):
+        ratio = new[key]["seconds"] / old[key]["seconds"] if old[key]["seconds"] else float("inf")
+        flag = ""
+        if ratio > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{key[0]:>9d} {key[1]:18s} {old[key]['seconds']:10.4f} {new[key]['seconds']:10.4f} {ratio:7.2f}{flag}")
+    return 1 if regressions else 0
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="benchmark load/save/navigate/visualize/export on synthetic data")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--paths", nargs="+", choices=PATHS, default=PATHS)
+    parser.add_argument("--ratings", type=int, default=10, help="rating questions per response")
+    parser.add_argument("--open", type=int, default=3, help="open questions per response")
+    parser.add_argument("--groups", type=int, default=4, help="participant groups")
+    parser.add_argument("--backend", choices=["json", "journal", "sqlite", "sharded"], default="json")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak memory pass")
+    parser.add_argument("--out", help="results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two results files")
+    parser.add_argument("--threshold", type=float, default=1.25, help="ratio reported as regression")
+    args = parser.parse_args(argv)
+    if args.compare:
+        return compare(args.compare[0], args.compare[1], args.threshold)
+    print(f"{'size':>9s} {'path':18s} {'seconds':>10s} {'peak MB':>10s}")
+    records = []
+    for size in args.sizes:
+        records += run_size(size, args)
+    print(f"results written to {save_results(records, args)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,44 @@
+import os
+import subprocess
+import sys
+import time
+
+# measures how long it takes before the data-entry form can be built: importing main.py,
+# compared with importing it while the scientific stack is loaded eagerly (the old behaviour)
+#
+#   python benchmarks/startup.py [--runs N]
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    "deferred (import main)": "import main",
+    "eager (main + numpy/pandas/matplotlib)": (
+        "import main, numpy, pandas, matplotlib.pyplot, matplotlib.backends.backend_tkagg, plots, ratings"
+    ),
+}
+
+
+# wall time of a fresh interpreter running `statement`, in seconds
+def time_import(statement):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", statement], cwd=REPO_DIR, check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    runs = 5
+    if "--runs" in sys.argv:
+        runs = int(sys.argv[sys.argv.index("--runs") + 1])
+    # first run warms the os file cache and the .pyc files
+    time_import(SCENARIOS["eager (main + numpy/pandas/matplotlib)"])
+    results = {}
+    for name, statement in SCENARIOS.items():
+        timings = sorted(time_import(statement) for _ in range(runs))
+        results[name] = timings[len(timings) // 2]
+        print(f"{name:42s} median {results[name] * 1000:8.1f} ms over {runs} runs")
+    deferred, eager = results.values()
+    print(f"{'saved at startup':42s}        {(eager - deferred) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import random
+import string
+
+# synthetic studies that follow the config.json schema, for benchmarks
+#
+#   config = make_config(num_ratings=10, num_open=3)
+#   responses = make_responses(config, 100_000, num_groups=4)
+
+WORDS = (
+    "installation light sound interaction confusing engaging clear slow fast colour screen touch "
+    "movement guidance experience memorable unclear intuitive boring fun responsive feedback"
+).split()
+
+
+def make_config(num_ratings=10, num_open=3, rating_range=(1, 10)):
+    return {
+        "app_settings": {
+            "window_title": "Synthetic Questionnaire",
+            "window_size": "600x1000"
+        },
+        "rating_settings": {
+            "questions": [
+                {"statement": f"Synthetic statement {i}.", "is_negative": i % 3 == 0}
+                for i in range(1, num_ratings + 1)
+            ],
+            "default_rating_range": list(rating_range),
+            "force_ratings": False
+        },
+        "open_questions_settings": {
+            "questions": [f"Synthetic open question {i}?" for i in range(1, num_open + 1)]
+        },
+        "visualization_settings": {
+            "plot_defaults": {
+                "heatmap_colormap": "viridis"
+            }
+        }
+    }
+
+
+# participants a1, b1, ... a2, b2, ... with ~2% skipped ratings and short free-text answers
+def make_responses(config_data, count, num_groups=4, seed=0, words_per_answer=12):
+    rng = random.Random(seed)
+    rating_settings = config_data["rating_settings"]
+    start_val, end_val = rating_settings["default_rating_range"]
+    num_ratings = len(rating_settings["questions"])
+    num_open = len(config_data["open_questions_settings"]["questions"])
+    groups = string.ascii_lowercase[:num_groups]
+    responses = []
+    for n in range(count):
+        ratings = {}
+        for i in range(1, num_ratings + 1):
+            ratings[f"rating_{i}"] = "" if rng.random() < 0.02 else rng.randint(start_val, end_val)
+        open_answers = {
+            f"open_{i}": " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, words_per_answer)))
+            for i in range(1, num_open + 1)
+        }
+        responses.append({
+            "participant_number": f"{groups[n % num_groups]}{n // num_groups + 1}",
+            "ratings": ratings,
+            "open_answers": open_answers
+        })
+    return responses
@@ -0,0 +1,348 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+
+from export import export_file
+from storage import CONFIG_FILENAME, RESPONSES_FILENAME, make_store, read_config
+
+# headless entry point: export responses and render plots without opening the tk app
+#
+#   python cli.py export --study DIR --out responses.csv
+#   python cli.py plot --study DIR --out-dir plots --formats png pdf --script my_plot.py
+#   python cli.py plot --study DIR --out-dir report --formats png pdf --all --jobs 4
+#   python cli.py batch DIR [DIR ...] --jobs 4
+#   python cli.py export --study DIR --out group_a.csv --groups a
+#   python cli.py keywords --study DIR --out keywords.csv
+#   python cli.py stats --study DIR --resamples 10000 --json stats.json
+#   python cli.py import --study DIR paper_forms.csv --errors paper_forms.errors.csv
+#   python cli.py sidecar --study DIR
+#   python cli.py merge station1.json station2.json --out merged.json --state merge_state.json
+
+STANDARD_PLOTS = ["boxplot", "heatmap"]
+
+
+def study_config(study_dir):
+    config_path = os.path.join(study_dir, CONFIG_FILENAME)
+    if not os.path.isfile(config_path):
+        raise FileNotFoundError(f"configuration file '{config_path}' not found. create one in settings.")
+    return read_config(config_path)
+
+
+# config and responses of one study directory, loaded the same way the app does
+# groups limits the responses to those participant groups (sharded storage reads only their files)
+def load_study(study_dir, groups=None):
+    config_data = study_config(study_dir)
+    store = make_store(config_data, os.path.join(study_dir, RESPONSES_FILENAME))
+    try:
+        responses = store.load_groups(groups) if groups else store.load()
+    finally:
+        store.close()
+    return config_data, responses
+
+
+# config and ratings matrix of one study; the matrix memory-maps the ratings sidecar when it is
+# current (storage_settings.ratings_sidecar), otherwise it is built from the responses
+def load_ratings(study_dir, groups=None):
+    from ratings import RatingMatrix
+    from sidecar import has_blank_rows, open_sidecar
+
+    config_data = study_config(study_dir)
+    responses_path = os.path.join(study_dir, RESPONSES_FILENAME)
+    store = make_store(config_data, responses_path)
+    try:
+        # a pending backend switch changes the store files the sidecar is checked against
+        store.hand_over()
+        num_ratings = len(config_data.get("rating_settings", {}).get("questions", []))
+        arrays = open_sidecar(responses_path, store, [f"rating_{i}" for i in range(1, num_ratings + 1)])
+        if arrays is None or has_blank_rows(arrays):
+            responses = store.load_groups(groups) if groups else store.load()
+            return config_data, RatingMatrix.from_responses(responses, config_data)
+    finally:
+        store.close()
+    ratings, group_codes, participants, meta = arrays
+    matrix = RatingMatrix.from_arrays(config_data, ratings, group_codes, participants, meta["group_labels"])
+    if groups:
+        wanted = [code for code, label in enumerate(matrix.group_labels) if label in groups]
+        matrix = matrix.select(np.isin(matrix.groups(), wanted))
+    return config_data, matrix
+
+
+# (re)write the ratings sidecar of a study from its responses
+def write_study_sidecar(study_dir):
+    from ratings import RatingMatrix
+    from sidecar import data_stamp, sidecar_paths, write_sidecar
+
+    config_data = study_config(study_dir)
+    responses_path = os.path.join(study_dir, RESPONSES_FILENAME)
+    store = make_store(config_data, responses_path)
+    try:
+        matrix = RatingMatrix.from_responses(store.load(), config_data)
+    finally:
+        # closing can still touch the store files (journal compaction), stamp them afterwards
+        store.close()
+    write_sidecar(responses_path, matrix, data_stamp(store))
+    return list(sidecar_paths(responses_path).values())
+
+
+def export_study(study_dir, out_path, groups=None):
+    config_data, responses = load_study(study_dir, groups)
+    export_file(out_path, responses, config_data)
+    return [out_path]
+
+
+# render the standard plots and any custom plot scripts to out_dir, returns the written paths
+def render_study(study_dir, out_dir, plots=STANDARD_PLOTS, formats=("png",), scripts=(), groups=None):
+    from figure_cache import close_figure
+    from plots import build_box_plot, build_heatmap
+    from ratings import RatingMatrix
+    from sandbox import run_script
+
+    if scripts:
+        # custom scripts get the responses, so those have to be loaded anyway
+        config_data, responses = load_study(study_dir, groups)
+        matrix = RatingMatrix.from_responses(responses, config_data)
+    else:
+        config_data, matrix = load_ratings(study_dir, groups)
+    if not matrix.size:
+        return []
+    os.makedirs(out_dir, exist_ok=True)
+    colormap = config_data.get("visualization_settings", {}).get("plot_defaults", {}).get("heatmap_colormap", "viridis")
+    figures = []
+    if "boxplot" in plots:
+        figures.append(("boxplot", build_box_plot(matrix)))
+    if "heatmap" in plots:
+        figures.append(("heatmap", build_heatmap(matrix, colormap)))
+    for script_path in scripts:
+        with open(script_path, "r", encoding="utf-8") as f:
+            code = f.read()
+        fig = run_script(code, {"responses": responses, "config": config_data, "matrix": matrix})
+        figures.append((os.path.splitext(os.path.basename(script_path))[0], fig))
+    written = []
+    for name, fig in figures:
+        for fmt in formats:
+            path = os.path.join(out_dir, f"{name}.{fmt}")
+            fig.savefig(path)
+            written.append(path)
+        close_figure(fig)
+    return written
+
+
+# keyword counts per keyword, open question and group as csv
+def keywords_study(study_dir, out_path, groups=None):
+    from export import write_keyword_csv
+    from keywords import count_keywords
+
+    config_data, responses = load_study(study_dir, groups)
+    write_keyword_csv(out_path, count_keywords(responses, config_data))
+    return [out_path]
+
+
+# every plot including per-group and per-item variants, rendered in a process pool; plots whose
+# data and settings did not change since the last run into out_dir are skipped
+def render_all(study_dir, out_dir, formats=("png",), groups=None, jobs=None):
+    from plot_export import save_all_plots
+    from ratings import RatingMatrix
+
+    config_data = study_config(study_dir)
+    counts = None
+    if config_data.get("keyword_settings", {}).get("keywords"):
+        # keyword counts need the open answers, so the responses have to be loaded anyway
+        from keywords import count_keywords
+        config_data, responses = load_study(study_dir, groups)
+        matrix = RatingMatrix.from_responses(responses, config_data)
+        counts = count_keywords(responses, config_data)
+    else:
+        config_data, matrix = load_ratings(study_dir, groups)
+    if not matrix.size:
+        return []
+    colormap = config_data.get("visualization_settings", {}).get("plot_defaults", {}).get("heatmap_colormap", "viridis")
+    written, skipped = save_all_plots(matrix, out_dir, formats, colormap, counts, jobs)
+    if skipped:
+        print(f"{len(skipped)} unchanged plots skipped", file=sys.stderr)
+    return written
+
+
+# statistics report printed as text, optionally also saved as json
+def stats_study(study_dir, resamples, seed=None, json_path=None, groups=None):
+    from stats import compute_statistics, format_report
+
+    config_data, matrix = load_ratings(study_dir, groups)
+    report = compute_statistics(matrix, resamples, seed=seed)
+    print(format_report(report))
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(report, f, indent=2)
+        return [json_path]
+    return []
+
+
+# validate a csv in the export layout and append the valid rows to the study in one batch
+def import_study(study_dir, csv_path, error_path=None):
+    from csv_import import read_csv
+
+    config_data = study_config(study_dir)
+    store = make_store(config_data, os.path.join(study_dir, RESPONSES_FILENAME))
+    try:
+        responses = store.load()
+        existing = {resp.get("participant_number", "") for resp in responses}
+        valid, report = read_csv(csv_path, config_data, existing, error_path=error_path)
+        if valid:
+            responses.extend(valid)
+            store.extend(responses)
+    finally:
+        store.close()
+    for row, _, error in report["error_rows"]:
+        print(f"row {row}: {error}", file=sys.stderr)
+    if report["errors"] > len(report["error_rows"]):
+        print(f"... {report['errors'] - len(report['error_rows'])} more errors", file=sys.stderr)
+    print(f"{report['imported']} of {report['rows']} rows imported, {report['errors']} with errors")
+    return [error_path] if error_path and report["errors"] else []
+
+
+# export plus plots for one study, used as a process pool task by batch mode
+def process_study(study_dir, out_dir, export_format, plots, formats, scripts):
+    out_dir = out_dir or os.path.join(study_dir, "exports")
+    os.makedirs(out_dir, exist_ok=True)
+    written = export_study(study_dir, os.path.join(out_dir, f"responses.{export_format}"))
+    written += render_study(study_dir, out_dir, plots, formats, scripts)
+    return written
+
+
+def batch(study_dirs, out_root, export_format, plots, formats, scripts, jobs):
+    failures = 0
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {}
+        for study_dir in study_dirs:
+            out_dir = os.path.join(out_root, os.path.basename(os.path.normpath(study_dir))) if out_root else None
+            futures[study_dir] = pool.submit(process_study, study_dir, out_dir, export_format, plots, formats, scripts)
+        for study_dir, future in futures.items():
+            try:
+                for path in future.result():
+                    print(path)
+            except Exception as e:
+                failures += 1
+                print(f"error: {study_dir}: {e}", file=sys.stderr)
+    return failures
+
+
+# merge station files and print a summary, conflicting participants are listed with their sources
+def merge_stations(paths, out_path, state_path, on_conflict):
+    from merge import merge_files
+
+    report = merge_files(paths, out_path, state_path, on_conflict)
+    print(f"{report['participants']} participants from {report['records']} records "
+          f"({report['files_parsed']} files parsed, {report['files_unchanged']} unchanged, "
+          f"{report['duplicates']} duplicates, {report['unnamed']} without participant number)")
+    for pn, versions in report["conflicts"].items():
+        sources = "; ".join(", ".join(version["sources"]) for version in versions)
+        print(f"conflict: {pn}: {len(versions)} versions ({sources})", file=sys.stderr)
+    return [out_path]
+
+
+# argparse type for counts that must be at least 1
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="headless export and plot rendering for questionnaire studies")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="export responses to csv, parquet, feather or txt")
+    export_parser.add_argument("--study", default=".", help="study directory with config.json (default: .)")
+    export_parser.add_argument("--out", required=True, help="output file, .csv, .parquet, .feather or .txt")
+    export_parser.add_argument("--groups", nargs="+", help="only these participant groups, e.g. a b")
+
+    def add_plot_arguments(sub):
+        sub.add_argument("--plots", nargs="*", choices=STANDARD_PLOTS, default=STANDARD_PLOTS,
+                         help="standard plots to render (default: all)")
+        sub.add_argument("--formats", nargs="+", default=["png"], help="file formats, e.g. png pdf")
+        sub.add_argument("--script", action="append", default=[], dest="scripts",
+                         help="saved custom plot script (must assign 'fig'), may be repeated")
+
+    keywords_parser = subparsers.add_parser("keywords", help="count the keyword_settings keywords in the open answers")
+    keywords_parser.add_argument("--study", default=".", help="study directory with config.json (default: .)")
+    keywords_parser.add_argument("--out", required=True, help="output csv file")
+    keywords_parser.add_argument("--groups", nargs="+", help="only these participant groups, e.g. a b")
+
+    import_parser = subparsers.add_parser("import", help="import responses from a csv in the export layout")
+    import_parser.add_argument("csv", help="csv file with the export columns")
+    import_parser.add_argument("--study", default=".", help="study directory with config.json (default: .)")
+    import_parser.add_argument("--errors", dest="error_path", help="write rejected rows and reasons to this csv")
+
+    sidecar_parser = subparsers.add_parser("sidecar", help="write the memory-mapped ratings snapshot of a study")
+    sidecar_parser.add_argument("--study", default=".", help="study directory with config.json (default: .)")
+
+    stats_parser = subparsers.add_parser("stats", help="descriptives, reliability and bootstrap group differences")
+    stats_parser.add_argument("--study", default=".", help="study directory with config.json (default: .)")
+    stats_parser.add_argument("--resamples", type=positive_int, default=10000, help="bootstrap resamples (default: 10000)")
+    stats_parser.add_argument("--seed", type=int, help="random seed for reproducible intervals")
+    stats_parser.add_argument("--json", dest="json_path", help="also write the report as json")
+    stats_parser.add_argument("--groups", nargs="+", help="only these participant groups, e.g. a b")
+
+    plot_parser = subparsers.add_parser("plot", help="render plots to image files")
+    plot_parser.add_argument("--study", default=".", help="study directory with config.json (default: .)")
+    plot_parser.add_argument("--out-dir", required=True, help="directory for the rendered plots")
+    plot_parser.add_argument("--groups", nargs="+", help="only these participant groups, e.g. a b")
+    plot_parser.add_argument("--all", action="store_true",
+                             help="every plot incl. per-group heatmaps and per-item box plots, skipping unchanged ones")
+    plot_parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="parallel processes for --all")
+    add_plot_arguments(plot_parser)
+
+    batch_parser = subparsers.add_parser("batch", help="export and plot many study directories in parallel")
+    batch_parser.add_argument("studies", nargs="+", help="study directories")
+    batch_parser.add_argument("--out-root", help="write each study to OUT_ROOT/<study name> (default: <study>/exports)")
+    batch_parser.add_argument("--export-format", choices=["csv", "parquet", "feather", "txt"], default="csv")
+    batch_parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="parallel processes (default: all cores)")
+    add_plot_arguments(batch_parser)
+
+    merge_parser = subparsers.add_parser("merge", help="merge the response files of several stations")
+    merge_parser.add_argument("files", nargs="+", help="questionnaire_responses.json of each station")
+    merge_parser.add_argument("--out", required=True, help="merged responses file")
+    merge_parser.add_argument("--state", help="state file; unchanged inputs are skipped on the next merge")
+    merge_parser.add_argument("--on-conflict", choices=["skip", "first", "last"], default="skip",
+                              help="participants with differing records: leave out, or keep the first/last version")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        if args.command == "export":
+            written = export_study(args.study, args.out, args.groups)
+        elif args.command == "keywords":
+            written = keywords_study(args.study, args.out, args.groups)
+        elif args.command == "import":
+            written = import_study(args.study, args.csv, args.error_path)
+        elif args.command == "sidecar":
+            written = write_study_sidecar(args.study)
+        elif args.command == "stats":
+            written = stats_study(args.study, args.resamples, args.seed, args.json_path, args.groups)
+        elif args.command == "merge":
+            written = merge_stations(args.files, args.out, args.state, args.on_conflict)
+        elif args.command == "plot" and args.all:
+            written = render_all(args.study, args.out_dir, args.formats, args.groups, args.jobs)
+        elif args.command == "plot":
+            written = render_study(args.study, args.out_dir, args.plots, args.formats, args.scripts, args.groups)
+        else:
+            return 1 if batch(args.studies, args.out_root, args.export_format, args.plots,
+                              args.formats, args.scripts, args.jobs) else 0
+    except Exception as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    for path in written:
+        print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+
+# picks up config.json changes (settings app saves) while the main app runs
+#
+#   watcher = ConfigWatcher(CONFIG_FILENAME)
+#   new_config = watcher.poll()           # from a tk after() loop, None while nothing changed
+#   changes = diff_config(old, new_config)
+#
+# a poll is one os.stat; the file is only read when its size or mtime moved, and only handed back
+# when its content hash differs from the last config returned. diff_config names what changed, so
+# the app can update just the affected widgets and cached plots.
+
+CONFIG_POLL_MS = 1000
+
+# settings that are only read at startup: (section, key), key None for the whole section
+RESTART_SETTINGS = [
+    ("storage_settings", "backend"),
+    ("storage_settings", "compact_every"),
+    ("storage_settings", "ratings_sidecar"),
+    ("diagnostics_settings", None),
+]
+
+
+class ConfigWatcher:
+    def __init__(self, path):
+        self.path = path
+        self.stamp = self._stamp()
+        self.digest = self._digest(self._read())
+
+    # the new config if the file content changed since the last one returned, otherwise None
+    def poll(self):
+        stamp = self._stamp()
+        if stamp is None or stamp == self.stamp:
+            return None
+        self.stamp = stamp
+        raw = self._read()
+        digest = self._digest(raw)
+        if raw is None or digest == self.digest:
+            return None
+        try:
+            config_data = json.loads(raw)
+        except ValueError:
+            # caught mid-write: finishing the write moves the stamp again
+            return None
+        if not isinstance(config_data, dict):
+            return None
+        self.digest = digest
+        return config_data
+
+    def _stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _read(self):
+        try:
+            with open(self.path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _digest(raw):
+        return None if raw is None else hashlib.sha256(raw).hexdigest()
+
+
+def _setting(config_data, section, key, default=None):
+    values = config_data.get(section, {})
+    return values if key is None else values.get(key, default)
+
+
+# what differs between two configs, as flags named after what the app has to update
+def diff_config(old, new):
+    old_ratings = old.get("rating_settings", {})
+    new_ratings = new.get("rating_settings", {})
+    old_questions = old_ratings.get("questions", [])
+    new_questions = new_ratings.get("questions", [])
+
+    def changed(section, key, default=None):
+        return _setting(old, section, key, default) != _setting(new, section, key, default)
+
+    return {
+        "window": changed("app_settings", "window_title") or changed("app_settings", "window_size"),
+        "participant_regex": changed("app_settings", "participant_regex", r'^[a-zA-Z]+\d+$'),
+        "rating_questions": (
+            [q.get("statement") for q in old_questions] != [q.get("statement") for q in new_questions]
+        ),
+        "rating_range": changed("rating_settings", "default_rating_range", [1, 5]),
+        "negative": (
+            [bool(q.get("is_negative", False)) for q in old_questions]
+            != [bool(q.get("is_negative", False)) for q in new_questions]
+        ),
+        "open_questions": changed("open_questions_settings", "questions", []),
+        "colormap": (
+            old.get("visualization_settings", {}).get("plot_defaults", {}).get("heatmap_colormap", "viridis")
+            != new.get("visualization_settings", {}).get("plot_defaults", {}).get("heatmap_colormap", "viridis")
+        ),
+        "figure_cache": changed("visualization_settings", "figure_cache", {}),
+        "keywords": changed("keyword_settings", None),
+        "autosave_delay": changed("storage_settings", "autosave_delay_ms", 1000),
+        "custom_code": changed("custom_code_settings", None),
+        "restart": [
+            section if key is None else f"{section}.{key}"
+            for section, key in RESTART_SETTINGS if changed(section, key)
+        ],
+    }
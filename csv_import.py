@@ -0,0 +1,123 @@
+import csv
+import re
+
+from export import export_header, question_counts
+
+# bulk import of paper questionnaires from a csv in the export layout:
+#   Participant Number, Rating 1..n, Open Answer 1..m
+#
+# rows are read and validated one at a time (participant_regex, rating range, force_ratings,
+# duplicate ids); invalid rows are reported, valid rows are returned as responses for one
+# batched store.extend(). errors beyond MAX_KEPT_ERRORS are only counted, or streamed to an
+# error csv, so they do not grow with the file. the valid rows do: they are kept until the
+# end, so a cancelled or failed import saves nothing, and every store appends through the full
+# in-memory list (store.extend), which holds the whole study anyway. memory grows with the
+# imported rows like with the loaded ones, not with the size of the file.
+
+MAX_KEPT_ERRORS = 1000
+# rows between progress callbacks and cancel checks
+PROGRESS_EVERY = 5000
+
+
+# the file does not have the export layout, nothing was imported
+class ImportFormatError(Exception):
+    pass
+
+
+class ImportCancelled(Exception):
+    pass
+
+
+class RowValidator:
+    def __init__(self, config_data, existing_participants=()):
+        app_settings = config_data.get("app_settings", {})
+        rating_settings = config_data.get("rating_settings", {})
+        self.participant_pattern = re.compile(app_settings.get("participant_regex", r'^[a-zA-Z]+\d+$'))
+        self.start_val, self.end_val = rating_settings.get("default_rating_range", [1, 5])
+        self.force_ratings = rating_settings.get("force_ratings", False)
+        self.num_ratings, self.num_open = question_counts(config_data)
+        self.header = export_header(self.num_ratings, self.num_open)
+        self.seen = set(existing_participants)
+        self.columns = None
+
+    # map the file's header onto the expected columns, extra columns are ignored
+    def read_header(self, row):
+        positions = {name.strip(): i for i, name in enumerate(row)}
+        missing = [name for name in self.header if name not in positions]
+        if missing:
+            raise ImportFormatError(f"missing columns: {', '.join(missing)}")
+        self.columns = [positions[name] for name in self.header]
+
+    # (response, None) for a valid row, (None, message) otherwise
+    def validate(self, row):
+        values = [row[i].strip() if i < len(row) else "" for i in self.columns]
+        participant_number = values[0]
+        if not self.participant_pattern.match(participant_number):
+            return None, f"invalid participant id '{participant_number}'"
+        if participant_number in self.seen:
+            return None, f"duplicate participant '{participant_number}'"
+        ratings = {}
+        for i, val in enumerate(values[1:self.num_ratings + 1], start=1):
+            if not val:
+                if self.force_ratings:
+                    return None, f"rating {i} is empty"
+                ratings[f"rating_{i}"] = ""
+                continue
+            if not val.isdigit() or not self.start_val <= int(val) <= self.end_val:
+                return None, f"rating {i} '{val}' is not a whole number from {self.start_val} to {self.end_val}"
+            ratings[f"rating_{i}"] = int(val)
+        open_answers = {}
+        for i, val in enumerate(values[self.num_ratings + 1:], start=1):
+            if self.force_ratings and not val:
+                return None, f"open answer {i} is empty"
+            open_answers[f"open_{i}"] = val
+        self.seen.add(participant_number)
+        return {"participant_number": participant_number, "ratings": ratings, "open_answers": open_answers}, None
+
+
+# validate every row of the csv at file_path, returns (valid responses, report)
+#   progress(rows) is called every PROGRESS_EVERY rows, setting the `cancel` threading.Event
+#   raises ImportCancelled, error_path receives every error as csv (row, participant, error) and
+#   is only created when there are errors
+def read_csv(file_path, config_data, existing_participants=(), progress=None, cancel=None, error_path=None):
+    validator = RowValidator(config_data, existing_participants)
+    valid = []
+    report = {"rows": 0, "imported": 0, "errors": 0, "error_rows": []}
+    error_file = None
+    error_writer = None
+    try:
+        with open(file_path, "r", newline="", encoding="utf-8-sig") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                raise ImportFormatError("the file is empty")
+            validator.read_header(header)
+            # row numbers as shown in a spreadsheet, the header is row 1
+            for row_number, row in enumerate(reader, start=2):
+                if not any(cell.strip() for cell in row):
+                    continue
+                report["rows"] += 1
+                if report["rows"] % PROGRESS_EVERY == 0:
+                    if cancel is not None and cancel.is_set():
+                        raise ImportCancelled()
+                    if progress is not None:
+                        progress(report["rows"])
+                response, error = validator.validate(row)
+                if response is not None:
+                    valid.append(response)
+                    continue
+                report["errors"] += 1
+                participant_number = row[validator.columns[0]] if validator.columns[0] < len(row) else ""
+                if len(report["error_rows"]) < MAX_KEPT_ERRORS:
+                    report["error_rows"].append((row_number, participant_number, error))
+                if error_path and error_writer is None:
+                    error_file = open(error_path, "w", newline="", encoding="utf-8")
+                    error_writer = csv.writer(error_file)
+                    error_writer.writerow(["Row", "Participant Number", "Error"])
+                if error_writer:
+                    error_writer.writerow([row_number, participant_number, error])
+    finally:
+        if error_file:
+            error_file.close()
+    report["imported"] = len(valid)
+    return valid, report
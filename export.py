@@ -0,0 +1,177 @@
+import csv
+import os
+
+# response export, shared by the app's Export button and the command line
+#
+# writers stream the responses in chunks to a temp file that only replaces the target once
+# complete. progress(done, total) is called after every chunk, and setting the `cancel`
+# threading.Event stops the export and removes the partial file.
+
+EXPORT_CHUNK_SIZE = 2000
+
+# (label, extension) pairs for save dialogs
+EXPORT_FILETYPES = [
+    ("csv files", "*.csv"),
+    ("parquet files", "*.parquet"),
+    ("feather files", "*.feather"),
+    ("text files", "*.txt"),
+    ("all files", "*.*"),
+]
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def export_header(num_ratings, num_open):
+    header = ["Participant Number"]
+    for i in range(1, num_ratings + 1):
+        header.append(f"Rating {i}")
+    for i in range(1, num_open + 1):
+        header.append(f"Open Answer {i}")
+    return header
+
+
+def export_row(resp, num_ratings, num_open):
+    row = [resp.get("participant_number", "")]
+    ratings = resp.get("ratings", {})
+    for i in range(1, num_ratings + 1):
+        row.append(ratings.get(f"rating_{i}", ""))
+    open_answers = resp.get("open_answers", {})
+    for i in range(1, num_open + 1):
+        row.append(open_answers.get(f"open_{i}", ""))
+    return row
+
+
+def question_counts(config_data):
+    num_ratings = len(config_data.get("rating_settings", {}).get("questions", []))
+    num_open = len(config_data.get("open_questions_settings", {}).get("questions", []))
+    return num_ratings, num_open
+
+
+# yield the responses chunk by chunk, reporting progress and honouring cancellation
+def _chunks(responses, progress, cancel, chunk_size=EXPORT_CHUNK_SIZE):
+    total = len(responses)
+    for start in range(0, total, chunk_size):
+        if cancel is not None and cancel.is_set():
+            raise ExportCancelled()
+        yield responses[start:start + chunk_size]
+        if progress is not None:
+            progress(min(start + chunk_size, total), total)
+
+
+# run write(tmp_path) and move the result into place, never leaving a partial file behind
+def _write_via_temp(file_path, write):
+    tmp_path = f"{file_path}.part"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+# one row per participant, one column per rating and open answer
+def write_csv(file_path, responses, config_data, progress=None, cancel=None):
+    num_ratings, num_open = question_counts(config_data)
+
+    def write(path):
+        with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(export_header(num_ratings, num_open))
+            for chunk in _chunks(responses, progress, cancel):
+                writer.writerows(export_row(resp, num_ratings, num_open) for resp in chunk)
+
+    _write_via_temp(file_path, write)
+
+
+# keyword counts from keywords.count_keywords, one row per keyword, question and group
+def write_keyword_csv(file_path, counts):
+    header, rows = counts.rows()
+
+    def write(path):
+        with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(header)
+            writer.writerows(rows)
+
+    _write_via_temp(file_path, write)
+
+
+# readable plain text dump
+def write_txt(file_path, responses, progress=None, cancel=None):
+    def write(path):
+        with open(path, "w", encoding="utf-8") as f:
+            for chunk in _chunks(responses, progress, cancel):
+                lines = []
+                for resp in chunk:
+                    lines.append(f"Participant: {resp.get('participant_number', '')}\n")
+                    lines.append("Ratings:\n")
+                    for key, value in resp.get("ratings", {}).items():
+                        lines.append(f"  {key}: {value}\n")
+                    lines.append("Open Answers:\n")
+                    for key, value in resp.get("open_answers", {}).items():
+                        lines.append(f"  {key}: {value}\n")
+                    lines.append("-" * 40 + "\n")
+                f.write("".join(lines))
+
+    _write_via_temp(file_path, write)
+
+
+# columnar parquet/feather file with the csv column names; ratings become nullable integers
+# (needs pandas with pyarrow installed). written one record batch per chunk, like the csv
+def write_columnar(file_path, responses, config_data, file_format, progress=None, cancel=None):
+    import pandas as pd
+    import pyarrow as pa
+    from ratings import parse_rating
+
+    num_ratings, num_open = question_counts(config_data)
+    header = export_header(num_ratings, num_open)
+
+    def batch(chunk):
+        columns = list(zip(*(export_row(resp, num_ratings, num_open) for resp in chunk))) or [()] * len(header)
+        data = {header[0]: pd.array(list(columns[0]), dtype="string")}
+        for i in range(1, num_ratings + 1):
+            data[header[i]] = pd.array([parse_rating(val) for val in columns[i]], dtype="Float64").astype("Int64")
+        for i in range(num_ratings + 1, len(header)):
+            data[header[i]] = pd.array(list(columns[i]), dtype="string")
+        # with the pandas metadata, so read_parquet/read_feather give back the same dtypes
+        return pa.RecordBatch.from_pandas(pd.DataFrame(data), preserve_index=False)
+
+    def open_writer(path, schema):
+        if file_format == "parquet":
+            import pyarrow.parquet as pq
+            return pq.ParquetWriter(path, schema)
+        # feather version 2 is the arrow ipc file format, lz4 like pandas' to_feather
+        return pa.ipc.new_file(path, schema, options=pa.ipc.IpcWriteOptions(compression="lz4"))
+
+    def write(path):
+        writer = None
+        try:
+            for chunk in _chunks(responses, progress, cancel):
+                record_batch = batch(chunk)
+                if writer is None:
+                    writer = open_writer(path, record_batch.schema)
+                writer.write_batch(record_batch)
+            if writer is None:
+                # no responses: a file with the columns and no rows
+                writer = open_writer(path, batch([]).schema)
+        finally:
+            if writer is not None:
+                writer.close()
+
+    _write_via_temp(file_path, write)
+
+
+# pick the format from the file extension: .csv, .parquet, .feather, anything else is text
+def export_file(file_path, responses, config_data, progress=None, cancel=None):
+    lower_path = file_path.lower()
+    if lower_path.endswith(".csv"):
+        write_csv(file_path, responses, config_data, progress, cancel)
+    elif lower_path.endswith(".parquet"):
+        write_columnar(file_path, responses, config_data, "parquet", progress, cancel)
+    elif lower_path.endswith(".feather"):
+        write_columnar(file_path, responses, config_data, "feather", progress, cancel)
+    else:
+        write_txt(file_path, responses, progress, cancel)
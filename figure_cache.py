@@ -0,0 +1,75 @@
+from collections import OrderedDict
+
+# lifecycle of rendered matplotlib figures; kept free of matplotlib imports so the app can
+# create the cache at startup without loading the plotting stack
+
+
+# release a figure: drop it from pyplot's registry so it can be garbage collected once
+# nothing else (an open window, a pending save) holds on to it
+def close_figure(fig):
+    import matplotlib.pyplot as plt
+    plt.close(fig)
+
+
+# approximate memory held by a rendered figure: the agg rgba buffer plus the cached png
+def figure_nbytes(fig, png=b""):
+    width, height = fig.get_size_inches() * fig.dpi
+    return int(width * height * 4) + len(png)
+
+
+# rendered figures keyed by (plot name, dataset version, plot settings)
+#
+# a key only matches while the data and settings it was drawn from are unchanged, so a hit can be
+# shown as is. least recently used entries are closed and evicted once either limit is exceeded.
+class FigureCache:
+    def __init__(self, max_entries=16, max_bytes=200 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+
+    @classmethod
+    def from_config(cls, config_data):
+        cache_settings = config_data.get("visualization_settings", {}).get("figure_cache", {})
+        return cls(
+            max_entries=cache_settings.get("max_entries", 16),
+            max_bytes=int(cache_settings.get("max_megabytes", 200) * 1024 * 1024)
+        )
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.entries.move_to_end(key)
+        return entry[0], entry[1]
+
+    def put(self, key, fig, png):
+        if key in self.entries:
+            self._evict(key)
+        nbytes = figure_nbytes(fig, png)
+        self.entries[key] = (fig, png, nbytes)
+        self.total_bytes += nbytes
+        while len(self.entries) > 1 and (len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes):
+            self._evict(next(iter(self.entries)))
+
+    # drop every entry drawn from an older dataset version
+    def invalidate_data(self, version):
+        for key in [key for key in self.entries if key[1] != version]:
+            self._evict(key)
+
+    # drop every entry for one plot (e.g. after its settings changed)
+    def invalidate_plot(self, name):
+        for key in [key for key in self.entries if key[0] == name]:
+            self._evict(key)
+
+    def holds(self, fig):
+        return any(entry[0] is fig for entry in self.entries.values())
+
+    def clear(self):
+        for key in list(self.entries):
+            self._evict(key)
+
+    def _evict(self, key):
+        fig, png, nbytes = self.entries.pop(key)
+        self.total_bytes -= nbytes
+        close_figure(fig)
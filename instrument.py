@@ -0,0 +1,141 @@
+import bisect
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+
+# opt-in timing instrumentation for the app's hot paths
+#
+#   with instrumentation.timed("save response", items=1) as payload:
+#       ...
+#       payload["nbytes"] = written
+#
+# per action it keeps call counts, total/min/max time, a latency histogram and the payload
+# seen (responses and bytes). profile_next(action) captures a cProfile of the next call only.
+# disabled instrumentation costs one attribute check per call.
+
+# histogram bucket upper bounds in milliseconds, the last bucket is open ended
+BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+
+class ActionStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+        self.histogram = [0] * (len(BUCKETS_MS) + 1)
+        self.items = 0
+        self.nbytes = 0
+
+    def add(self, seconds, items, nbytes):
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        self.histogram[bisect.bisect_left(BUCKETS_MS, seconds * 1000)] += 1
+        self.items += items or 0
+        self.nbytes += nbytes or 0
+
+    # upper bound of the bucket holding the given quantile, in milliseconds
+    def percentile_ms(self, quantile):
+        target = quantile * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS_MS + [float("inf")], self.histogram):
+            seen += count
+            if seen >= target and count:
+                return bound
+        return 0
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0,
+            "min_ms": (self.min or 0) * 1000,
+            "max_ms": self.max * 1000,
+            "p50_ms": self.percentile_ms(0.5),
+            "p95_ms": self.percentile_ms(0.95),
+            "histogram": dict(zip([f"<={b}ms" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"], self.histogram)),
+            "items": self.items,
+            "bytes": self.nbytes,
+        }
+
+
+class Instrumentation:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.actions = {}
+        self.profile_armed = None
+        self.profiles = {}
+
+    @classmethod
+    def from_config(cls, config_data):
+        diagnostics = config_data.get("diagnostics_settings", {})
+        enabled = diagnostics.get("enabled", False) or os.environ.get("ASKITALL_DIAGNOSTICS") == "1"
+        return cls(enabled=enabled)
+
+    # the yielded dict can be filled in with the payload once it is known
+    @contextlib.contextmanager
+    def timed(self, action, items=None, nbytes=None):
+        payload = {"items": items, "nbytes": nbytes}
+        if not self.enabled:
+            yield payload
+            return
+        profiler = None
+        with self.lock:
+            if self.profile_armed == action:
+                self.profile_armed = None
+                profiler = cProfile.Profile()
+        if profiler is not None:
+            profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield payload
+        finally:
+            seconds = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+                self._store_profile(action, profiler)
+            self.record(action, seconds, payload["items"], payload["nbytes"])
+
+    def record(self, action, seconds, items=None, nbytes=None):
+        if not self.enabled:
+            return
+        with self.lock:
+            stats = self.actions.get(action)
+            if stats is None:
+                stats = self.actions[action] = ActionStats()
+            stats.add(seconds, items, nbytes)
+
+    # capture a cProfile of the next call of `action` (on whichever thread runs it)
+    def profile_next(self, action):
+        with self.lock:
+            self.profile_armed = action
+
+    def reset(self):
+        with self.lock:
+            self.actions = {}
+            self.profiles = {}
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "actions": {name: stats.to_dict() for name, stats in sorted(self.actions.items())},
+                "profiles": dict(self.profiles),
+            }
+
+    def dump_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def _store_profile(self, action, profiler):
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(30)
+        with self.lock:
+            self.profiles[action] = output.getvalue()
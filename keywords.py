@@ -0,0 +1,120 @@
+import re
+
+import numpy as np
+
+from storage import participant_group
+
+# keyword frequencies over the open answers, driven by "keyword_settings" in config.json:
+#
+#   "keyword_settings": {
+#     "keywords": {"intuitive": ["easy", "simple"], "confusing": ["unclear", "confused"]},
+#     "case_sensitive": false
+#   }
+#
+# "keywords" may also be a plain list of words without synonyms. every answer is joined into one
+# text and matched in a single pass of one compiled pattern (whole words only: no word character
+# right before or after, so terms like "c++" or ".net" match as well); the match offsets
+# are mapped back to (question, participant) with a binary search and counted with bincount.
+
+
+class KeywordCounts:
+    def __init__(self, keywords, open_keys, groups, occurrences):
+        self.keywords = keywords
+        self.open_keys = open_keys
+        self.groups = groups
+        # matches, shape (questions, groups, keywords)
+        self.occurrences = occurrences
+
+    def totals(self):
+        return self.occurrences.sum(axis=(0, 1))
+
+    def per_question(self):
+        return self.occurrences.sum(axis=1)
+
+    def per_group(self):
+        return self.occurrences.sum(axis=0)
+
+    # one row per keyword, question and group, for the csv export
+    def rows(self):
+        header = ["Keyword", "Question", "Group", "Occurrences"]
+        rows = []
+        for k, keyword in enumerate(self.keywords):
+            for q, key in enumerate(self.open_keys):
+                for g, group in enumerate(self.groups):
+                    rows.append([keyword, key, group, int(self.occurrences[q, g, k])])
+        return header, rows
+
+
+# keyword -> synonyms from the settings, in configured order
+def keyword_terms(keyword_settings):
+    keywords = keyword_settings.get("keywords", {})
+    if isinstance(keywords, dict):
+        return {keyword: [keyword] + list(synonyms or []) for keyword, synonyms in keywords.items()}
+    return {keyword: [keyword] for keyword in keywords}
+
+
+class KeywordMatcher:
+    def __init__(self, keyword_settings):
+        terms = keyword_terms(keyword_settings)
+        self.keywords = list(terms)
+        self.case_sensitive = keyword_settings.get("case_sensitive", False)
+        # matched text -> keyword index
+        self.lookup = {}
+        for k, keyword in enumerate(self.keywords):
+            for term in terms[keyword]:
+                self.lookup.setdefault(self._fold(term), k)
+        # longest first so "very easy" wins over "easy"
+        alternatives = sorted(self.lookup, key=len, reverse=True)
+        self.pattern = None
+        if alternatives:
+            flags = 0 if self.case_sensitive else re.IGNORECASE
+            # lookarounds rather than \b, which needs a word character at each end of the term
+            self.pattern = re.compile(r"(?<!\w)(?:" + "|".join(map(re.escape, alternatives)) + r")(?!\w)", flags)
+
+    def _fold(self, text):
+        return text if self.case_sensitive else text.lower()
+
+    def count(self, responses, open_keys):
+        group_labels = []
+        group_lookup = {}
+        group_codes = np.empty(len(responses), dtype=np.intp)
+        for r, resp in enumerate(responses):
+            group = participant_group(resp.get("participant_number", ""))
+            if group not in group_lookup:
+                group_lookup[group] = len(group_labels)
+                group_labels.append(group)
+            group_codes[r] = group_lookup[group]
+        num_q, num_g, num_k = len(open_keys), len(group_labels), len(self.keywords)
+        occurrences = np.zeros((num_q, num_g, num_k), dtype=np.int64)
+        if self.pattern is None or not responses:
+            return KeywordCounts(self.keywords, open_keys, group_labels, occurrences)
+
+        # all answers question by question in one text; offsets[i] is where answer i starts
+        answers = [
+            str(resp.get("open_answers", {}).get(key, "")) for key in open_keys for resp in responses
+        ]
+        lengths = np.fromiter((len(answer) + 1 for answer in answers), dtype=np.int64, count=len(answers))
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        text = "\n".join(answers)
+        starts = []
+        matched = []
+        for match in self.pattern.finditer(text):
+            starts.append(match.start())
+            matched.append(self.lookup[self._fold(match.group())])
+        if not starts:
+            return KeywordCounts(self.keywords, open_keys, group_labels, occurrences)
+
+        answer_index = np.searchsorted(offsets, np.array(starts), side="right") - 1
+        matched = np.array(matched, dtype=np.intp)
+        question = answer_index // len(responses)
+        participant = answer_index % len(responses)
+        group = group_codes[participant]
+        flat = (question * num_g + group) * num_k + matched
+        occurrences = np.bincount(flat, minlength=num_q * num_g * num_k).reshape(num_q, num_g, num_k)
+        return KeywordCounts(self.keywords, open_keys, group_labels, occurrences)
+
+
+def count_keywords(responses, config_data):
+    open_questions = config_data.get("open_questions_settings", {}).get("questions", [])
+    open_keys = [f"open_{i}" for i in range(1, len(open_questions) + 1)]
+    return KeywordMatcher(config_data.get("keyword_settings", {})).count(responses, open_keys)
@@ -1,24 +1,27 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import json
 import re
 import os
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import numpy as np
-import pandas as pd
 import traceback
-
-# load config
-CONFIG_FILENAME = "config.json"
-RESPONSES_FILENAME = "questionnaire_responses.json"
+import threading
+import queue
+import time
+import json
+from sandbox import SandboxPool
+from figure_cache import FigureCache, close_figure
+from instrument import Instrumentation
+from storage import AUTOSAVE_FILENAME, CONFIG_FILENAME, RESPONSES_FILENAME, make_store, participant_sort_key, read_config
+from autosave import AutosaveWriter, draft_target
+from aggregates import RunningAggregates
+from config_watch import CONFIG_POLL_MS, ConfigWatcher, diff_config
+from search import AnswerIndex
+from export import EXPORT_FILETYPES, ExportCancelled, export_file
 
 # load json config file
 def load_config():
     if os.path.isfile(CONFIG_FILENAME):
         try:
-            with open(CONFIG_FILENAME, "r") as f:
-                return json.load(f)
+            return read_config(CONFIG_FILENAME)
         except Exception as e:
             root = tk.Tk()
             root.withdraw()
@@ -28,39 +31,178 @@ def load_config():
         messagebox.showerror("error", f"configuration file '{CONFIG_FILENAME}' not found. create one in settings.")
         return None
 
-# participant sorting
-def participant_sort_key(pn):
-    match = re.match(r'^([a-zA-Z]+)(\d+)$', pn)
-    if match:
-        group_letters = match.group(1).lower()
-        number_part = int(match.group(2))
-        return (group_letters, number_part)
-    else:
-        return ("zzz", float('inf'))
+# warm up the heavy imports used by visualizations, errors surface later on real use
+def preload_scientific_stack():
+    try:
+        import plots  # noqa: F401
+        import ratings  # noqa: F401
+    except Exception:
+        pass
+
+# delay before checking whether a background write (autosave, sidecar) failed
+WRITER_CHECK_MS = 1000
 
-# scrolled frame helper
-class ScrolledFrame(ttk.Frame):
-    # helper frame with scrollbar
-    def __init__(self, parent, *args, **kwargs):
+# row heights of the virtualized question lists
+RATING_ROW_HEIGHT = 64
+OPEN_ROW_HEIGHT = 130
+
+# virtualized scrolled list: only the visible rows have widgets, and those are recycled while scrolling
+#   make_row(parent) -> new row widget, bind_row(row, index) -> fill the row from the model at index
+class VirtualList(ttk.Frame):
+    def __init__(self, parent, row_height, make_row, bind_row, count=0, *args, **kwargs):
         super().__init__(parent, *args, **kwargs)
-        self.canvas = tk.Canvas(self)
-        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+        self.row_height = row_height
+        self.make_row = make_row
+        self.bind_row = bind_row
+        self.count = count
+        self.width = 1
+        self.canvas = tk.Canvas(self, highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scroll)
         self.scrollbar.pack(side="right", fill="y")
         self.canvas.configure(yscrollcommand=self.scrollbar.set)
         self.canvas.pack(side="left", fill="both", expand=True)
-        self.inner_frame = ttk.Frame(self.canvas)
-        self.canvas_window = self.canvas.create_window((0, 0), window=self.inner_frame, anchor="nw")
-        self.inner_frame.bind("<Configure>", self._on_frame_configure)
         self.canvas.bind("<Configure>", self._on_canvas_configure)
+        # index -> (row, canvas window) for rows on screen, plus parked rows ready for reuse
+        self.visible_rows = {}
+        self.spare_rows = []
+        self._update_scrollregion()
+
+    def set_count(self, count):
+        self.count = count
+        self._update_scrollregion()
+        self.refresh(rebind=True)
+
+    # re-read one model entry, a no-op when the row is scrolled out of view
+    def refresh_index(self, index):
+        if index in self.visible_rows:
+            self.bind_row(self.visible_rows[index][0], index)
+
+    def refresh(self, rebind=False):
+        top = self.canvas.canvasy(0)
+        first = max(0, int(top // self.row_height))
+        last = min(self.count, int((top + self.canvas.winfo_height()) // self.row_height) + 1)
+        for index in [i for i in self.visible_rows if not first <= i < last]:
+            row, window = self.visible_rows.pop(index)
+            self.canvas.coords(window, 0, -2 * self.row_height)
+            self.spare_rows.append((row, window))
+        for index in range(first, last):
+            if index in self.visible_rows:
+                if rebind:
+                    self.bind_row(self.visible_rows[index][0], index)
+                continue
+            if self.spare_rows:
+                row, window = self.spare_rows.pop()
+                self.canvas.coords(window, 0, index * self.row_height)
+            else:
+                row = self.make_row(self.canvas)
+                window = self.canvas.create_window(
+                    0, index * self.row_height, window=row, anchor="nw",
+                    width=self.width, height=self.row_height
+                )
+            self.visible_rows[index] = (row, window)
+            self.bind_row(row, index)
+
+    # scroll so the row at index is at the top
+    def see(self, index):
+        if self.count:
+            self.canvas.yview_moveto(index / self.count)
+            self.refresh()
 
-    def _on_frame_configure(self, event):
-        self.canvas.config(scrollregion=self.canvas.bbox("all"))
+    def _update_scrollregion(self):
+        self.canvas.config(scrollregion=(0, 0, self.width, self.count * self.row_height))
+
+    def _on_scroll(self, *args):
+        self.canvas.yview(*args)
+        self.refresh()
 
     def _on_canvas_configure(self, event):
-        self.canvas.itemconfig(self.canvas_window, width=event.width)
+        self.width = event.width
+        for row, window in list(self.visible_rows.values()) + self.spare_rows:
+            self.canvas.itemconfig(window, width=event.width)
+        self._update_scrollregion()
+        self.refresh()
+
+# notebook tabs that are rendered the first time they are selected
+class LazyTabs:
+    # build(): runs on a worker thread and returns a matplotlib figure
+    # key: figure cache key, a cached figure is shown without rendering again
+    def __init__(self, root, notebook, figures, cache, instrumentation):
+        self.root = root
+        self.notebook = notebook
+        self.figures = figures
+        self.cache = cache
+        self.instrumentation = instrumentation
+        self.builders = {}
+        self.started = set()
+        self.pending = 0
+        self.results = queue.Queue()
+        self.notebook.bind("<<NotebookTabChanged>>", self.render_selected, add="+")
 
-    def get_frame(self):
-        return self.inner_frame
+    def add(self, text, build, key=None):
+        frame = ttk.Frame(self.notebook)
+        ttk.Label(frame, text="rendering...").pack(pady=20)
+        self.notebook.add(frame, text=text)
+        self.builders[str(frame)] = (text, frame, build, key)
+
+    def render_selected(self, event=None):
+        tab_id = self.notebook.select()
+        if tab_id not in self.builders or tab_id in self.started:
+            return
+        self.started.add(tab_id)
+        text, frame, build, key = self.builders[tab_id]
+        cached = self.cache.get(key) if key is not None else None
+        if cached:
+            self._show(text, frame, *cached)
+            return
+        threading.Thread(target=self._render, args=(text, frame, build, key), daemon=True).start()
+        self.pending += 1
+        if self.pending == 1:
+            self.root.after(50, self._poll)
+
+    # worker thread: data prep, figure construction and agg rasterization
+    def _render(self, text, frame, build, key):
+        try:
+            with self.instrumentation.timed(f"build {text}"):
+                fig = build()
+            from plots import render_png
+            with self.instrumentation.timed(f"draw {text}") as payload:
+                png = render_png(fig)
+                payload["nbytes"] = len(png)
+            self.results.put((text, frame, key, fig, png, None))
+        except Exception:
+            self.results.put((text, frame, key, None, None, traceback.format_exc()))
+
+    # tk thread: swap the placeholder for the finished image
+    def _poll(self):
+        while True:
+            try:
+                text, frame, key, fig, png, error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending -= 1
+            if fig is not None and key is not None:
+                self.cache.put(key, fig, png)
+            if not frame.winfo_exists():
+                if fig is not None and key is None:
+                    close_figure(fig)
+                continue
+            if error:
+                for child in frame.winfo_children():
+                    child.destroy()
+                ttk.Label(frame, text=f"failed to render {text}:\n{error}").pack(pady=20)
+                continue
+            self._show(text, frame, fig, png)
+        if self.pending:
+            self.root.after(50, self._poll)
+
+    def _show(self, text, frame, fig, png):
+        for child in frame.winfo_children():
+            child.destroy()
+        self.figures[text] = fig
+        image = tk.PhotoImage(master=frame, data=png)
+        label = ttk.Label(frame, image=image)
+        label.image = image
+        label.pack(fill="both", expand=True)
 
 # main app
 class QuestionnaireApp(tk.Tk):
@@ -72,28 +214,439 @@ class QuestionnaireApp(tk.Tk):
         self.title(app_settings.get("window_title"))
         self.geometry(app_settings.get("window_size"))
         self.participant_regex = app_settings.get("participant_regex", r'^[a-zA-Z]+\d+$')
-        self.responses = self.load_responses()
+        self.instrumentation = Instrumentation.from_config(self.config_data)
+        self.store = make_store(self.config_data, RESPONSES_FILENAME)
+        # responses are read on a worker thread after the window is up (see start_loading); until
+        # then the list only holds the blank form
+        self.responses = []
+        self.loading = True
+        self.load_error = None
+        # participant picked from the combobox while loading, opened once loading finishes
+        self.pending_participant = None
+        # form edits are autosaved this long after the last change, 0 turns autosave off
+        self.autosave_delay = self.config_data.get("storage_settings", {}).get("autosave_delay_ms", 1000)
+        self.autosave = AutosaveWriter(AUTOSAVE_FILENAME, self.instrumentation)
+        self.autosave_job = None
+        # whether status_label shows a background write error
+        self.writer_error_shown = False
+        # a draft left by the last session is offered once the responses it refers to are loaded,
+        # until then autosave is off so it is not overwritten
+        self.startup_draft = self.autosave.load()
+        # optional binary ratings snapshot, rewritten after every save (see sidecar.py)
+        self.sidecar_writer = None
+        self.sidecar_arrays = None
+        # numpy, pandas and matplotlib are only loaded once plots or custom code need them
+        self.rating_matrix = None
+        self.answer_index = None
+        # running per-group/per-item totals behind the live stats tab, set once loading finishes
+        self.aggregates = None
+        self.live_stats_job = None
+        # re-runs the query of the open search window after a change, and its pending after_idle job
+        self.search_refresh = None
+        self.search_job = None
+        # (dataset version, keyword settings) and the keyword counts computed for them
+        self.keyword_counts = None
+        self.figure_cache = FigureCache.from_config(self.config_data)
+        self.sandbox = None
         self.current_index = 0
         self.create_widgets()
-        if not self.responses:
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        if app_settings.get("preload_libraries", True):
+            self.after_idle(self.preload_libraries)
+        # settings saved while the app runs are applied without a restart
+        self.config_watcher = ConfigWatcher(CONFIG_FILENAME)
+        self.after(CONFIG_POLL_MS, self.watch_config)
+        # the form is blank already
+        self.responses.append(self.blank_response())
+        self.update_participant_combobox()
+        self.start_loading()
+
+    # read the store on a worker thread, the combobox fills in as chunks arrive
+    def start_loading(self):
+        self.set_data_controls(False)
+        self.status_label.configure(text="loading responses...")
+        # built alongside the load, handed over by finish_loading
+        aggregates = RunningAggregates(self.config_data)
+        # shown: perf_counter time and length of the last combobox update
+        state = {"chunks": queue.Queue(), "finished": False, "error": None, "shown": (0, 0), "aggregates": aggregates}
+
+        def work():
+            try:
+                with self.instrumentation.timed("load responses") as payload:
+                    count = 0
+                    for chunk in self.store.load_chunks():
+                        for resp in chunk:
+                            aggregates.add(resp)
+                        # sorted here so the tk thread only merges
+                        order = sorted((participant_sort_key(resp["participant_number"]), resp["participant_number"]) for resp in chunk)
+                        state["chunks"].put((chunk, order))
+                        count += len(chunk)
+                    payload["items"] = count
+            except Exception as e:
+                state["error"] = e
+            state["finished"] = True
+
+        # responses read so far, and their (sort key, participant number) kept sorted
+        self.loaded_responses = []
+        self.loading_order = []
+        threading.Thread(target=work, daemon=True).start()
+        self.after(100, lambda: self.poll_loading(state))
+
+    # merge arrived chunks; the combobox values are replaced at most once a second, each
+    # replacement costs as much as the whole list
+    def poll_loading(self, state):
+        # read the flag first so no chunk put before it is missed
+        finished = state["finished"]
+        while not state["chunks"].empty():
+            chunk, order = state["chunks"].get()
+            self.loaded_responses.extend(chunk)
+            # two sorted runs, merged in linear time
+            self.loading_order.extend(order)
+            self.loading_order.sort()
+        if finished:
+            self.finish_loading(state["error"], state["aggregates"])
+            return
+        shown_at, shown_count = state["shown"]
+        if len(self.loading_order) != shown_count and time.perf_counter() - shown_at >= 1:
+            self.participant_combobox["values"] = [pn for _, pn in self.loading_order]
+            self.show_loading_status()
+            state["shown"] = (time.perf_counter(), len(self.loading_order))
+        self.after(100, lambda: self.poll_loading(state))
+
+    def show_loading_status(self):
+        text = f"loading responses... {len(self.loaded_responses)}"
+        if self.pending_participant is not None:
+            text += f", {self.pending_participant} opens when done"
+        self.status_label.configure(text=text)
+
+    # swap the loaded responses in behind the form, or report why they could not be read
+    def finish_loading(self, error, aggregates):
+        self.loading = False
+        loaded, self.loaded_responses, self.loading_order = self.loaded_responses, None, None
+        if error is not None:
+            # every control that writes to the store stays disabled, so the unread file is not
+            # overwritten by an empty or partial study
+            self.load_error = error
+            self.participant_combobox["values"] = []
+            self.status_label.configure(text="responses could not be loaded, saving is disabled")
+            messagebox.showerror(
+                "load error",
+                f"the stored responses could not be loaded:\n\n{error}\n\n"
+                "saving is disabled so the file is not overwritten. fix or move it and restart the app."
+            )
+            return
+        draft, self.startup_draft = self.startup_draft, None
+        typed = not self.form_is_blank()
+        asked = typed and draft is not None
+        if asked:
+            # only one of them can stay on the form, and the typed one was never autosaved
+            if messagebox.askyesno(
+                "restore",
+                "an unsaved response from the last session was found. restore it?\n\n"
+                "what you typed while the responses were loading is then discarded."
+            ):
+                typed = False
+            else:
+                draft = None
+                self.autosave.discard()
+        if typed:
+            # what was typed while loading becomes a new entry after the loaded ones
+            self.responses = loaded + [self.responses[self.current_index]]
+            self.current_index = len(loaded)
+        else:
+            self.responses = loaded
+            self.current_index = 0
+        # nothing was built from the blank list (visualize and search were disabled)
+        self.rating_matrix = None
+        self.answer_index = None
+        self.keyword_counts = None
+        if not aggregates.matches(self.config_data):
+            # the scoring settings changed while loading
+            aggregates = RunningAggregates.from_responses(loaded, self.config_data)
+        self.aggregates = aggregates
+        self.schedule_live_stats()
+        if self.config_data.get("storage_settings", {}).get("ratings_sidecar", False):
+            self.open_sidecar()
+        self.status_label.configure(text="")
+        self.set_data_controls(True)
+        if typed:
+            self.update_participant_combobox()
+        elif not self.responses:
             self.new_response()
         else:
+            if self.pending_participant is not None:
+                idx = self.store.find(self.pending_participant, self.responses)
+                if idx is not None:
+                    self.current_index = idx
             self.load_response_to_gui()
+            self.update_participant_combobox()
+        self.pending_participant = None
+        if draft is not None:
+            self.restore_draft(draft, ask=not asked)
+        if typed:
+            self.schedule_autosave()
 
-    # load responses from json file
-    def load_responses(self):
-        if os.path.isfile(RESPONSES_FILENAME):
-            try:
-                with open(RESPONSES_FILENAME, "r") as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
+    # controls that need the loaded responses (all of them write to or read from the store)
+    def set_data_controls(self, enabled):
+        for button in (
+            self.button_previous, self.button_next, self.button_new, self.button_save, self.button_delete,
+            self.button_export, self.button_import, self.visualize_button, self.search_button
+        ):
+            button.state(["!disabled"] if enabled else ["disabled"])
 
-    # save responses to json file
-    def save_responses(self):
-        with open(RESPONSES_FILENAME, "w") as f:
-            json.dump(self.responses, f, indent=2)
+    # nothing entered in the form
+    def form_is_blank(self):
+        return (
+            not self.participant_entry.get().strip()
+            and not any(val.strip() for val in self.rating_values)
+            and not any(val.strip() for val in self.open_values)
+        )
+
+    # flush pending storage work before closing
+    def on_close(self):
+        if self.sandbox is not None:
+            self.sandbox.shutdown()
+        self.figure_cache.clear()
+        # a store still being read by the loading thread is left alone, nothing was written to it
+        if not self.loading:
+            self.store.close()
+        if self.sidecar_writer is not None:
+            # closing can still change the store files (journal compaction), stamp them again
+            if self.rating_matrix is not None:
+                self.responses_saved()
+            self.sidecar_writer.close()
+        if self.autosave_job is not None:
+            self.after_cancel(self.autosave_job)
+            self.write_draft()
+        self.autosave.close()
+        self.destroy()
+
+    # autosave: restart the debounce timer on every form change
+    def schedule_autosave(self, event=None):
+        if not self.autosave_delay or self.startup_draft is not None:
+            return
+        if self.autosave_job is not None:
+            self.after_cancel(self.autosave_job)
+        self.autosave_job = self.after(self.autosave_delay, self.write_draft)
+
+    # hand the form as it is now to the background writer
+    def write_draft(self):
+        self.autosave_job = None
+        if self.loading or self.load_error is not None:
+            # until the responses are loaded the form can only become a new entry
+            stored_participant = None
+        else:
+            stored_participant = self.responses[self.current_index]["participant_number"] or None
+        self.autosave.submit({
+            # the entry being edited as it is stored, see autosave.draft_target
+            "stored_participant": stored_participant,
+            "response": {
+                "participant_number": self.participant_entry.get().strip(),
+                "ratings": dict(zip(self.rating_keys, self.rating_values)),
+                "open_answers": dict(zip(self.open_keys, self.open_values))
+            }
+        })
+        self.after(WRITER_CHECK_MS, self.check_writers)
+
+    # background writes (autosave, sidecar) report failures here instead of failing silently
+    def check_writers(self):
+        errors = []
+        if self.autosave.error is not None:
+            errors.append(f"autosave failed: {self.autosave.error}")
+        if self.sidecar_writer is not None and self.sidecar_writer.error is not None:
+            errors.append(f"ratings sidecar not written: {self.sidecar_writer.error}")
+        if errors:
+            self.status_label.configure(text="; ".join(errors))
+            self.writer_error_shown = True
+        elif self.writer_error_shown:
+            self.status_label.configure(text="")
+            self.writer_error_shown = False
+
+    # the form on screen now matches stored data, any draft is obsolete
+    def discard_draft(self):
+        if self.autosave_job is not None:
+            self.after_cancel(self.autosave_job)
+            self.autosave_job = None
+        self.autosave.discard()
+
+    # offer to put a form left unsaved by a crash back on screen
+    def restore_draft(self, draft, ask=True):
+        try:
+            index = draft_target(draft, self.store, self.responses)
+            resp = draft["response"]
+            ratings = resp["ratings"]
+            open_answers = resp["open_answers"]
+            participant_number = resp["participant_number"]
+        except (AttributeError, KeyError, TypeError):
+            self.autosave.discard()
+            return
+        if ask and not messagebox.askyesno("restore", "an unsaved response from the last session was found. restore it?"):
+            self.autosave.discard()
+            return
+        if index is None:
+            self.new_response()
+        else:
+            self.current_index = index
+            self.load_response_to_gui()
+        self.participant_entry.delete(0, tk.END)
+        self.participant_entry.insert(0, participant_number)
+        for i, key in enumerate(self.rating_keys):
+            self.rating_values[i] = str(ratings.get(key, ""))
+        for i, key in enumerate(self.open_keys):
+            self.open_values[i] = open_answers.get(key, "")
+        self.ratings_list.refresh(rebind=True)
+        self.open_list.refresh(rebind=True)
+        # keep the restored form protected until it is saved
+        self.write_draft()
+
+    # ratings matrix, built on first use (from the sidecar when it matches what was loaded)
+    def get_rating_matrix(self):
+        if self.rating_matrix is None:
+            from ratings import RatingMatrix
+            if self.sidecar_arrays is not None:
+                ratings, groups, participants, meta = self.sidecar_arrays
+                self.rating_matrix = RatingMatrix.from_arrays(
+                    self.config_data, ratings, groups, participants, meta["group_labels"], copy=True
+                )
+                self.sidecar_arrays = None
+            else:
+                self.rating_matrix = RatingMatrix.from_responses(self.responses, self.config_data)
+        return self.rating_matrix
+
+    # map the sidecar if it is current, and start the writer that keeps it current
+    def open_sidecar(self):
+        from sidecar import SidecarWriter, open_sidecar, rows_match
+        num_ratings = len(self.config_data.get("rating_settings", {}).get("questions", []))
+        rating_keys = [f"rating_{i}" for i in range(1, num_ratings + 1)]
+        arrays = open_sidecar(RESPONSES_FILENAME, self.store, rating_keys)
+        if arrays is not None and rows_match(arrays, self.responses):
+            self.sidecar_arrays = arrays
+        self.sidecar_writer = SidecarWriter(RESPONSES_FILENAME)
+
+    # after a store write: hand a snapshot of the ratings to the sidecar writer. only the rows the
+    # store holds, not e.g. a blank form added with New and never saved
+    def responses_saved(self):
+        if self.sidecar_writer is None:
+            return
+        from sidecar import data_stamp
+        matrix = self.get_rating_matrix()
+        count = self.store.saved_count(self.responses)
+        snapshot = matrix.copy() if count == matrix.size else matrix.select(slice(0, count))
+        self.sidecar_writer.submit(snapshot, data_stamp(self.store))
+        self.after(WRITER_CHECK_MS, self.check_writers)
+
+    # keyword counts for the given snapshot of the responses, reused while the dataset version
+    # and keyword settings stay the same. safe to call from the plot worker thread
+    def get_keyword_counts(self, responses, version):
+        from keywords import count_keywords
+        key = (version, json.dumps(self.config_data.get("keyword_settings", {}), sort_keys=True))
+        cached = self.keyword_counts
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        with self.instrumentation.timed("keyword counts", items=len(responses)):
+            counts = count_keywords(responses, self.config_data)
+        self.keyword_counts = (key, counts)
+        return counts
+
+    # open answer search index, built on first use
+    def get_answer_index(self):
+        if self.answer_index is None:
+            self.answer_index = AnswerIndex.from_responses(self.responses, self.open_keys)
+        return self.answer_index
+
+    # keep the ratings matrix and answer index (once built), the running aggregates and the figure
+    # cache in step with self.responses. response=None means the entry at index was deleted,
+    # previous is the entry that was replaced or deleted (None for a new entry)
+    def response_changed(self, index, response=None, previous=None):
+        # the mapped sidecar describes the data as loaded, not after this change
+        self.sidecar_arrays = None
+        if self.search_refresh is not None and self.search_job is None:
+            # after the change is applied to the answer index below
+            self.search_job = self.after_idle(self.search_refresh)
+        if self.aggregates is not None:
+            if previous is not None:
+                self.aggregates.remove(previous)
+            if response is not None:
+                self.aggregates.add(response)
+            self.schedule_live_stats()
+        if self.answer_index is not None:
+            if response is None:
+                self.answer_index.delete(index)
+            else:
+                self.answer_index.set(index, response)
+        if self.rating_matrix is None:
+            return
+        if response is None:
+            self.rating_matrix.delete(index)
+        else:
+            self.rating_matrix.set(index, response)
+        self.figure_cache.invalidate_data(self.rating_matrix.version)
+
+    # config hot reload: one stat per poll, a changed file is diffed and applied
+    def watch_config(self):
+        config_data = self.config_watcher.poll()
+        if config_data is not None:
+            self.apply_config(config_data)
+        self.after(CONFIG_POLL_MS, self.watch_config)
+
+    # bring the running app in line with a changed config, touching only what the change affects.
+    # responses are not reloaded
+    def apply_config(self, config_data):
+        changes = diff_config(self.config_data, config_data)
+        self.config_data = config_data
+        app_settings = config_data.get("app_settings", {})
+        if changes["window"]:
+            self.title(app_settings.get("window_title"))
+            self.geometry(app_settings.get("window_size"))
+        if changes["participant_regex"]:
+            self.participant_regex = app_settings.get("participant_regex", r'^[a-zA-Z]+\d+$')
+        if changes["autosave_delay"]:
+            self.autosave_delay = config_data.get("storage_settings", {}).get("autosave_delay_ms", 1000)
+        if changes["rating_questions"] or changes["rating_range"]:
+            self.update_ratings_widgets(changes["rating_range"])
+        if changes["open_questions"]:
+            self.update_open_questions_widgets()
+        scoring = changes["rating_range"] or changes["negative"]
+        if self.sidecar_arrays is not None and self.sidecar_arrays[0].shape[1] != len(self.rating_keys):
+            self.sidecar_arrays = None
+        if self.rating_matrix is not None:
+            if self.rating_matrix.num_items != len(self.rating_keys):
+                # the items themselves changed: rebuild from the responses in memory, continuing
+                # the version so nothing cached for an older matrix can match
+                from ratings import RatingMatrix
+                version = self.rating_matrix.version
+                self.rating_matrix = RatingMatrix.from_responses(self.responses, config_data)
+                self.rating_matrix.version = version + 1
+                self.figure_cache.invalidate_data(self.rating_matrix.version)
+            elif scoring or changes["rating_questions"]:
+                self.rating_matrix.set_scoring(config_data)
+        if scoring:
+            self.figure_cache.invalidate_plot("Box Plot")
+            self.figure_cache.invalidate_plot("Heatmap")
+        elif changes["colormap"]:
+            self.figure_cache.invalidate_plot("Heatmap")
+        if self.aggregates is not None and not self.aggregates.matches(config_data):
+            self.aggregates = RunningAggregates.from_responses(self.responses, config_data)
+            self.schedule_live_stats()
+        if changes["keywords"] or changes["open_questions"]:
+            self.keyword_counts = None
+            self.figure_cache.invalidate_plot("Keywords")
+        if changes["open_questions"] and self.answer_index is not None and self.answer_index.open_keys != self.open_keys:
+            self.answer_index = None
+        if changes["figure_cache"]:
+            limits = FigureCache.from_config(config_data)
+            self.figure_cache.max_entries = limits.max_entries
+            self.figure_cache.max_bytes = limits.max_bytes
+        if changes["custom_code"] and self.sandbox is not None:
+            # the next run starts a pool with the new limits
+            self.sandbox.shutdown()
+            self.sandbox = None
+        if changes["restart"] and not self.loading:
+            self.status_label.configure(text=f"restart to apply: {', '.join(changes['restart'])}")
+
+    # import the scientific stack on a background thread while the user is entering data
+    def preload_libraries(self):
+        threading.Thread(target=preload_scientific_stack, daemon=True).start()
 
     # ui setup
     def create_widgets(self):
@@ -104,7 +657,12 @@ class QuestionnaireApp(tk.Tk):
         self.participant_combobox.bind("<<ComboboxSelected>>", self.on_participant_select)
         self.visualize_button = ttk.Button(top_frame, text="Visualize", command=self.open_visualization_options)
         self.visualize_button.pack(side=tk.RIGHT, padx=5)
-        self.update_participant_combobox()
+        self.search_button = ttk.Button(top_frame, text="Search", command=self.open_search)
+        self.search_button.pack(side=tk.RIGHT, padx=5)
+        if self.instrumentation.enabled:
+            ttk.Button(top_frame, text="Diagnostics", command=self.open_diagnostics).pack(side=tk.RIGHT, padx=5)
+        self.status_label = ttk.Label(top_frame)
+        self.status_label.pack(side=tk.LEFT, padx=5)
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(expand=True, fill='both', padx=10, pady=10)
         self.participant_frame = ttk.Frame(self.notebook)
@@ -116,6 +674,7 @@ class QuestionnaireApp(tk.Tk):
         self.create_participant_widgets()
         self.create_ratings_widgets()
         self.create_open_questions_widgets()
+        self.create_live_stats_widgets()
         self.create_navigation_buttons()
 
     # create participant widget
@@ -123,38 +682,169 @@ class QuestionnaireApp(tk.Tk):
         ttk.Label(self.participant_frame, text="Participant ID (e.g. 'a1'):").pack(pady=5)
         self.participant_entry = ttk.Entry(self.participant_frame)
         self.participant_entry.pack(pady=5)
+        self.participant_entry.bind("<KeyRelease>", self.schedule_autosave)
 
-    # create ratings widgets
+    # create ratings widgets: one model value per question, widgets only for the visible rows
     def create_ratings_widgets(self):
-        self.rating_vars = []
+        self.read_rating_settings()
+        self.rating_values = [""] * len(self.rating_questions)
+        self.ratings_list = VirtualList(
+            self.ratings_tab, RATING_ROW_HEIGHT, self.make_rating_row, self.bind_rating_row,
+            count=len(self.rating_questions)
+        )
+        self.ratings_list.pack(fill="both", expand=True)
+
+    def read_rating_settings(self):
         rating_settings = self.config_data.get("rating_settings", {})
-        questions = rating_settings.get("questions", [])
-        default_range = rating_settings.get("default_rating_range", [1, 5])
-        start_val, end_val = default_range
-        rating_values = [str(x) for x in range(start_val, end_val + 1)]
-        self.ratings_scrolled = ScrolledFrame(self.ratings_tab)
-        self.ratings_scrolled.pack(fill="both", expand=True)
-        container = self.ratings_scrolled.get_frame()
-        for i, q_obj in enumerate(questions, start=1):
-            statement = q_obj.get("statement", f"Question {i}")
-            ttk.Label(container, text=f"Rating {i}: {statement}").pack(pady=5)
-            var = tk.StringVar()
-            ttk.Combobox(container, textvariable=var, values=rating_values, state="readonly").pack(pady=5)
-            is_neg = q_obj.get("is_negative", False)
-            self.rating_vars.append((var, is_neg))
-
-    # create open question widgets
+        self.rating_questions = rating_settings.get("questions", [])
+        start_val, end_val = rating_settings.get("default_rating_range", [1, 5])
+        self.rating_choices = [str(x) for x in range(start_val, end_val + 1)]
+        self.rating_keys = [f"rating_{i}" for i in range(1, len(self.rating_questions) + 1)]
+
+    # after a config change: rows are added or removed with the questions, otherwise only rows
+    # whose statement changed are rebound (all visible rows when the scale changed)
+    def update_ratings_widgets(self, scale_changed):
+        old_questions = self.rating_questions
+        self.read_rating_settings()
+        count = len(self.rating_questions)
+        self.rating_values = self.rating_values[:count] + [""] * (count - len(self.rating_values))
+        if count != len(old_questions):
+            self.ratings_list.set_count(count)
+        elif scale_changed:
+            self.ratings_list.refresh(rebind=True)
+        else:
+            for i, (old, new) in enumerate(zip(old_questions, self.rating_questions)):
+                if old.get("statement") != new.get("statement"):
+                    self.ratings_list.refresh_index(i)
+
+    def make_rating_row(self, parent):
+        row = ttk.Frame(parent, height=RATING_ROW_HEIGHT)
+        row.pack_propagate(False)
+        row.index = None
+        row.label = ttk.Label(row)
+        row.label.pack(pady=5)
+        row.var = tk.StringVar()
+        row.combobox = ttk.Combobox(row, textvariable=row.var, values=self.rating_choices, state="readonly")
+        row.combobox.pack(pady=5)
+        row.var.trace_add("write", lambda *args: self.on_rating_edit(row))
+        return row
+
+    def bind_rating_row(self, row, index):
+        row.index = None
+        statement = self.rating_questions[index].get("statement", f"Question {index + 1}")
+        row.label.configure(text=f"Rating {index + 1}: {statement}")
+        row.combobox.configure(values=self.rating_choices)
+        row.var.set(self.rating_values[index])
+        row.index = index
+
+    def on_rating_edit(self, row):
+        if row.index is not None:
+            self.rating_values[row.index] = row.var.get()
+            self.schedule_autosave()
+
+    # create open question widgets, virtualized like the ratings
     def create_open_questions_widgets(self):
-        self.open_entries = []
-        open_questions = self.config_data.get("open_questions_settings", {}).get("questions", [])
-        self.open_scrolled = ScrolledFrame(self.open_questions_tab)
-        self.open_scrolled.pack(fill="both", expand=True)
-        container = self.open_scrolled.get_frame()
-        for i, question in enumerate(open_questions, start=1):
-            ttk.Label(container, text=f"Open Question {i}: {question}").pack(pady=5)
-            text_widget = tk.Text(container, width=60, height=5, wrap="word")
-            text_widget.pack(pady=5)
-            self.open_entries.append(text_widget)
+        self.read_open_questions_settings()
+        self.open_values = [""] * len(self.open_questions)
+        self.open_list = VirtualList(
+            self.open_questions_tab, OPEN_ROW_HEIGHT, self.make_open_row, self.bind_open_row,
+            count=len(self.open_questions)
+        )
+        self.open_list.pack(fill="both", expand=True)
+
+    def read_open_questions_settings(self):
+        self.open_questions = self.config_data.get("open_questions_settings", {}).get("questions", [])
+        self.open_keys = [f"open_{i}" for i in range(1, len(self.open_questions) + 1)]
+
+    # after a config change, like update_ratings_widgets
+    def update_open_questions_widgets(self):
+        old_questions = self.open_questions
+        self.read_open_questions_settings()
+        count = len(self.open_questions)
+        self.open_values = self.open_values[:count] + [""] * (count - len(self.open_values))
+        if count != len(old_questions):
+            self.open_list.set_count(count)
+        else:
+            for i, (old, new) in enumerate(zip(old_questions, self.open_questions)):
+                if old != new:
+                    self.open_list.refresh_index(i)
+
+    def make_open_row(self, parent):
+        row = ttk.Frame(parent, height=OPEN_ROW_HEIGHT)
+        row.pack_propagate(False)
+        row.index = None
+        row.label = ttk.Label(row)
+        row.label.pack(pady=5)
+        row.text = tk.Text(row, width=60, height=5, wrap="word")
+        row.text.pack(pady=5)
+        row.text.bind("<<Modified>>", lambda event: self.on_open_edit(row))
+        return row
+
+    def bind_open_row(self, row, index):
+        row.index = None
+        row.label.configure(text=f"Open Question {index + 1}: {self.open_questions[index]}")
+        row.text.delete("1.0", tk.END)
+        row.text.insert(tk.END, self.open_values[index])
+        row.text.edit_modified(False)
+        row.index = index
+
+    def on_open_edit(self, row):
+        if not row.text.edit_modified():
+            return
+        if row.index is not None:
+            self.open_values[row.index] = row.text.get("1.0", "end-1c")
+            self.schedule_autosave()
+        row.text.edit_modified(False)
+
+    # live stats tab: per group and per item summaries of the running aggregates
+    def create_live_stats_widgets(self):
+        self.live_stats_tab = ttk.Frame(self.notebook)
+        self.notebook.add(self.live_stats_tab, text="Live Stats")
+        columns = ("participants", "complete", "mean", "variance")
+        self.live_groups_tree = ttk.Treeview(self.live_stats_tab, columns=columns, height=8)
+        self.live_groups_tree.heading("#0", text="group")
+        self.live_groups_tree.column("#0", width=80)
+        for col in columns:
+            self.live_groups_tree.heading(col, text=col)
+            self.live_groups_tree.column(col, width=90, anchor="e")
+        self.live_groups_tree.pack(fill="x", padx=5, pady=5)
+        columns = ("answered", "mean", "variance")
+        self.live_items_tree = ttk.Treeview(self.live_stats_tab, columns=columns, height=8)
+        self.live_items_tree.heading("#0", text="item")
+        self.live_items_tree.column("#0", width=80)
+        for col in columns:
+            self.live_items_tree.heading(col, text=col)
+            self.live_items_tree.column(col, width=90, anchor="e")
+        self.live_items_tree.pack(fill="both", expand=True, padx=5, pady=5)
+        ttk.Label(
+            self.live_stats_tab, text="reverse-scored; group mean and variance are over participant scores"
+        ).pack(pady=5)
+        self.notebook.bind("<<NotebookTabChanged>>", lambda event: self.schedule_live_stats())
+
+    # redraw the live stats once the current burst of changes is over
+    def schedule_live_stats(self):
+        if self.live_stats_job is None:
+            self.live_stats_job = self.after_idle(self.refresh_live_stats)
+
+    # only while the tab is shown; costs one row per group and item, not per participant
+    def refresh_live_stats(self):
+        self.live_stats_job = None
+        if self.aggregates is None or self.notebook.select() != str(self.live_stats_tab):
+            return
+
+        def fmt(value, digits=2):
+            return "-" if value is None else f"{value:.{digits}f}"
+
+        self.live_groups_tree.delete(*self.live_groups_tree.get_children())
+        for group in self.aggregates.group_summary() + [self.aggregates.total_summary()]:
+            self.live_groups_tree.insert("", tk.END, text=group["group"], values=(
+                group["participants"], group["complete"], fmt(group["mean"]), fmt(group["variance"], 3)
+            ))
+        self.live_items_tree.delete(*self.live_items_tree.get_children())
+        for item in self.aggregates.item_summary():
+            self.live_items_tree.insert("", tk.END, text=item["item"], values=(
+                item["n"], fmt(item["mean"]), fmt(item["variance"], 3)
+            ))
 
     # create nav buttons
     def create_navigation_buttons(self):
@@ -166,51 +856,63 @@ class QuestionnaireApp(tk.Tk):
         self.button_save = ttk.Button(button_frame, text="Save", command=self.save_current_response)
         self.button_delete = ttk.Button(button_frame, text="Delete", command=self.delete_current_response)
         self.button_export = ttk.Button(button_frame, text="Export", command=self.export_responses)
+        self.button_import = ttk.Button(button_frame, text="Import CSV", command=self.import_responses)
         self.button_previous.grid(row=0, column=0, padx=5, pady=5)
         self.button_next.grid(row=0, column=1, padx=5, pady=5)
         self.button_new.grid(row=0, column=2, padx=5, pady=5)
         self.button_save.grid(row=1, column=0, padx=5, pady=5)
         self.button_delete.grid(row=1, column=1, padx=5, pady=5)
         self.button_export.grid(row=1, column=2, padx=5, pady=5)
+        self.button_import.grid(row=2, column=2, padx=5, pady=5)
 
     # participant logic: update combobox
     def update_participant_combobox(self):
-        participant_nums = [resp["participant_number"] for resp in self.responses]
-        sorted_nums = sorted(participant_nums, key=participant_sort_key)
-        self.participant_combobox['values'] = sorted_nums
-        if sorted_nums:
-            current_pn = self.responses[self.current_index]["participant_number"]
-            self.participant_combobox.set(current_pn)
-        else:
-            self.participant_combobox.set('')
+        with self.instrumentation.timed("combobox refresh", items=len(self.responses)):
+            sorted_nums = self.store.sorted_participants(self.responses)
+            self.participant_combobox['values'] = sorted_nums
+            if sorted_nums:
+                current_pn = self.responses[self.current_index]["participant_number"]
+                self.participant_combobox.set(current_pn)
+            else:
+                self.participant_combobox.set('')
 
     # participant logic: load selected participant
     def on_participant_select(self, event):
         selected = self.participant_combobox.get()
-        for idx, resp in enumerate(self.responses):
-            if resp["participant_number"] == selected:
-                self.current_index = idx
-                self.load_response_to_gui()
-                break
+        if self.loading:
+            # the responses are not in self.responses yet, open it when they are
+            self.pending_participant = selected
+            self.show_loading_status()
+            return
+        idx = self.store.find(selected, self.responses)
+        if idx is not None:
+            self.current_index = idx
+            self.load_response_to_gui()
 
     # crud: load response into gui
     def load_response_to_gui(self):
-        resp = self.responses[self.current_index]
-        self.participant_entry.delete(0, tk.END)
-        self.participant_entry.insert(0, resp.get("participant_number", ""))
-        rating_data = resp.get("ratings", {})
-        for i, (var, is_neg) in enumerate(self.rating_vars, start=1):
-            raw_val = rating_data.get(f"rating_{i}", "")
-            var.set(str(raw_val))
-        open_data = resp.get("open_answers", {})
-        for i, txt in enumerate(self.open_entries, start=1):
-            val = open_data.get(f"open_{i}", "")
-            txt.delete("1.0", tk.END)
-            txt.insert(tk.END, val)
-        self.participant_combobox.set(resp["participant_number"])
+        self.discard_draft()
+        with self.instrumentation.timed("populate form"):
+            resp = self.responses[self.current_index]
+            self.participant_entry.delete(0, tk.END)
+            self.participant_entry.insert(0, resp.get("participant_number", ""))
+            # only questions whose value differs from the form get their (visible) widget touched
+            rating_data = resp.get("ratings", {})
+            for i, key in enumerate(self.rating_keys):
+                val = str(rating_data.get(key, ""))
+                if val != self.rating_values[i]:
+                    self.rating_values[i] = val
+                    self.ratings_list.refresh_index(i)
+            open_data = resp.get("open_answers", {})
+            for i, key in enumerate(self.open_keys):
+                val = open_data.get(key, "")
+                if val != self.open_values[i]:
+                    self.open_values[i] = val
+                    self.open_list.refresh_index(i)
+            self.participant_combobox.set(resp["participant_number"])
 
-    # crud: new response
-    def new_response(self):
+    # crud: empty response for the configured questions
+    def blank_response(self):
         rating_settings = self.config_data.get("rating_settings", {})
         questions = rating_settings.get("questions", [])
         num_qs = len(questions)
@@ -218,13 +920,18 @@ class QuestionnaireApp(tk.Tk):
         num_open = len(open_qs)
         blank_ratings = {f"rating_{i}": "" for i in range(1, num_qs + 1)}
         blank_opens = {f"open_{i}": "" for i in range(1, num_open + 1)}
-        new_resp = {
+        return {
             "participant_number": "",
             "ratings": blank_ratings,
             "open_answers": blank_opens
         }
+
+    # crud: new response
+    def new_response(self):
+        new_resp = self.blank_response()
         self.current_index = len(self.responses)
         self.responses.append(new_resp)
+        self.response_changed(self.current_index, new_resp)
         self.load_response_to_gui()
         self.update_participant_combobox()
 
@@ -237,37 +944,45 @@ class QuestionnaireApp(tk.Tk):
         rating_settings = self.config_data["rating_settings"]
         force_ratings = rating_settings.get("force_ratings", False)
         rating_dict = {}
-        for i, (var, is_neg) in enumerate(self.rating_vars, start=1):
-            val_str = var.get().strip()
+        for key, val in zip(self.rating_keys, self.rating_values):
+            val_str = val.strip()
             if force_ratings and not val_str:
                 messagebox.showerror("error", "please answer all rating questions.")
                 return
             if val_str.isdigit():
-                rating_dict[f"rating_{i}"] = int(val_str)
+                rating_dict[key] = int(val_str)
             else:
-                rating_dict[f"rating_{i}"] = val_str
+                rating_dict[key] = val_str
         open_answers = {}
-        open_qs = self.config_data.get("open_questions_settings", {}).get("questions", [])
-        for i, txt in enumerate(self.open_entries, start=1):
-            ans = txt.get("1.0", tk.END).strip()
+        for key, val in zip(self.open_keys, self.open_values):
+            ans = val.strip()
             if force_ratings and not ans:
                 messagebox.showerror("error", "please fill all open questions.")
                 return
-            open_answers[f"open_{i}"] = ans
-        self.responses[self.current_index] = {
+            open_answers[key] = ans
+        response = {
             "participant_number": participant_number,
             "ratings": rating_dict,
             "open_answers": open_answers
         }
-        self.save_responses()
+        previous = self.responses[self.current_index]
+        self.responses[self.current_index] = response
+        self.response_changed(self.current_index, response, previous)
+        with self.instrumentation.timed("save response", items=1):
+            self.store.put(self.current_index, response, self.responses)
+        self.responses_saved()
+        self.discard_draft()
         messagebox.showinfo("success", "response saved.")
         self.update_participant_combobox()
 
     # crud: delete response
     def delete_current_response(self):
         if messagebox.askyesno("delete", "are you sure you want to delete this response?"):
-            del self.responses[self.current_index]
-            self.save_responses()
+            previous = self.responses.pop(self.current_index)
+            self.response_changed(self.current_index, previous=previous)
+            with self.instrumentation.timed("delete response", items=1):
+                self.store.delete(self.current_index, self.responses)
+            self.responses_saved()
             if self.responses:
                 self.current_index = min(self.current_index, len(self.responses) - 1)
                 self.load_response_to_gui()
@@ -287,7 +1002,7 @@ class QuestionnaireApp(tk.Tk):
             self.current_index += 1
             self.load_response_to_gui()
 
-    # export responses
+    # export responses on a worker thread with a progress window
     def export_responses(self):
         if not self.responses:
             messagebox.showinfo("no data", "no responses to export.")
@@ -295,50 +1010,250 @@ class QuestionnaireApp(tk.Tk):
         file_path = filedialog.asksaveasfilename(
             title="export responses",
             defaultextension=".csv",
-            filetypes=[("csv files", "*.csv"), ("text files", "*.txt"), ("all files", "*.*")]
+            filetypes=EXPORT_FILETYPES
         )
         if not file_path:
             return
-        num_ratings = len(self.config_data.get("rating_settings", {}).get("questions", []))
-        num_open = len(self.config_data.get("open_questions_settings", {}).get("questions", []))
-        if file_path.lower().endswith(".csv"):
+        progress_window = tk.Toplevel(self)
+        progress_window.title("exporting")
+        progress_window.transient(self)
+        ttk.Label(progress_window, text=f"exporting to {os.path.basename(file_path)}").pack(padx=10, pady=5)
+        progress_bar = ttk.Progressbar(progress_window, length=300, maximum=len(self.responses))
+        progress_bar.pack(padx=10, pady=5)
+        cancel = threading.Event()
+        ttk.Button(progress_window, text="Cancel", command=cancel.set).pack(pady=5)
+        progress_window.protocol("WM_DELETE_WINDOW", cancel.set)
+        # the worker only reads this snapshot; saves replace list entries rather than mutate them
+        snapshot = list(self.responses)
+        state = {"done": 0, "finished": False, "error": None}
+
+        def progress(done, total):
+            state["done"] = done
+
+        def work():
             try:
-                import csv
-                with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile)
-                    header = ["Participant Number"]
-                    for i in range(1, num_ratings + 1):
-                        header.append(f"Rating {i}")
-                    for i in range(1, num_open + 1):
-                        header.append(f"Open Answer {i}")
-                    writer.writerow(header)
-                    for resp in self.responses:
-                        row = [resp.get("participant_number", "")]
-                        ratings = resp.get("ratings", {})
-                        for i in range(1, num_ratings + 1):
-                            row.append(ratings.get(f"rating_{i}", ""))
-                        open_answers = resp.get("open_answers", {})
-                        for i in range(1, num_open + 1):
-                            row.append(open_answers.get(f"open_{i}", ""))
-                        writer.writerow(row)
-                messagebox.showinfo("success", f"responses exported as csv to {file_path}")
+                with self.instrumentation.timed("export", items=len(snapshot)) as payload:
+                    export_file(file_path, snapshot, self.config_data, progress, cancel)
+                    payload["nbytes"] = os.path.getsize(file_path)
             except Exception as e:
-                messagebox.showerror("export error", f"error exporting csv: {e}")
+                state["error"] = e
+            state["finished"] = True
+
+        threading.Thread(target=work, daemon=True).start()
+        self.after(100, lambda: self.poll_export(file_path, state, progress_window, progress_bar))
+
+    def poll_export(self, file_path, state, progress_window, progress_bar):
+        progress_bar["value"] = state["done"]
+        if not state["finished"]:
+            self.after(100, lambda: self.poll_export(file_path, state, progress_window, progress_bar))
+            return
+        progress_window.destroy()
+        error = state["error"]
+        if isinstance(error, ExportCancelled):
+            messagebox.showinfo("export cancelled", "export cancelled, no file was written.")
+        elif error is not None:
+            messagebox.showerror("export error", f"error exporting: {error}")
         else:
+            messagebox.showinfo("success", f"responses exported to {file_path}")
+
+    # bulk import of a csv in the export layout: validated on a worker thread, saved in one batch
+    def import_responses(self):
+        from csv_import import ImportCancelled, read_csv
+        file_path = filedialog.askopenfilename(title="import responses", filetypes=[("csv files", "*.csv")])
+        if not file_path:
+            return
+        error_path = f"{os.path.splitext(file_path)[0]}.errors.csv"
+        progress_window = tk.Toplevel(self)
+        progress_window.title("importing")
+        progress_window.transient(self)
+        progress_label = ttk.Label(progress_window, text=f"reading {os.path.basename(file_path)}")
+        progress_label.pack(padx=10, pady=5)
+        progress_bar = ttk.Progressbar(progress_window, length=300, mode="indeterminate")
+        progress_bar.pack(padx=10, pady=5)
+        progress_bar.start()
+        cancel = threading.Event()
+        ttk.Button(progress_window, text="Cancel", command=cancel.set).pack(pady=5)
+        progress_window.protocol("WM_DELETE_WINDOW", cancel.set)
+        existing = {resp.get("participant_number", "") for resp in self.responses}
+        state = {"rows": 0, "finished": False, "error": None, "result": None}
+
+        def progress(rows):
+            state["rows"] = rows
+
+        def work():
             try:
-                with open(file_path, "w", encoding="utf-8") as f:
-                    for resp in self.responses:
-                        f.write(f"Participant: {resp.get('participant_number', '')}\n")
-                        f.write("Ratings:\n")
-                        for key, value in resp.get("ratings", {}).items():
-                            f.write(f"  {key}: {value}\n")
-                        f.write("Open Answers:\n")
-                        for key, value in resp.get("open_answers", {}).items():
-                            f.write(f"  {key}: {value}\n")
-                        f.write("-" * 40 + "\n")
-                messagebox.showinfo("success", f"responses exported to {file_path}")
+                state["result"] = read_csv(file_path, self.config_data, existing, progress, cancel, error_path)
             except Exception as e:
-                messagebox.showerror("export error", f"error exporting: {e}")
+                state["error"] = e
+            state["finished"] = True
+
+        def poll():
+            progress_label.configure(text=f"reading {os.path.basename(file_path)}: {state['rows']} rows")
+            if not state["finished"]:
+                self.after(100, poll)
+                return
+            progress_window.destroy()
+            if isinstance(state["error"], ImportCancelled):
+                messagebox.showinfo("import cancelled", "import cancelled, nothing was imported.")
+            elif state["error"] is not None:
+                messagebox.showerror("import error", f"error importing: {state['error']}")
+            else:
+                self.apply_import(*state["result"], error_path)
+
+        if os.path.exists(error_path):
+            os.remove(error_path)
+        threading.Thread(target=work, daemon=True).start()
+        self.after(100, poll)
+
+    # append validated imported responses and persist them in one batch
+    def apply_import(self, valid, report, error_path):
+        if valid:
+            start = len(self.responses)
+            self.responses.extend(valid)
+            for index in range(start, len(self.responses)):
+                self.response_changed(index, self.responses[index])
+            with self.instrumentation.timed("import save", items=len(valid)):
+                self.store.extend(self.responses)
+            self.responses_saved()
+            self.update_participant_combobox()
+        message = f"{report['imported']} of {report['rows']} rows imported."
+        if report["errors"]:
+            shown = "\n".join(f"row {row}: {error}" for row, _, error in report["error_rows"][:15])
+            more = report["errors"] - min(report["errors"], 15)
+            message += f"\n\n{report['errors']} rows with errors:\n{shown}"
+            if more:
+                message += f"\n... and {more} more"
+            message += f"\n\nall errors are listed in {error_path}"
+            messagebox.showwarning("import finished with errors", message)
+        else:
+            messagebox.showinfo("import finished", message)
+
+    # search panel over all open answers, a hit opens that participant at the matching question
+    def open_search(self):
+        search_window = tk.Toplevel(self)
+        search_window.title("search open answers")
+        search_window.geometry("700x500")
+        query_var = tk.StringVar()
+        query_entry = ttk.Entry(search_window, textvariable=query_var)
+        query_entry.pack(fill="x", padx=5, pady=5)
+        status_label = ttk.Label(search_window, text="")
+        status_label.pack(anchor="w", padx=5)
+        tree = ttk.Treeview(search_window, columns=("participant", "question", "answer"), show="headings")
+        tree.heading("participant", text="participant")
+        tree.heading("question", text="question")
+        tree.heading("answer", text="answer")
+        tree.column("participant", width=90)
+        tree.column("question", width=80)
+        tree.column("answer", width=500)
+        tree.pack(fill="both", expand=True, padx=5, pady=5)
+        hits = {}
+
+        def run_search(*args):
+            tree.delete(*tree.get_children())
+            hits.clear()
+            if not query_var.get().strip():
+                status_label.configure(text="")
+                return
+            with self.instrumentation.timed("search") as payload:
+                results, total = self.get_answer_index().search(query_var.get())
+                payload["items"] = total
+            for index, key, score in results:
+                resp = self.responses[index]
+                answer = str(resp.get("open_answers", {}).get(key, "")).replace("\n", " ")
+                item = tree.insert("", tk.END, values=(resp.get("participant_number", ""), key, answer[:200]))
+                hits[item] = (index, key)
+            if total > len(results):
+                status_label.configure(text=f"{total} matches, best {len(results)} shown")
+            else:
+                status_label.configure(text=f"{total} matches")
+
+        # hits refer to positions in self.responses: list them again after every change
+        def refresh():
+            self.search_job = None
+            run_search()
+
+        def on_destroy(event):
+            if event.widget is search_window and self.search_refresh is refresh:
+                if self.search_job is not None:
+                    self.after_cancel(self.search_job)
+                    self.search_job = None
+                self.search_refresh = None
+
+        def open_hit(event):
+            selection = tree.selection()
+            if not selection or selection[0] not in hits:
+                return
+            index, key = hits[selection[0]]
+            if index >= len(self.responses):
+                return
+            self.current_index = index
+            self.load_response_to_gui()
+            self.notebook.select(self.open_questions_tab)
+            self.open_list.see(self.open_keys.index(key))
+
+        query_var.trace_add("write", run_search)
+        self.search_refresh = refresh
+        search_window.bind("<Destroy>", on_destroy)
+        tree.bind("<Double-1>", open_hit)
+        tree.bind("<Return>", open_hit)
+        query_entry.focus_set()
+
+    # diagnostics: timing table, json dump and one-shot cprofile capture
+    def open_diagnostics(self):
+        diag_window = tk.Toplevel(self)
+        diag_window.title("diagnostics")
+        diag_window.geometry("900x600")
+        columns = ("count", "mean_ms", "p50_ms", "p95_ms", "max_ms", "total_s", "items", "bytes")
+        tree = ttk.Treeview(diag_window, columns=columns, height=12)
+        tree.heading("#0", text="action")
+        tree.column("#0", width=180)
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=85, anchor="e")
+        tree.pack(fill="x", padx=5, pady=5)
+        controls = ttk.Frame(diag_window)
+        controls.pack(fill="x", padx=5)
+        profile_var = tk.StringVar()
+        profile_text = tk.Text(diag_window, wrap="none", height=15, font=("Courier", 9))
+
+        def refresh():
+            snapshot = self.instrumentation.snapshot()
+            tree.delete(*tree.get_children())
+            for name, stats in snapshot["actions"].items():
+                tree.insert("", tk.END, text=name, values=(
+                    stats["count"], f"{stats['mean_ms']:.1f}", stats["p50_ms"], stats["p95_ms"],
+                    f"{stats['max_ms']:.1f}", f"{stats['total_s']:.2f}", stats["items"], stats["bytes"]
+                ))
+            profile_box["values"] = sorted(snapshot["actions"])
+            profile_text.delete("1.0", tk.END)
+            for name, report in snapshot["profiles"].items():
+                profile_text.insert(tk.END, f"== {name} ==\n{report}\n")
+
+        def dump():
+            file_path = filedialog.asksaveasfilename(
+                title="save diagnostics", defaultextension=".json", filetypes=[("json files", "*.json")]
+            )
+            if file_path:
+                self.instrumentation.dump_json(file_path)
+
+        def arm_profile():
+            if profile_var.get():
+                self.instrumentation.profile_next(profile_var.get())
+                messagebox.showinfo("profiling", f"the next '{profile_var.get()}' will be profiled.", parent=diag_window)
+
+        def reset():
+            self.instrumentation.reset()
+            refresh()
+
+        ttk.Button(controls, text="Refresh", command=refresh).pack(side=tk.LEFT, padx=5)
+        ttk.Button(controls, text="Dump JSON", command=dump).pack(side=tk.LEFT, padx=5)
+        ttk.Button(controls, text="Reset", command=reset).pack(side=tk.LEFT, padx=5)
+        ttk.Label(controls, text="Profile next:").pack(side=tk.LEFT, padx=5)
+        profile_box = ttk.Combobox(controls, textvariable=profile_var, width=24)
+        profile_box.pack(side=tk.LEFT, padx=5)
+        ttk.Button(controls, text="Arm", command=arm_profile).pack(side=tk.LEFT, padx=5)
+        profile_text.pack(fill="both", expand=True, padx=5, pady=5)
+        refresh()
 
     # visualization
     def open_visualization_options(self):
@@ -348,96 +1263,28 @@ class QuestionnaireApp(tk.Tk):
         vis_window = tk.Toplevel(self)
         vis_window.title("visualizations")
         vis_window.geometry("1200x1000")
+        self.get_sandbox()
         notebook = ttk.Notebook(vis_window)
         notebook.pack(fill="both", expand=True)
-        self.figures = {}
-        # box plot
-        df = pd.DataFrame(self.responses)
-        df["Group"] = df["participant_number"].str[0]
-        rating_columns = [col for col in df.iloc[0]["ratings"].keys()]
-        for col in rating_columns:
-            df[col] = df["ratings"].apply(lambda x: x.get(col, np.nan))
-        rating_settings = self.config_data.get("rating_settings", {})
-        questions = rating_settings.get("questions", [])
-        start_val, end_val = rating_settings.get("default_rating_range", [1, 5])
-        for i, q_obj in enumerate(questions, start=1):
-            col_name = f"rating_{i}"
-            if q_obj.get("is_negative", False):
-                df[col_name] = df[col_name].apply(lambda val: (end_val + 1) - val if pd.notnull(val) else val)
-        grouped_data = {}
-        for group in df["Group"].unique():
-            group_rows = df[df["Group"] == group]
-            grouped_data[group] = group_rows[rating_columns].mean(axis=1)
-        fig_box, ax_box = plt.subplots(figsize=(10, 6))
-        ax_box.boxplot(
-            grouped_data.values(),
-            widths=0.7,
-            labels=grouped_data.keys(),
-            flierprops=dict(marker='o', color='red', markersize=6),
-            medianprops={'color': 'orange', 'linewidth': 2},
-            boxprops={'color': 'black', 'linewidth': 1.5},
-            whiskerprops={'color': 'black', 'linewidth': 1.5},
-            capprops={'color': 'black', 'linewidth': 1.5}
-        )
-        ax_box.set_title("box plot - group ratings with outliers")
-        ax_box.set_xlabel("groups")
-        ax_box.set_ylabel("ratings")
-        ax_box.grid(True, linestyle='--', alpha=0.7)
-        self.figures["Box Plot"] = fig_box
-        frame_box = ttk.Frame(notebook)
-        notebook.add(frame_box, text="Box Plot")
-        canvas_box = FigureCanvasTkAgg(fig_box, master=frame_box)
-        canvas_box.draw()
-        canvas_box.get_tk_widget().pack(fill="both", expand=True)
-        # heatmap
+        figures = {}
+        vis_window.protocol("WM_DELETE_WINDOW", lambda: self.close_visualization(vis_window, figures))
+        from plots import build_box_plot, build_heatmap, build_keyword_plot
+        matrix = self.get_rating_matrix().copy()
         colormap = self.config_data.get("visualization_settings", {}).get("plot_defaults", {}).get("heatmap_colormap", "viridis")
-        sorted_participants = sorted(
-            [resp["participant_number"] for resp in self.responses],
-            key=participant_sort_key
-        )
-        participant_dict = {}
-        for resp in self.responses:
-            pn = resp["participant_number"]
-            rating_dict = resp.get("ratings", {})
-            adjusted_scores = []
-            for i, q_obj in enumerate(questions, start=1):
-                raw_val = rating_dict.get(f"rating_{i}", "")
-                if isinstance(raw_val, int):
-                    val = raw_val
-                elif isinstance(raw_val, str) and raw_val.isdigit():
-                    val = int(raw_val)
-                else:
-                    val = np.nan
-                if not np.isnan(val) and q_obj.get("is_negative", False):
-                    val = (end_val + 1) - val
-                adjusted_scores.append(val)
-            participant_dict[pn] = adjusted_scores
-        data = np.array([participant_dict[pn] for pn in sorted_participants], dtype=float)
-        data_heat = data.T
-        fig_heatmap, ax_heatmap = plt.subplots(figsize=(8, 5))
-        im = ax_heatmap.imshow(
-            data_heat,
-            cmap=colormap,
-            aspect="auto",
-            vmin=start_val,
-            vmax=end_val
-        )
-        ax_heatmap.set_title("individual rating heatmap")
-        ax_heatmap.set_xlabel("participants")
-        ax_heatmap.set_ylabel("statement index")
-        ax_heatmap.set_xticks(np.arange(len(sorted_participants)))
-        ax_heatmap.set_xticklabels(sorted_participants, rotation=45, ha="right", fontsize=6)
-        ax_heatmap.set_yticks(np.arange(len(questions)))
-        ax_heatmap.set_yticklabels([f"{i}" for i in range(1, len(questions) + 1)])
-        cbar = fig_heatmap.colorbar(im, ax=ax_heatmap)
-        cbar.ax.set_ylabel(f"score range ({start_val}-{end_val})", rotation=-90, va="bottom")
-        fig_heatmap.tight_layout()
-        self.figures["Heatmap"] = fig_heatmap
-        frame_heat = ttk.Frame(notebook)
-        notebook.add(frame_heat, text="Heatmap")
-        canvas_heat = FigureCanvasTkAgg(fig_heatmap, master=frame_heat)
-        canvas_heat.draw()
-        canvas_heat.get_tk_widget().pack(fill="both", expand=True)
+        # scoring settings every standard plot depends on
+        scoring = (matrix.start_val, matrix.end_val, tuple(matrix.negative.tolist()))
+        lazy_tabs = LazyTabs(self, notebook, figures, self.figure_cache, self.instrumentation)
+        lazy_tabs.add("Box Plot", lambda: build_box_plot(matrix), key=("Box Plot", matrix.version, scoring))
+        lazy_tabs.add("Heatmap", lambda: build_heatmap(matrix, colormap), key=("Heatmap", matrix.version, scoring + (colormap,)))
+        keyword_settings = self.config_data.get("keyword_settings", {})
+        if keyword_settings.get("keywords"):
+            responses = list(self.responses)
+            lazy_tabs.add(
+                "Keywords", lambda: build_keyword_plot(self.get_keyword_counts(responses, matrix.version)),
+                key=("Keywords", matrix.version, json.dumps(keyword_settings, sort_keys=True))
+            )
+        lazy_tabs.render_selected()
+        self.create_statistics_tab(notebook, matrix)
         # custom plot tab
         frame_custom = ttk.Frame(notebook)
         notebook.add(frame_custom, text="Custom Plot")
@@ -446,7 +1293,8 @@ class QuestionnaireApp(tk.Tk):
             text=(
                 "'responses' is provided by the app. Each response is a dict with keys:\n"
                 "• 'participant_number'\n"
-                "• 'ratings' (which is itself a dict)."
+                "• 'ratings' (which is itself a dict).\n"
+                "'df' holds the same data with one numeric column per rating (rating_1, ...) and a 'Group' column."
             )
         ).pack(pady=5)
         custom_code_text = tk.Text(frame_custom, wrap="word", height=15)
@@ -482,16 +1330,88 @@ ax.set_ylabel("average rating")
 plt.xticks(rotation=45)
 '''
         custom_code_text.insert("1.0", sample_code)
-        ttk.Button(frame_custom, text="Run Custom Code",
-                   command=lambda: self.run_custom_code(custom_code_text, notebook)
-                  ).pack(pady=5)
-        ttk.Button(vis_window, text="Save Plot", command=lambda: self.save_plot(notebook)).pack(pady=5)
+        run_frame = ttk.Frame(frame_custom)
+        run_frame.pack(pady=5)
+        run_button = ttk.Button(run_frame, text="Run Custom Code")
+        run_button.pack(side=tk.LEFT, padx=5)
+        cancel_button = ttk.Button(run_frame, text="Cancel", state="disabled")
+        cancel_button.pack(side=tk.LEFT, padx=5)
+        run_status = tk.StringVar()
+        ttk.Label(run_frame, textvariable=run_status).pack(side=tk.LEFT, padx=5)
+        run_controls = (run_button, cancel_button, run_status)
+        run_button.configure(command=lambda: self.run_custom_code(custom_code_text, notebook, figures, run_controls))
+        bottom_frame = ttk.Frame(vis_window)
+        bottom_frame.pack(pady=5)
+        ttk.Button(bottom_frame, text="Save Plot", command=lambda: self.save_plot(notebook, figures)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(bottom_frame, text="Save All Plots", command=lambda: self.save_all_plots(vis_window)).pack(side=tk.LEFT, padx=5)
+        if keyword_settings.get("keywords"):
+            ttk.Button(bottom_frame, text="Export Keyword Counts", command=self.export_keyword_counts).pack(side=tk.LEFT, padx=5)
+
+    # statistics tab: descriptives, reliability and bootstrap group differences, computed on request
+    def create_statistics_tab(self, notebook, matrix):
+        frame_stats = ttk.Frame(notebook)
+        notebook.add(frame_stats, text="Statistics")
+        controls = ttk.Frame(frame_stats)
+        controls.pack(fill="x", padx=5, pady=5)
+        ttk.Label(controls, text="Bootstrap resamples:").pack(side=tk.LEFT, padx=5)
+        resamples_var = tk.IntVar(value=10000)
+        ttk.Spinbox(controls, from_=100, to=100000, increment=1000, textvariable=resamples_var, width=8).pack(side=tk.LEFT)
+        compute_button = ttk.Button(controls, text="Compute")
+        compute_button.pack(side=tk.LEFT, padx=5)
+        report_text = tk.Text(frame_stats, wrap="none", font=("Courier", 10))
+        report_text.pack(fill="both", expand=True, padx=5, pady=5)
+
+        def compute():
+            from stats import compute_statistics, format_report
+            try:
+                resamples = int(resamples_var.get())
+            except (tk.TclError, ValueError):
+                resamples = 0
+            if resamples < 1:
+                messagebox.showerror("error", "resamples must be a whole number of at least 1.")
+                return
+            compute_button.configure(state="disabled")
+            report_text.delete("1.0", tk.END)
+            report_text.insert(tk.END, "computing...")
+            state = {"finished": False, "report": None, "error": None}
+
+            def work():
+                try:
+                    with self.instrumentation.timed("statistics", items=matrix.size):
+                        state["report"] = format_report(compute_statistics(matrix, resamples))
+                except Exception as e:
+                    state["error"] = e
+                state["finished"] = True
+
+            def poll():
+                if not state["finished"]:
+                    frame_stats.after(100, poll)
+                    return
+                compute_button.configure(state="normal")
+                report_text.delete("1.0", tk.END)
+                if state["error"] is not None:
+                    report_text.insert(tk.END, f"error: {state['error']}")
+                else:
+                    report_text.insert(tk.END, state["report"])
+
+            threading.Thread(target=work, daemon=True).start()
+            frame_stats.after(100, poll)
+
+        compute_button.configure(command=compute)
+
+    # close a visualization window and free the figures only it was using
+    def close_visualization(self, vis_window, figures):
+        for fig in figures.values():
+            if not self.figure_cache.holds(fig):
+                close_figure(fig)
+        figures.clear()
+        vis_window.destroy()
 
     # save plot
-    def save_plot(self, notebook):
+    def save_plot(self, notebook, figures):
         current_tab = notebook.select()
         tab_text = notebook.tab(current_tab, "text")
-        fig = self.figures.get(tab_text)
+        fig = figures.get(tab_text)
         if not fig:
             messagebox.showerror("error", "no plot available to save.")
             return
@@ -504,55 +1424,147 @@ plt.xticks(rotation=45)
             fig.savefig(file_path)
             messagebox.showinfo("success", f"plot saved to {file_path}")
 
-    # custom code exec
-    def run_custom_code(self, text_widget, notebook):
+    # every plot incl. per-group and per-item variants to a directory, rendered in a process pool
+    def save_all_plots(self, parent):
+        from plot_export import EXPORT_FORMATS
+        dialog = tk.Toplevel(parent)
+        dialog.title("save all plots")
+        dialog.transient(parent)
+        ttk.Label(dialog, text="formats:").pack(padx=10, pady=5)
+        format_vars = {}
+        for fmt in EXPORT_FORMATS:
+            format_vars[fmt] = tk.BooleanVar(value=fmt == "png")
+            ttk.Checkbutton(dialog, text=fmt, variable=format_vars[fmt]).pack(anchor="w", padx=20)
+
+        def choose_directory():
+            formats = [fmt for fmt, var in format_vars.items() if var.get()]
+            if not formats:
+                messagebox.showerror("error", "select at least one format.", parent=dialog)
+                return
+            out_dir = filedialog.askdirectory(title="save all plots to", parent=dialog)
+            if not out_dir:
+                return
+            dialog.destroy()
+            self.start_plot_export(parent, out_dir, formats)
+
+        ttk.Button(dialog, text="Choose Folder and Save", command=choose_directory).pack(padx=10, pady=10)
+
+    def start_plot_export(self, parent, out_dir, formats):
+        from plot_export import save_all_plots
+        matrix = self.get_rating_matrix().copy()
+        colormap = self.config_data.get("visualization_settings", {}).get("plot_defaults", {}).get("heatmap_colormap", "viridis")
+        snapshot = list(self.responses)
+        with_keywords = bool(self.config_data.get("keyword_settings", {}).get("keywords"))
+        progress_window = tk.Toplevel(parent)
+        progress_window.title("saving plots")
+        progress_window.transient(parent)
+        ttk.Label(progress_window, text=f"saving plots to {out_dir}").pack(padx=10, pady=5)
+        progress_bar = ttk.Progressbar(progress_window, length=300)
+        progress_bar.pack(padx=10, pady=5)
+        state = {"done": 0, "total": 0, "finished": False, "error": None, "result": None}
+
+        def progress(done, total):
+            state["done"], state["total"] = done, total
+
+        def work():
+            try:
+                counts = self.get_keyword_counts(snapshot, matrix.version) if with_keywords else None
+                with self.instrumentation.timed("save all plots") as payload:
+                    state["result"] = save_all_plots(matrix, out_dir, formats, colormap, counts, progress=progress)
+                    payload["items"] = len(state["result"][0])
+            except Exception as e:
+                state["error"] = e
+            state["finished"] = True
+
+        threading.Thread(target=work, daemon=True).start()
+        self.after(100, lambda: self.poll_plot_export(out_dir, state, progress_window, progress_bar))
+
+    def poll_plot_export(self, out_dir, state, progress_window, progress_bar):
+        progress_bar.configure(maximum=max(state["total"], 1), value=state["done"])
+        if not state["finished"]:
+            self.after(100, lambda: self.poll_plot_export(out_dir, state, progress_window, progress_bar))
+            return
+        progress_window.destroy()
+        if state["error"] is not None:
+            messagebox.showerror("error", f"error saving plots: {state['error']}")
+            return
+        written, skipped = state["result"]
+        messagebox.showinfo("success", f"{len(written)} files saved to {out_dir}, {len(skipped)} unchanged plots skipped.")
+
+    # keyword counts per keyword, open question and group to csv
+    def export_keyword_counts(self):
+        from export import write_keyword_csv
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".csv", filetypes=[("csv files", "*.csv")], title="export keyword counts"
+        )
+        if not file_path:
+            return
+        try:
+            write_keyword_csv(file_path, self.get_keyword_counts(list(self.responses), self.get_rating_matrix().version))
+        except Exception as e:
+            messagebox.showerror("error", f"failed to export keyword counts: {e}")
+            return
+        messagebox.showinfo("success", f"keyword counts exported to {file_path}")
+
+    # custom code worker pool, started (and warmed up) on first use
+    def get_sandbox(self):
+        if self.sandbox is None:
+            self.sandbox = SandboxPool.from_config(self.config_data)
+            self.sandbox.start()
+        return self.sandbox
+
+    # custom code exec, in a sandboxed worker process
+    def run_custom_code(self, text_widget, notebook, figures, run_controls):
+        run_button, cancel_button, run_status = run_controls
         code = text_widget.get("1.0", tk.END)
         try:
-            compiled_code = compile(code, '<string>', 'exec')
+            compile(code, '<string>', 'exec')
         except Exception:
             messagebox.showerror("syntax error", f"syntax error in custom code:\n{traceback.format_exc()}")
             return
-        rating_settings = self.config_data.get("rating_settings", {})
-        open_questions_settings = self.config_data.get("open_questions_settings", {})
-        keyword_settings = self.config_data.get("keyword_settings", {})
-        visualization_settings = self.config_data.get("visualization_settings", {})
-        try:
-            df = pd.DataFrame(self.responses)
-            if not df.empty and "ratings" in df.columns:
-                rating_columns = list(df.iloc[0]["ratings"].keys())
-                for col in rating_columns:
-                    df[col] = df["ratings"].apply(lambda x: x.get(col, np.nan))
-        except Exception:
-            df = None
-        local_ns = {
-            'plt': plt,
-            'np': np,
-            'pd': pd,
-            'responses': self.responses,
+        # pickled later on the supervisor thread: a snapshot, like the export (entries are replaced
+        # on save, never mutated)
+        payload = {
+            'responses': list(self.responses),
             'config': self.config_data,
-            'rating_settings': rating_settings,
-            'open_questions_settings': open_questions_settings,
-            'keyword_settings': keyword_settings,
-            'visualization_settings': visualization_settings,
-            'df': df
+            'matrix': self.get_rating_matrix().copy()
         }
-        try:
-            exec(compiled_code, local_ns)
-            if 'fig' in local_ns and isinstance(local_ns['fig'], plt.Figure):
-                fig = local_ns['fig']
-            else:
-                messagebox.showerror("no figure", "custom code did not produce a valid matplotlib figure (expected variable 'fig').")
-                return
-            frame_new = ttk.Frame(notebook)
-            tab_name = f"Custom Plot {len(notebook.tabs())}"
-            notebook.add(frame_new, text=tab_name)
-            canvas_new = FigureCanvasTkAgg(fig, master=frame_new)
-            canvas_new.draw()
-            canvas_new.get_tk_widget().pack(fill="both", expand=True)
-            self.figures[tab_name] = fig
-            notebook.select(frame_new)
-        except Exception:
-            messagebox.showerror("error executing code", f"error executing custom code:\n{traceback.format_exc()}")
+        job = self.get_sandbox().run(code, payload)
+        run_button.configure(state="disabled")
+        cancel_button.configure(state="normal", command=job.cancel)
+        run_status.set("running...")
+        self.after(100, lambda: self.poll_custom_code(job, notebook, figures, run_controls))
+
+    # wait for the worker without blocking the tk loop
+    def poll_custom_code(self, job, notebook, figures, run_controls):
+        if not notebook.winfo_exists():
+            job.cancel()
+            return
+        if not job.done:
+            self.after(100, lambda: self.poll_custom_code(job, notebook, figures, run_controls))
+            return
+        self.instrumentation.record(
+            "custom code", time.perf_counter() - job.started, items=len(self.responses),
+            nbytes=len(job.result[1]) if job.result[0] == "ok" else None
+        )
+        run_button, cancel_button, run_status = run_controls
+        run_button.configure(state="normal")
+        cancel_button.configure(state="disabled")
+        run_status.set("")
+        if job.result[0] != "ok":
+            messagebox.showerror("error executing code", job.result[1])
+            return
+        fig = job.figure()
+        png = job.result[2]
+        frame_new = ttk.Frame(notebook)
+        tab_name = f"Custom Plot {len(notebook.tabs())}"
+        notebook.add(frame_new, text=tab_name)
+        image = tk.PhotoImage(master=frame_new, data=png)
+        label = ttk.Label(frame_new, image=image)
+        label.image = image
+        label.pack(fill="both", expand=True)
+        figures[tab_name] = fig
+        notebook.select(frame_new)
 
 if __name__ == "__main__":
     app = QuestionnaireApp()
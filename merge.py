@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+
+from schema import SCHEMA_VERSION, decode_response, encode_response, is_header
+from storage import participant_sort_key, write_json_atomic
+
+# merge the response files of several data-entry stations into one dataset
+#
+#   report = merge_files(["station1.json", "station2.json"], "merged.json", state_path="merge_state.json")
+#
+# records are compared per participant_number by a hash of their content: identical copies are
+# duplicates and merged, different contents for the same participant are conflicts. with a state
+# file only files whose size or mtime changed since the last run are parsed again. input files
+# are parsed incrementally, one response at a time, and the merged file is written the same way:
+# the state holds hashes and byte ranges only, the records kept are read back from their source.
+
+READ_CHUNK_SIZE = 1 << 16
+CONFLICT_POLICIES = ["skip", "first", "last"]
+# layout of the state file; states written with another one are ignored (every input is parsed)
+STATE_FORMAT = 2
+
+
+class MergeError(Exception):
+    pass
+
+
+# stable hash of a response, independent of key order and formatting
+def response_hash(response):
+    canonical = json.dumps(response, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+# yield the responses of a json array file without holding the whole file in memory
+# (either schema version, see schema.py). with offsets, yields (response, byte offset, byte length)
+# of each element, for read_response
+def iter_responses(path, chunk_size=READ_CHUNK_SIZE, offsets=False):
+    decoder = json.JSONDecoder()
+    # newline="" keeps the text positions in step with the bytes of the file
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        buffer = ""
+        pos = 0
+        # byte offset of buffer[mark], advanced as elements are consumed
+        base = 0
+        mark = 0
+        started = False
+        first = True
+        eof = False
+        while True:
+            # skip whitespace and separators between elements
+            while pos < len(buffer) and (buffer[pos].isspace() or (started and buffer[pos] == ",")):
+                pos += 1
+            if pos == len(buffer):
+                if eof:
+                    raise MergeError(f"{path}: unexpected end of file")
+                base += len(buffer[mark:].encode("utf-8"))
+                buffer, pos, mark = f.read(chunk_size), 0, 0
+                eof = not buffer
+                continue
+            if not started:
+                if buffer[pos] != "[":
+                    raise MergeError(f"{path}: expected a list of responses")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                obj, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # element cut off at the chunk end: read more and retry
+                more = f.read(chunk_size)
+                if not more:
+                    raise MergeError(f"{path}: invalid json near offset {pos}")
+                base += len(buffer[mark:pos].encode("utf-8"))
+                buffer, pos, mark = buffer[pos:] + more, 0, 0
+                continue
+            start = base + len(buffer[mark:pos].encode("utf-8"))
+            length = len(buffer[pos:end].encode("utf-8"))
+            base, mark = start + length, end
+            pos = end
+            if first and is_header(obj):
+                if obj["schema"] > SCHEMA_VERSION:
+                    raise MergeError(f"{path}: written with a newer schema (version {obj['schema']})")
+                first = False
+                continue
+            first = False
+            if not isinstance(obj, (dict, list)):
+                raise MergeError(f"{path}: expected a list of responses")
+            if offsets:
+                yield decode_response(obj), start, length
+            else:
+                yield decode_response(obj)
+
+
+# the response at a byte range reported by iter_responses, from an open binary file
+def read_response(f, offset, length):
+    f.seek(offset)
+    return decode_response(json.loads(f.read(length).decode("utf-8")))
+
+
+# what the last merge saw: per input file its size/mtime and a (participant, hash, byte offset,
+# byte length) entry per record. the records themselves stay in the input files
+class MergeState:
+    def __init__(self, files=None):
+        self.files = files or {}
+
+    @classmethod
+    def load(cls, path):
+        if path is None or not os.path.isfile(path):
+            return cls()
+        with open(path, "r") as f:
+            data = json.load(f)
+        if data.get("format") != STATE_FORMAT:
+            return cls()
+        return cls(data.get("files", {}))
+
+    def save(self, path):
+        write_json_atomic(path, {"format": STATE_FORMAT, "files": self.files})
+
+    # parse the file again if it is new or changed, returns True when it was parsed
+    def update_file(self, path):
+        stat = os.stat(path)
+        key = os.path.abspath(path)
+        known = self.files.get(key)
+        if known is not None and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            return False
+        entries = []
+        for response, offset, length in iter_responses(path, offsets=True):
+            entries.append([response.get("participant_number", ""), response_hash(response), offset, length])
+        self.files[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "records": entries}
+        return True
+
+    # forget inputs that are not part of this merge
+    def retain(self, paths):
+        keep = {os.path.abspath(path) for path in paths}
+        self.files = {key: info for key, info in self.files.items() if key in keep}
+
+
+# merge the files into out_path, returns a report with counts and the conflicts found
+# on_conflict: "skip" leaves conflicting participants out, "first"/"last" keep the version
+# seen first/last going through the files in the given order
+def merge_files(paths, out_path, state_path=None, on_conflict="skip"):
+    if on_conflict not in CONFLICT_POLICIES:
+        raise ValueError(f"on_conflict must be one of {CONFLICT_POLICIES}")
+    state = MergeState.load(state_path)
+    report = {"files_parsed": 0, "files_unchanged": 0, "records": 0, "unnamed": 0,
+              "duplicates": 0, "participants": 0, "conflicts": {}}
+    for path in paths:
+        if state.update_file(path):
+            report["files_parsed"] += 1
+        else:
+            report["files_unchanged"] += 1
+    state.retain(paths)
+
+    # participant -> {hash: [source files]} in input order, the hash seen last per participant and
+    # where the first copy of every hash is stored
+    versions = {}
+    last_seen = {}
+    locations = {}
+    for path in paths:
+        for pn, digest, offset, length in state.files[os.path.abspath(path)]["records"]:
+            report["records"] += 1
+            if not pn:
+                report["unnamed"] += 1
+                continue
+            sources = versions.setdefault(pn, {}).setdefault(digest, [])
+            if sources:
+                report["duplicates"] += 1
+            sources.append(path)
+            last_seen[pn] = digest
+            locations.setdefault(digest, (path, offset, length))
+
+    merged = []
+    for pn in sorted(versions, key=participant_sort_key):
+        by_hash = versions[pn]
+        if len(by_hash) > 1:
+            report["conflicts"][pn] = [{"hash": digest, "sources": sources} for digest, sources in by_hash.items()]
+            if on_conflict == "skip":
+                continue
+            digest = next(iter(by_hash)) if on_conflict == "first" else last_seen[pn]
+        else:
+            digest = next(iter(by_hash))
+        merged.append(locations[digest])
+    report["participants"] = len(merged)
+    _write_merged(out_path, merged)
+    if state_path is not None:
+        state.save(state_path)
+    return report
+
+
+# write the records at the given (path, offset, length) locations as a version 2 file, one at a
+# time, through a temp file that is swapped in
+def _write_merged(out_path, locations):
+    tmp_path = f"{out_path}.tmp"
+    sources = {}
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as out:
+            out.write("[" + json.dumps({"schema": SCHEMA_VERSION}))
+            for path, offset, length in locations:
+                if path not in sources:
+                    sources[path] = open(path, "rb")
+                row = encode_response(read_response(sources[path], offset, length))
+                out.write(",\n" + json.dumps(row, ensure_ascii=False, separators=(",", ":")))
+            out.write("]\n")
+            out.flush()
+            os.fsync(out.fileno())
+    finally:
+        for f in sources.values():
+            f.close()
+    os.replace(tmp_path, out_path)
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from storage import write_json_atomic
+
+# "save all plots": every standard plot plus per-group heatmaps and per-item box plots,
+# rendered with agg in a process pool and written to one directory
+#
+# each plot gets a hash of the data it is drawn from and its settings; outputs whose hash is in
+# the directory's manifest (and whose files still exist) are left alone, so re-exporting after a
+# few new participants only redraws the plots they changed.
+
+MANIFEST_FILENAME = ".plots_manifest.json"
+EXPORT_FORMATS = ["png", "pdf", "svg"]
+
+# worker process state, set once per worker by _init_worker
+_worker_data = {}
+
+
+def _digest(*parts):
+    sha = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            sha.update(np.ascontiguousarray(part).tobytes())
+        else:
+            sha.update(json.dumps(part, sort_keys=True, default=str).encode("utf-8"))
+        sha.update(b"\0")
+    return sha.hexdigest()
+
+
+# file-name friendly group label
+def _safe_name(label):
+    return "".join(ch if ch.isalnum() else "_" for ch in label) or "_"
+
+
+# label -> file name part for each group. names that would clash on a case-insensitive file
+# system ("A" and "a", or two labels that both become "_") get a numbered suffix, handed out in
+# sorted label order so a label keeps its name from one export to the next
+def _group_names(labels):
+    names = {}
+    taken = set()
+    for label in sorted(labels):
+        base = _safe_name(label)
+        name = base
+        number = 1
+        while name.lower() in taken:
+            number += 1
+            name = f"{base}_{number}"
+        taken.add(name.lower())
+        names[label] = name
+    return names
+
+
+# (name, kind, argument, hash) for every plot the export produces
+def plot_specs(matrix, colormap, counts=None):
+    scoring = [matrix.start_val, matrix.end_val, matrix.negative.tolist()]
+    codes = matrix.groups()
+    labels = [matrix.group_labels[code] for code in codes]
+    everything = _digest(matrix.raw(), labels, matrix.participants, scoring)
+    specs = [
+        ("boxplot", "boxplot", None, _digest("boxplot", everything)),
+        ("heatmap", "heatmap", None, _digest("heatmap", everything, colormap)),
+    ]
+    if counts is not None and counts.keywords:
+        specs.append(("keywords", "keywords", None, _digest(
+            "keywords", counts.keywords, counts.open_keys, counts.groups, counts.occurrences
+        )))
+    unique_codes = np.unique(codes)
+    names = _group_names([matrix.group_labels[code] for code in unique_codes])
+    for code in unique_codes:
+        rows = codes == code
+        label = matrix.group_labels[code]
+        specs.append((f"heatmap_group_{names[label]}", "group_heatmap", int(code), _digest(
+            "group_heatmap", label, matrix.raw()[rows], [p for p, keep in zip(matrix.participants, rows) if keep],
+            scoring, colormap
+        )))
+    for item in range(matrix.num_items):
+        statement = matrix.questions[item].get("statement", "")
+        specs.append((f"item_{item + 1:02d}", "item", item, _digest(
+            "item", matrix.raw()[:, item], labels, statement, scoring
+        )))
+    return specs
+
+
+def _init_worker(matrix, colormap, counts):
+    import matplotlib
+    matplotlib.use("Agg")
+    _worker_data.update(matrix=matrix, colormap=colormap, counts=counts)
+
+
+def _render(name, kind, argument, out_dir, formats):
+    from plots import build_box_plot, build_heatmap, build_item_plot, build_keyword_plot
+
+    matrix = _worker_data["matrix"]
+    colormap = _worker_data["colormap"]
+    if kind == "boxplot":
+        fig = build_box_plot(matrix)
+    elif kind == "heatmap":
+        fig = build_heatmap(matrix, colormap)
+    elif kind == "keywords":
+        fig = build_keyword_plot(_worker_data["counts"])
+    elif kind == "group_heatmap":
+        fig = build_heatmap(matrix.select(matrix.groups() == argument), colormap)
+        fig.axes[0].set_title(f"individual rating heatmap - group {matrix.group_labels[argument]}")
+    else:
+        fig = build_item_plot(matrix, argument)
+    written = []
+    for fmt in formats:
+        path = os.path.join(out_dir, f"{name}.{fmt}")
+        fig.savefig(path)
+        written.append(path)
+    return written
+
+
+def _read_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_FILENAME), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# render every plot to out_dir in the given formats, returns (written paths, skipped plot names)
+# progress(done, total) is called as plots finish (from the calling thread)
+def save_all_plots(matrix, out_dir, formats=("png",), colormap="viridis", counts=None, jobs=None, progress=None):
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = _read_manifest(out_dir)
+    formats = list(formats)
+    todo = []
+    skipped = []
+    for name, kind, argument, plot_hash in plot_specs(matrix, colormap, counts):
+        plot_hash = _digest(plot_hash, formats)
+        known = manifest.get(name)
+        if known is not None and known["hash"] == plot_hash and all(os.path.isfile(path) for path in known["files"]):
+            skipped.append(name)
+        else:
+            todo.append((name, kind, argument, plot_hash))
+    written = []
+    if todo:
+        # spawn: the app calls this with tk running, which must not be forked
+        with ProcessPoolExecutor(
+            max_workers=min(jobs or os.cpu_count() or 1, len(todo)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker, initargs=(matrix, colormap, counts)
+        ) as pool:
+            futures = [(spec, pool.submit(_render, spec[0], spec[1], spec[2], out_dir, formats)) for spec in todo]
+            try:
+                for done, ((name, _, _, plot_hash), future) in enumerate(futures, start=1):
+                    files = future.result()
+                    written += files
+                    manifest[name] = {"hash": plot_hash, "files": files}
+                    if progress is not None:
+                        progress(done, len(todo))
+            finally:
+                # plots finished before a failure are not redrawn next time
+                write_json_atomic(os.path.join(out_dir, MANIFEST_FILENAME), manifest, indent=2)
+    return written, skipped
@@ -0,0 +1,122 @@
+import io
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+# standard plots, built on plain Figure objects (no pyplot state) so they can be
+# created and rasterized off the Tk thread
+
+
+# box plot of per-participant mean ratings, one box per group
+def build_box_plot(matrix):
+    grouped_data = matrix.group_means()
+    fig_box = Figure(figsize=(10, 6))
+    FigureCanvasAgg(fig_box)
+    ax_box = fig_box.add_subplot()
+    ax_box.boxplot(
+        grouped_data.values(),
+        widths=0.7,
+        tick_labels=grouped_data.keys(),
+        flierprops=dict(marker='o', color='red', markersize=6),
+        medianprops={'color': 'orange', 'linewidth': 2},
+        boxprops={'color': 'black', 'linewidth': 1.5},
+        whiskerprops={'color': 'black', 'linewidth': 1.5},
+        capprops={'color': 'black', 'linewidth': 1.5}
+    )
+    ax_box.set_title("box plot - group ratings with outliers")
+    ax_box.set_xlabel("groups")
+    ax_box.set_ylabel("ratings")
+    ax_box.grid(True, linestyle='--', alpha=0.7)
+    return fig_box
+
+
+# heatmap of reverse-scored ratings, statements x participants
+def build_heatmap(matrix, colormap):
+    start_val, end_val = matrix.start_val, matrix.end_val
+    sorted_participants = matrix.sorted_participants()
+    data_heat = matrix.heatmap_data()
+    fig_heatmap = Figure(figsize=(8, 5))
+    FigureCanvasAgg(fig_heatmap)
+    ax_heatmap = fig_heatmap.add_subplot()
+    im = ax_heatmap.imshow(
+        data_heat,
+        cmap=colormap,
+        aspect="auto",
+        vmin=start_val,
+        vmax=end_val
+    )
+    ax_heatmap.set_title("individual rating heatmap")
+    ax_heatmap.set_xlabel("participants")
+    ax_heatmap.set_ylabel("statement index")
+    ax_heatmap.set_xticks(np.arange(len(sorted_participants)))
+    ax_heatmap.set_xticklabels(sorted_participants, rotation=45, ha="right", fontsize=6)
+    ax_heatmap.set_yticks(np.arange(matrix.num_items))
+    ax_heatmap.set_yticklabels([f"{i}" for i in range(1, matrix.num_items + 1)])
+    cbar = fig_heatmap.colorbar(im, ax=ax_heatmap)
+    cbar.ax.set_ylabel(f"score range ({start_val}-{end_val})", rotation=-90, va="bottom")
+    fig_heatmap.tight_layout()
+    return fig_heatmap
+
+
+# one statement: box plot of its (reverse-scored) ratings per group
+def build_item_plot(matrix, item):
+    scored = matrix.scored()[:, item]
+    codes = matrix.groups()
+    present, first_seen = np.unique(codes, return_index=True)
+    present = present[np.argsort(first_seen)]
+    data = [scored[codes == code] for code in present]
+    fig_item = Figure(figsize=(8, 5))
+    FigureCanvasAgg(fig_item)
+    ax_item = fig_item.add_subplot()
+    ax_item.boxplot(
+        [values[~np.isnan(values)] for values in data],
+        widths=0.7,
+        tick_labels=[matrix.group_labels[code] for code in present],
+        medianprops={'color': 'orange', 'linewidth': 2}
+    )
+    statement = matrix.questions[item].get("statement", f"Question {item + 1}")
+    ax_item.set_title(f"rating {item + 1}: {statement}", fontsize=9)
+    ax_item.set_xlabel("groups")
+    ax_item.set_ylabel("score")
+    ax_item.set_ylim(matrix.start_val - 0.5, matrix.end_val + 0.5)
+    ax_item.grid(True, linestyle='--', alpha=0.7)
+    return fig_item
+
+
+# keyword occurrences: totals split by group, and per open question
+def build_keyword_plot(counts):
+    fig_keywords = Figure(figsize=(10, 8))
+    FigureCanvasAgg(fig_keywords)
+    ax_groups, ax_questions = fig_keywords.subplots(2, 1)
+    positions = np.arange(len(counts.keywords))
+    per_group = counts.per_group()
+    bottom = np.zeros(len(counts.keywords))
+    for g, group in enumerate(counts.groups):
+        ax_groups.bar(positions, per_group[g], bottom=bottom, label=group or "(none)")
+        bottom += per_group[g]
+    ax_groups.set_title("keyword occurrences by group")
+    ax_groups.set_ylabel("occurrences")
+    ax_groups.set_xticks(positions)
+    ax_groups.set_xticklabels(counts.keywords, rotation=45, ha="right")
+    if counts.groups:
+        ax_groups.legend(title="group")
+    per_question = counts.per_question()
+    width = 0.8 / max(len(counts.open_keys), 1)
+    for q, key in enumerate(counts.open_keys):
+        ax_questions.bar(positions + q * width, per_question[q], width=width, label=key)
+    ax_questions.set_title("keyword occurrences by open question")
+    ax_questions.set_ylabel("occurrences")
+    ax_questions.set_xticks(positions + width * (len(counts.open_keys) - 1) / 2)
+    ax_questions.set_xticklabels(counts.keywords, rotation=45, ha="right")
+    if counts.open_keys:
+        ax_questions.legend(title="question")
+    fig_keywords.tight_layout()
+    return fig_keywords
+
+
+# rasterize a figure with agg and return png bytes (tk can show these directly)
+def render_png(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    return buffer.getvalue()
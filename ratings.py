@@ -0,0 +1,199 @@
+import numpy as np
+import pandas as pd
+
+from storage import participant_sort_key
+
+
+# parse a stored rating value the way the heatmap always has: ints and digit strings count, anything else is missing
+def parse_rating(raw_val):
+    if isinstance(raw_val, int):
+        return raw_val
+    if isinstance(raw_val, str) and raw_val.isdigit():
+        return int(raw_val)
+    return np.nan
+
+
+# columnar participant x item ratings store shared by the visualizations and custom code
+#
+# row i always mirrors responses[i]. missing ratings are NaN, participants are grouped by the
+# first character of their id (like the box plot always did). every change bumps `version`.
+class RatingMatrix:
+    def __init__(self, config_data, capacity=64):
+        rating_settings = config_data.get("rating_settings", {})
+        self.questions = rating_settings.get("questions", [])
+        self.start_val, self.end_val = rating_settings.get("default_rating_range", [1, 5])
+        self.num_items = len(self.questions)
+        self.negative = np.array([q.get("is_negative", False) for q in self.questions], dtype=bool)
+        self.keys = [f"rating_{i}" for i in range(1, self.num_items + 1)]
+        self.values = np.full((capacity, self.num_items), np.nan)
+        self.group_codes = np.zeros(capacity, dtype=np.int32)
+        self.group_labels = []
+        self.group_lookup = {}
+        self.participants = []
+        self.size = 0
+        self.version = 0
+        self._order = None
+
+    @classmethod
+    def from_responses(cls, responses, config_data):
+        matrix = cls(config_data, capacity=max(64, len(responses)))
+        for idx, resp in enumerate(responses):
+            matrix._write_row(idx, resp)
+        matrix.size = len(responses)
+        matrix.participants = [resp.get("participant_number", "") for resp in responses]
+        return matrix
+
+    # matrix over the arrays of a ratings sidecar (see sidecar.py). without copy the rows are
+    # read-only zero-copy views of the memory-mapped files, so set()/delete() are not available
+    @classmethod
+    def from_arrays(cls, config_data, ratings, groups, participants, group_labels, copy=False):
+        matrix = cls(config_data, capacity=0)
+        if copy:
+            matrix.values = np.array(ratings, dtype=float)
+            matrix.group_codes = np.array(groups, dtype=np.int32)
+            matrix.participants = participants.tolist()
+        else:
+            matrix.values = ratings
+            matrix.group_codes = groups
+            matrix.participants = participants
+        matrix.group_labels = list(group_labels)
+        matrix.group_lookup = {label: code for code, label in enumerate(matrix.group_labels)}
+        matrix.size = len(ratings)
+        return matrix
+
+    # incremental updates, called alongside every change to the responses list
+    def set(self, index, response):
+        if index >= self.size:
+            self._grow(index + 1)
+            self.participants.extend([""] * (index + 1 - self.size))
+            self.size = index + 1
+        self._write_row(index, response)
+        self.participants[index] = response.get("participant_number", "")
+        self._changed()
+
+    def delete(self, index):
+        self.values[index:self.size - 1] = self.values[index + 1:self.size]
+        self.values[self.size - 1] = np.nan
+        self.group_codes[index:self.size - 1] = self.group_codes[index + 1:self.size]
+        del self.participants[index]
+        self.size -= 1
+        self._changed()
+
+    # statements, scale and reverse-scoring flags of a changed config with the same number of
+    # items; the stored ratings do not depend on them, so nothing is re-read
+    def set_scoring(self, config_data):
+        rating_settings = config_data.get("rating_settings", {})
+        self.questions = rating_settings.get("questions", [])
+        self.start_val, self.end_val = rating_settings.get("default_rating_range", [1, 5])
+        self.negative = np.array([q.get("is_negative", False) for q in self.questions], dtype=bool)
+
+    # detached copy of the current rows, safe to read from a worker thread
+    def copy(self):
+        clone = RatingMatrix.__new__(RatingMatrix)
+        clone.__dict__.update(self.__dict__)
+        clone.values = self.values[:self.size].copy()
+        clone.group_codes = self.group_codes[:self.size].copy()
+        clone.group_labels = list(self.group_labels)
+        clone.group_lookup = dict(self.group_lookup)
+        clone.participants = list(self.participants)
+        clone._order = None
+        return clone
+
+    # detached copy holding only the given rows (index array or boolean mask)
+    def select(self, rows):
+        rows = np.arange(self.size)[rows]
+        clone = self.copy()
+        clone.values = clone.values[rows]
+        clone.group_codes = clone.group_codes[rows]
+        clone.participants = [self.participants[i] for i in rows]
+        clone.size = len(rows)
+        return clone
+
+    # raw ratings of the current rows, NaN where missing
+    def raw(self):
+        return self.values[:self.size]
+
+    def missing(self):
+        return np.isnan(self.raw())
+
+    # ratings with negative statements reverse-scored in one vectorized pass
+    def scored(self):
+        raw = self.raw()
+        return np.where(self.negative, (self.end_val + 1) - raw, raw)
+
+    def groups(self):
+        return self.group_codes[:self.size]
+
+    # row indices in participant_sort_key order
+    def sorted_order(self):
+        if self._order is None:
+            self._order = np.array(
+                sorted(range(self.size), key=lambda i: participant_sort_key(self.participants[i])),
+                dtype=np.intp
+            )
+        return self._order
+
+    def sorted_participants(self):
+        return [self.participants[i] for i in self.sorted_order()]
+
+    # per-participant mean of the scored ratings, split by group in order of first appearance
+    def group_means(self):
+        means = np.full(self.size, np.nan)
+        scored = self.scored()
+        answered = ~np.isnan(scored)
+        counts = answered.sum(axis=1)
+        np.divide(np.where(answered, scored, 0).sum(axis=1), counts, out=means, where=counts > 0)
+        codes = self.groups()
+        present, first_seen = np.unique(codes, return_index=True)
+        grouped = {}
+        for code in present[np.argsort(first_seen)]:
+            group_means = means[codes == code]
+            grouped[self.group_labels[code]] = group_means[~np.isnan(group_means)]
+        return grouped
+
+    # heatmap matrix: statements x participants in sorted participant order
+    def heatmap_data(self):
+        return self.scored()[self.sorted_order()].T
+
+    # dataframe handed to custom code: the original response columns plus one column per rating
+    def dataframe(self, responses):
+        columns = {
+            "participant_number": self.participants,
+            "ratings": [resp.get("ratings", {}) for resp in responses],
+            "open_answers": [resp.get("open_answers", {}) for resp in responses],
+            "Group": [self.group_labels[code] for code in self.groups()],
+        }
+        raw = self.raw()
+        for i, key in enumerate(self.keys):
+            columns[key] = raw[:, i]
+        return pd.DataFrame(columns)
+
+    def _write_row(self, index, response):
+        rating_data = response.get("ratings", {})
+        self.values[index] = [parse_rating(rating_data.get(key, "")) for key in self.keys]
+        self.group_codes[index] = self._group_code(response.get("participant_number", "")[:1])
+
+    def _group_code(self, label):
+        code = self.group_lookup.get(label)
+        if code is None:
+            code = len(self.group_labels)
+            self.group_labels.append(label)
+            self.group_lookup[label] = code
+        return code
+
+    def _grow(self, size):
+        capacity = max(len(self.values), 1)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        values = np.full((capacity, self.num_items), np.nan)
+        values[:self.size] = self.values[:self.size]
+        group_codes = np.zeros(capacity, dtype=np.int32)
+        group_codes[:self.size] = self.group_codes[:self.size]
+        self.values = values
+        self.group_codes = group_codes
+
+    def _changed(self):
+        self.version += 1
+        self._order = None
@@ -0,0 +1,226 @@
+import multiprocessing
+import pickle
+import threading
+import time
+import traceback
+
+# out-of-process runner for "Run Custom Code"
+#
+# user code runs in a pool of warm worker processes (matplotlib/numpy/pandas already imported),
+# so an endless loop or a memory-hungry script can never freeze or kill the data-entry app.
+# a job that runs past the timeout or is cancelled gets its worker killed and replaced.
+
+
+# cap the address space of a worker process (posix only, silently skipped elsewhere)
+def _limit_memory(memory_mb):
+    if not memory_mb:
+        return
+    try:
+        import resource
+    except ImportError:
+        return
+    limit = int(memory_mb) * 1024 * 1024
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ValueError, OSError):
+        pass
+
+
+# the script finished without assigning a figure to `fig`
+class NoFigureError(Exception):
+    pass
+
+
+# run a custom plot script against a data snapshot and return the figure it assigned to `fig`
+#   payload: {"responses", "config", "matrix"}
+def run_script(code, payload):
+    import matplotlib.pyplot as plt
+    import numpy as np
+    import pandas as pd
+
+    compiled_code = compile(code, '<string>', 'exec')
+    config_data = payload["config"]
+    try:
+        df = payload["matrix"].dataframe(payload["responses"])
+    except Exception:
+        df = None
+    local_ns = {
+        'plt': plt,
+        'np': np,
+        'pd': pd,
+        'responses': payload["responses"],
+        'config': config_data,
+        'rating_settings': config_data.get("rating_settings", {}),
+        'open_questions_settings': config_data.get("open_questions_settings", {}),
+        'keyword_settings': config_data.get("keyword_settings", {}),
+        'visualization_settings': config_data.get("visualization_settings", {}),
+        'df': df
+    }
+    exec(compiled_code, local_ns)
+    fig = local_ns.get('fig')
+    if not isinstance(fig, plt.Figure):
+        raise NoFigureError("custom code did not produce a valid matplotlib figure (expected variable 'fig').")
+    return fig
+
+
+# worker side of one job: ("ok", pickled figure, png) or ("error", message)
+def _run_job(code, payload):
+    import matplotlib.pyplot as plt
+    from plots import render_png
+
+    try:
+        fig = run_script(code, payload)
+        png = render_png(fig)
+        # unregister from pyplot first so the figure unpickles as a plain figure in the app
+        plt.close("all")
+        return ("ok", pickle.dumps(fig), png)
+    except NoFigureError as e:
+        plt.close("all")
+        return ("error", str(e))
+    except BaseException:
+        plt.close("all")
+        return ("error", f"error executing custom code:\n{traceback.format_exc()}")
+
+
+def _worker_main(conn, memory_mb):
+    _limit_memory(memory_mb)
+    import matplotlib
+    matplotlib.use("Agg")
+    # warm start: pay the import cost once per worker instead of once per run
+    import matplotlib.pyplot  # noqa: F401
+    import numpy  # noqa: F401
+    import pandas  # noqa: F401
+    import plots  # noqa: F401
+    import ratings  # noqa: F401
+    while True:
+        try:
+            code, payload = conn.recv()
+        except (EOFError, OSError):
+            break
+        conn.send(_run_job(code, payload))
+
+
+class _Worker:
+    def __init__(self, context, memory_mb):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, memory_mb), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def alive(self):
+        return self.process.is_alive()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+# one custom code run; the app polls `done` from the tk loop and then reads `result`
+#   ("ok", figure_bytes, png) | ("error", message)
+class SandboxJob:
+    def __init__(self, code, payload):
+        self.code = code
+        self.payload = payload
+        self.cancelled = threading.Event()
+        self.done = False
+        self.result = None
+        self.started = time.perf_counter()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def figure(self):
+        return pickle.loads(self.result[1])
+
+    def _finish(self, result):
+        self.payload = None
+        self.result = result
+        self.done = True
+
+
+class SandboxPool:
+    def __init__(self, workers=1, timeout=30, memory_mb=2048):
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.context = multiprocessing.get_context("spawn")
+        self.idle = []
+        self.lock = threading.Lock()
+        self.closed = False
+
+    @classmethod
+    def from_config(cls, config_data):
+        custom_settings = config_data.get("custom_code_settings", {})
+        return cls(
+            workers=custom_settings.get("workers", 1),
+            timeout=custom_settings.get("timeout_seconds", 30),
+            memory_mb=custom_settings.get("memory_limit_mb", 2048)
+        )
+
+    # spawn the warm workers ahead of the first run
+    def start(self):
+        threading.Thread(target=self._fill, daemon=True).start()
+
+    def run(self, code, payload):
+        job = SandboxJob(code, payload)
+        threading.Thread(target=self._supervise, args=(job,), daemon=True).start()
+        return job
+
+    def shutdown(self):
+        with self.lock:
+            self.closed = True
+            idle, self.idle = self.idle, []
+        for worker in idle:
+            worker.kill()
+
+    def _fill(self):
+        while True:
+            with self.lock:
+                if self.closed or len(self.idle) >= self.workers:
+                    return
+            worker = _Worker(self.context, self.memory_mb)
+            self._release(worker)
+
+    def _acquire(self):
+        with self.lock:
+            while self.idle:
+                worker = self.idle.pop()
+                if worker.alive():
+                    return worker
+        return _Worker(self.context, self.memory_mb)
+
+    def _release(self, worker):
+        with self.lock:
+            if not self.closed and worker.alive() and len(self.idle) < self.workers:
+                self.idle.append(worker)
+                return
+        worker.kill()
+
+    def _supervise(self, job):
+        worker = self._acquire()
+        deadline = time.monotonic() + self.timeout
+        healthy = False
+        try:
+            worker.conn.send((job.code, job.payload))
+            while not worker.conn.poll(0.1):
+                if job.cancelled.is_set():
+                    job._finish(("error", "custom code was cancelled."))
+                    return
+                if time.monotonic() > deadline:
+                    job._finish(("error", f"custom code timed out after {self.timeout} seconds."))
+                    return
+                if not worker.alive():
+                    job._finish(("error", f"custom code worker exited unexpectedly (exit code {worker.process.exitcode})."))
+                    return
+            job._finish(worker.conn.recv())
+            healthy = True
+        except (EOFError, OSError, pickle.PicklingError) as e:
+            job._finish(("error", f"custom code worker failed: {e}"))
+        finally:
+            # a cancelled, timed out or broken worker is killed and replaced by a fresh warm one
+            if healthy:
+                self._release(worker)
+            else:
+                worker.kill()
+            self._fill()
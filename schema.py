@@ -0,0 +1,102 @@
+import json
+import re
+from functools import lru_cache
+
+# on-disk response schema
+#
+# version 1 (legacy): a json list of response dicts, pretty-printed
+#   [{"participant_number": "a1", "ratings": {"rating_1": 4, ...}, "open_answers": {"open_1": "..."}}, ...]
+#
+# version 2: a json list whose first element is a header, then one positional row per response,
+# one row per line without indentation
+#   [{"schema": 2},
+#   ["a1", [4, 2, ""], ["..."]],
+#   ...]
+#
+# a row is [participant_number, ratings, open_answers(, extra)]: ratings[i] is "rating_{i+1}" and
+# open_answers[i] is "open_{i+1}". anything that does not fit (other keys) goes into the optional
+# extra dict, so every response round-trips unchanged. in memory, and for custom code, responses
+# stay the version 1 dicts; only the stores encode and decode.
+
+SCHEMA_VERSION = 2
+
+_RATING_KEY = re.compile(r"^rating_(\d+)$")
+_OPEN_KEY = re.compile(r"^open_(\d+)$")
+
+
+@lru_cache(maxsize=None)
+def _keys(prefix, count):
+    return tuple(f"{prefix}_{i}" for i in range(1, count + 1))
+
+
+def is_header(element):
+    return isinstance(element, dict) and "schema" in element and "participant_number" not in element
+
+
+# positional values and leftovers of one ratings/open_answers dict
+def _encode_section(section, prefix, pattern):
+    values = list(section.values())
+    if tuple(section) == _keys(prefix, len(values)):
+        return values, None
+    positions = {}
+    extra = {}
+    for key, value in section.items():
+        match = pattern.match(key)
+        if match and int(match.group(1)) > 0:
+            positions[int(match.group(1))] = value
+        else:
+            extra[key] = value
+    # a gap in the numbering would read back as an empty answer: keep such keys as extra
+    count = 0
+    while count + 1 in positions:
+        count += 1
+    for position, value in positions.items():
+        if position > count:
+            extra[f"{prefix}_{position}"] = value
+    return [positions[i] for i in range(1, count + 1)], extra or None
+
+
+def encode_response(response):
+    ratings, rating_extra = _encode_section(response.get("ratings", {}), "rating", _RATING_KEY)
+    open_answers, open_extra = _encode_section(response.get("open_answers", {}), "open", _OPEN_KEY)
+    row = [response.get("participant_number", ""), ratings, open_answers]
+    extra = {key: value for key, value in response.items() if key not in ("participant_number", "ratings", "open_answers")}
+    if rating_extra:
+        extra["ratings"] = rating_extra
+    if open_extra:
+        extra["open_answers"] = open_extra
+    if extra:
+        row.append(extra)
+    return row
+
+
+# accepts version 2 rows and version 1 dicts (returned as they are)
+def decode_response(row):
+    if isinstance(row, dict):
+        return row
+    ratings = dict(zip(_keys("rating", len(row[1])), row[1]))
+    open_answers = dict(zip(_keys("open", len(row[2])), row[2]))
+    response = {"participant_number": row[0], "ratings": ratings, "open_answers": open_answers}
+    if len(row) > 3:
+        extra = dict(row[3])
+        ratings.update(extra.pop("ratings", {}))
+        open_answers.update(extra.pop("open_answers", {}))
+        response.update(extra)
+    return response
+
+
+# parsed file contents -> (responses, schema version of the file)
+def decode_document(data):
+    if data and is_header(data[0]):
+        version = data[0]["schema"]
+        if version > SCHEMA_VERSION:
+            raise ValueError(f"responses were written with a newer schema (version {version})")
+        return [decode_response(row) for row in data[1:]], version
+    return [decode_response(row) for row in data], 1
+
+
+# version 2 file contents for the responses
+def encode_document(responses):
+    lines = [json.dumps({"schema": SCHEMA_VERSION})]
+    lines.extend(json.dumps(encode_response(resp), ensure_ascii=False, separators=(",", ":")) for resp in responses)
+    return "[" + ",\n".join(lines) + "]\n"
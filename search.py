@@ -0,0 +1,122 @@
+import bisect
+import heapq
+import math
+import re
+from collections import Counter
+
+# in-memory inverted index over the open answers, for the search panel
+#
+# every (response, open question) answer is indexed by its lower-cased word tokens. a query
+# matches answers containing every query word, either as a whole token or as a prefix of one.
+# hits are ranked by term frequency weighted with idf, whole-word matches counting more than
+# prefix matches. like the RatingMatrix, position i mirrors responses[i] and is kept up to date
+# with set()/delete() instead of rebuilding.
+
+TOKEN_PATTERN = re.compile(r"\w+")
+# score factor for query words that only match the beginning of a token
+PREFIX_WEIGHT = 0.5
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class AnswerIndex:
+    def __init__(self, open_keys):
+        self.open_keys = open_keys
+        # token -> {(doc id, question index): count}
+        self.postings = {}
+        # sorted tokens for prefix lookups
+        self.vocabulary = []
+        # doc id -> [(question index, token counts)] to unindex a response again
+        self.doc_terms = {}
+        # position in the responses list -> stable doc id, and the reverse (rebuilt after deletes)
+        self.doc_ids = []
+        self._positions = {}
+        self.next_id = 0
+        self.num_answers = 0
+
+    @classmethod
+    def from_responses(cls, responses, open_keys):
+        index = cls(open_keys)
+        for idx, resp in enumerate(responses):
+            index.set(idx, resp)
+        return index
+
+    # incremental updates, called alongside every change to the responses list
+    def set(self, index, response):
+        while index >= len(self.doc_ids):
+            self.doc_ids.append(self.next_id)
+            if self._positions is not None:
+                self._positions[self.next_id] = len(self.doc_ids) - 1
+            self.next_id += 1
+        doc = self.doc_ids[index]
+        self._remove_doc(doc)
+        answers = response.get("open_answers", {})
+        terms = []
+        for qi, key in enumerate(self.open_keys):
+            counts = Counter(tokenize(str(answers.get(key, ""))))
+            if not counts:
+                continue
+            terms.append((qi, counts))
+            for token, count in counts.items():
+                posting = self.postings.get(token)
+                if posting is None:
+                    posting = self.postings[token] = {}
+                    bisect.insort(self.vocabulary, token)
+                posting[(doc, qi)] = count
+        self.doc_terms[doc] = terms
+        self.num_answers += len(terms)
+
+    def delete(self, index):
+        self._remove_doc(self.doc_ids.pop(index))
+        self._positions = None
+
+    # best matches as (response index, open question key, score), highest score first, and the
+    # number of answers matching in total (the list stops at limit)
+    def search(self, query, limit=50):
+        words = tokenize(query)
+        if not words:
+            return [], 0
+        scores = None
+        for word in words:
+            word_scores = self._match(word)
+            if scores is None:
+                scores = word_scores
+            else:
+                scores = {hit: scores[hit] + score for hit, score in word_scores.items() if hit in scores}
+            if not scores:
+                return [], 0
+        positions = self._doc_positions()
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -positions[item[0][0]]))
+        return [(positions[doc], self.open_keys[qi], score) for (doc, qi), score in best], len(scores)
+
+    # hit -> score for one query word, whole token or prefix
+    def _match(self, word):
+        scores = {}
+        for i in range(bisect.bisect_left(self.vocabulary, word), len(self.vocabulary)):
+            token = self.vocabulary[i]
+            if not token.startswith(word):
+                break
+            posting = self.postings[token]
+            weight = (1.0 if token == word else PREFIX_WEIGHT) * math.log(1 + self.num_answers / len(posting))
+            for hit, count in posting.items():
+                score = weight * count
+                if score > scores.get(hit, 0):
+                    scores[hit] = score
+        return scores
+
+    def _remove_doc(self, doc):
+        for qi, counts in self.doc_terms.pop(doc, []):
+            self.num_answers -= 1
+            for token in counts:
+                posting = self.postings[token]
+                del posting[(doc, qi)]
+                if not posting:
+                    del self.postings[token]
+                    del self.vocabulary[bisect.bisect_left(self.vocabulary, token)]
+
+    def _doc_positions(self):
+        if self._positions is None:
+            self._positions = {doc: pos for pos, doc in enumerate(self.doc_ids)}
+        return self._positions
@@ -2,8 +2,10 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import json
 import os
+from storage import write_json_atomic
 
 DEFAULT_CONFIG_FILENAME = "config.json"
+STORAGE_BACKENDS = ["json", "journal", "sqlite", "sharded"]
 
 class settingsApp(tk.Tk):
 
@@ -36,6 +38,9 @@ class settingsApp(tk.Tk):
                     "show_means_in_violin": True
                 },
                 "save_plot_formats": ["png", "pdf"]
+            },
+            "storage_settings": {
+                "backend": "json"
             }
         }
 
@@ -55,8 +60,8 @@ class settingsApp(tk.Tk):
     # save config
     def save_config(self):
         try:
-            with open(DEFAULT_CONFIG_FILENAME, "w") as f:
-                json.dump(self.config_data, f, indent=2)
+            # a running main app polls the file, it must never see it half written
+            write_json_atomic(DEFAULT_CONFIG_FILENAME, self.config_data, indent=2)
             messagebox.showinfo("Success", f"Settings saved to {DEFAULT_CONFIG_FILENAME}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save '{DEFAULT_CONFIG_FILENAME}': {e}")
@@ -100,6 +105,12 @@ class settingsApp(tk.Tk):
         self.var_window_size = tk.StringVar(value=self.config_data["app_settings"].get("window_size", "600x700"))
         ttk.Entry(frame, textvariable=self.var_window_size, width=40).grid(row=1, column=1, padx=5, pady=5, sticky="w")
 
+        storage_settings = self.config_data.get("storage_settings", {})
+        ttk.Label(frame, text="Response Storage:").grid(row=2, column=0, padx=5, pady=5, sticky="e")
+        self.var_storage_backend = tk.StringVar(value=storage_settings.get("backend", "json"))
+        ttk.Combobox(frame, textvariable=self.var_storage_backend, values=STORAGE_BACKENDS,
+                     state="readonly").grid(row=2, column=1, padx=5, pady=5, sticky="w")
+
         frame.columnconfigure(1, weight=1)
 
     # rating settings
@@ -235,6 +246,7 @@ class settingsApp(tk.Tk):
         
         self.config_data["app_settings"]["window_title"] = self.var_window_title.get().strip()
         self.config_data["app_settings"]["window_size"] = self.var_window_size.get().strip()
+        self.config_data.setdefault("storage_settings", {})["backend"] = self.var_storage_backend.get()
 
         rating_settings = self.config_data["rating_settings"]
         start_val = self.var_scale_start.get()
@@ -0,0 +1,151 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+from storage import write_json_atomic
+
+# binary ratings snapshot next to the responses, for reading large studies without the json
+#
+#   <name>.ratings.npy        float64 (participants x items), NaN where missing
+#   <name>.groups.npy         int32 group code per participant
+#   <name>.participants.npy   fixed-width unicode participant ids
+#   <name>.sidecar.json       item keys, group labels, row count and the stamp of the store
+#                             files the snapshot was taken from (written last)
+#
+# the app rewrites the snapshot after every save (storage_settings.ratings_sidecar); readers
+# memory-map the arrays and only trust them while the store files still match the stamp.
+
+SIDECAR_FORMAT = 1
+
+
+def sidecar_paths(responses_path):
+    base, _ = os.path.splitext(responses_path)
+    return {
+        "ratings": f"{base}.ratings.npy",
+        "groups": f"{base}.groups.npy",
+        "participants": f"{base}.participants.npy",
+        "meta": f"{base}.sidecar.json",
+    }
+
+
+# size and mtime of every existing store file, compared to tell whether a snapshot is current
+def data_stamp(store):
+    stamp = []
+    for path in store.data_files():
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        stamp.append([os.path.basename(path), stat.st_size, stat.st_mtime_ns])
+    return stamp
+
+
+def _save_array(path, array):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+# write the matrix rows (a RatingMatrix or a detached copy) as the sidecar of responses_path
+def write_sidecar(responses_path, matrix, stamp):
+    paths = sidecar_paths(responses_path)
+    # drop the meta first so a reader never pairs it with half replaced arrays
+    if os.path.exists(paths["meta"]):
+        os.remove(paths["meta"])
+    participants = np.array(matrix.participants[:matrix.size], dtype=str)
+    if participants.dtype.itemsize == 0:
+        participants = participants.astype("<U1")
+    _save_array(paths["ratings"], np.ascontiguousarray(matrix.raw(), dtype=np.float64))
+    _save_array(paths["groups"], np.ascontiguousarray(matrix.groups(), dtype=np.int32))
+    _save_array(paths["participants"], participants)
+    write_json_atomic(paths["meta"], {
+        "format": SIDECAR_FORMAT,
+        "rows": int(matrix.size),
+        "keys": list(matrix.keys),
+        "group_labels": list(matrix.group_labels),
+        "stamp": stamp,
+    })
+
+
+# memory-mapped (ratings, groups, participants, meta) if the sidecar matches the store and the
+# configured items, otherwise None
+def open_sidecar(responses_path, store, keys):
+    paths = sidecar_paths(responses_path)
+    try:
+        with open(paths["meta"], "r") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("format") != SIDECAR_FORMAT or meta.get("keys") != list(keys) or meta.get("stamp") != data_stamp(store):
+        return None
+    try:
+        ratings = np.load(paths["ratings"], mmap_mode="r")
+        groups = np.load(paths["groups"], mmap_mode="r")
+        participants = np.load(paths["participants"], mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    rows = meta["rows"]
+    if ratings.shape != (rows, len(keys)) or groups.shape != (rows,) or participants.shape != (rows,):
+        return None
+    return ratings, groups, participants, meta
+
+
+# whether the rows of an opened sidecar line up with responses[i]: a store can hand back the same
+# responses in another order than they were saved in (the sharded store lists them by group)
+def rows_match(arrays, responses):
+    participants = arrays[2]
+    return len(participants) == len(responses) and participants.tolist() == [
+        resp.get("participant_number", "") for resp in responses
+    ]
+
+
+# whether an opened sidecar has rows without a participant id, which the app never saves to the
+# row-by-row stores: snapshots taken before unsaved blank forms were left out carry one. readers
+# without the loaded responses to compare against (cli) fall back to the store
+def has_blank_rows(arrays):
+    return bool((arrays[2] == "").any())
+
+
+# rewrites the sidecar on a background thread; only the latest submitted matrix is written
+class SidecarWriter:
+    def __init__(self, responses_path):
+        self.responses_path = responses_path
+        self.condition = threading.Condition()
+        self.pending = None
+        self.closed = False
+        self.error = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    # matrix must be a detached copy, stamp the data_stamp() taken right after the store write
+    def submit(self, matrix, stamp):
+        with self.condition:
+            self.pending = (matrix, stamp)
+            self.condition.notify()
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.closed:
+                    self.condition.wait()
+                if self.pending is None:
+                    return
+                (matrix, stamp), self.pending = self.pending, None
+            try:
+                write_sidecar(self.responses_path, matrix, stamp)
+                self.error = None
+            except OSError as e:
+                # a stale or missing sidecar is only slower to read, the next save retries; the app
+                # shows the error in its status line
+                self.error = e
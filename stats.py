@@ -0,0 +1,191 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import combinations
+
+import numpy as np
+
+# statistics over the reverse-scored rating matrix (RatingMatrix.scored(), so negative statements
+# count the same way as in the box plot and heatmap)
+#
+#   report = compute_statistics(matrix, resamples=10000)
+#   print(format_report(report))
+#
+# a participant's score is the mean of their answered items. reliability (cronbach's alpha,
+# item-total correlations) uses participants who answered every item. bootstrap intervals for
+# group differences draw all resamples of a chunk as one index array; chunks run on a thread
+# pool (numpy releases the gil while generating, gathering and averaging).
+
+# resampled values held in memory at once per chunk
+BOOTSTRAP_CHUNK_ELEMENTS = 4_000_000
+
+
+def participant_scores(matrix):
+    scored = matrix.scored()
+    answered = ~np.isnan(scored)
+    counts = answered.sum(axis=1)
+    scores = np.full(matrix.size, np.nan)
+    np.divide(np.where(answered, scored, 0).sum(axis=1), counts, out=scores, where=counts > 0)
+    return scores
+
+
+def _describe(values):
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return {"n": 0, "mean": None, "sd": None, "median": None, "min": None, "max": None}
+    return {
+        "n": int(len(values)),
+        "mean": float(values.mean()),
+        "sd": float(values.std(ddof=1)) if len(values) > 1 else None,
+        "median": float(np.median(values)),
+        "min": float(values.min()),
+        "max": float(values.max()),
+    }
+
+
+def item_descriptives(matrix):
+    scored = matrix.scored()
+    items = []
+    for i, key in enumerate(matrix.keys):
+        stats = _describe(scored[:, i])
+        stats["item"] = key
+        stats["missing"] = int(np.isnan(scored[:, i]).sum())
+        items.append(stats)
+    return items
+
+
+# participant score descriptives per group, groups in order of first appearance
+def group_descriptives(matrix):
+    scores = participant_scores(matrix)
+    codes = matrix.groups()
+    present, first_seen = np.unique(codes, return_index=True)
+    groups = []
+    for code in present[np.argsort(first_seen)]:
+        stats = _describe(scores[codes == code])
+        stats["group"] = matrix.group_labels[code]
+        groups.append(stats)
+    return groups
+
+
+def _complete_rows(matrix):
+    scored = matrix.scored()
+    return scored[~np.isnan(scored).any(axis=1)]
+
+
+def cronbach_alpha(matrix):
+    complete = _complete_rows(matrix)
+    k = complete.shape[1]
+    if k < 2 or len(complete) < 2:
+        return None
+    total_var = complete.sum(axis=1).var(ddof=1)
+    if total_var == 0:
+        return None
+    return float(k / (k - 1) * (1 - complete.var(axis=0, ddof=1).sum() / total_var))
+
+
+# corrected item-total correlation: each item against the sum of the other items
+def item_total_correlations(matrix):
+    complete = _complete_rows(matrix)
+    if complete.shape[1] < 2 or len(complete) < 3:
+        return [None] * matrix.num_items
+    rest = complete.sum(axis=1, keepdims=True) - complete
+    items = complete - complete.mean(axis=0)
+    rest = rest - rest.mean(axis=0)
+    denominator = np.sqrt((items ** 2).sum(axis=0) * (rest ** 2).sum(axis=0))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        correlations = (items * rest).sum(axis=0) / denominator
+    return [None if np.isnan(r) else float(r) for r in correlations]
+
+
+# bootstrap means of `values` for one chunk of resamples
+def _bootstrap_means(values, resamples, seed):
+    rng = np.random.default_rng(seed)
+    return values[rng.integers(0, len(values), size=(resamples, len(values)))].mean(axis=1)
+
+
+def bootstrap_means(values, resamples, seed_sequence, workers=None):
+    chunk = max(1, BOOTSTRAP_CHUNK_ELEMENTS // max(len(values), 1))
+    sizes = [min(chunk, resamples - start) for start in range(0, resamples, chunk)]
+    seeds = seed_sequence.spawn(len(sizes))
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        return np.concatenate(list(pool.map(_bootstrap_means, [values] * len(sizes), sizes, seeds)))
+
+
+# percentile bootstrap interval for the difference in mean participant score of every pair of
+# groups (first minus second). results do not depend on the number of workers for a given seed
+def bootstrap_group_differences(matrix, resamples=10000, confidence=0.95, seed=None, workers=None):
+    if resamples < 1:
+        raise ValueError(f"resamples must be at least 1, got {resamples}")
+    scores = participant_scores(matrix)
+    codes = matrix.groups()
+    present, first_seen = np.unique(codes, return_index=True)
+    samples = {}
+    for code in present[np.argsort(first_seen)]:
+        group_scores = scores[codes == code]
+        group_scores = group_scores[~np.isnan(group_scores)]
+        if len(group_scores) >= 2:
+            samples[matrix.group_labels[code]] = group_scores
+    seed_sequence = np.random.SeedSequence(seed)
+    group_seeds = dict(zip(samples, seed_sequence.spawn(len(samples))))
+    means = {label: bootstrap_means(values, resamples, group_seeds[label], workers) for label, values in samples.items()}
+    alpha = (1 - confidence) / 2
+    differences = []
+    for first, second in combinations(samples, 2):
+        diffs = means[first] - means[second]
+        low, high = np.quantile(diffs, [alpha, 1 - alpha])
+        differences.append({
+            "groups": [first, second],
+            "difference": float(samples[first].mean() - samples[second].mean()),
+            "ci_low": float(low),
+            "ci_high": float(high),
+            "p_bootstrap": float(min(1.0, 2 * min((diffs <= 0).mean(), (diffs >= 0).mean()))),
+        })
+    return differences
+
+
+def compute_statistics(matrix, resamples=10000, confidence=0.95, seed=None, workers=None):
+    return {
+        "participants": int(matrix.size),
+        "complete_participants": int(len(_complete_rows(matrix))),
+        "items": item_descriptives(matrix),
+        "groups": group_descriptives(matrix),
+        "cronbach_alpha": cronbach_alpha(matrix),
+        "item_total_correlations": dict(zip(matrix.keys, item_total_correlations(matrix))),
+        "bootstrap": {
+            "resamples": resamples,
+            "confidence": confidence,
+            "differences": bootstrap_group_differences(matrix, resamples, confidence, seed, workers),
+        },
+    }
+
+
+def _fmt(value, digits=2):
+    return "-" if value is None else f"{value:.{digits}f}"
+
+
+# plain text version of a compute_statistics() report
+def format_report(report):
+    lines = [
+        f"participants: {report['participants']} ({report['complete_participants']} answered every item)",
+        f"cronbach's alpha: {_fmt(report['cronbach_alpha'], 3)}",
+        "",
+        f"{'item':10s} {'n':>6s} {'missing':>8s} {'mean':>7s} {'sd':>7s} {'median':>7s} {'item-total r':>13s}",
+    ]
+    for item in report["items"]:
+        lines.append(
+            f"{item['item']:10s} {item['n']:6d} {item['missing']:8d} {_fmt(item['mean']):>7s} {_fmt(item['sd']):>7s} "
+            f"{_fmt(item['median']):>7s} {_fmt(report['item_total_correlations'][item['item']], 3):>13s}"
+        )
+    lines += ["", f"{'group':10s} {'n':>6s} {'mean':>7s} {'sd':>7s} {'median':>7s}"]
+    for group in report["groups"]:
+        lines.append(
+            f"{group['group']:10s} {group['n']:6d} {_fmt(group['mean']):>7s} {_fmt(group['sd']):>7s} {_fmt(group['median']):>7s}"
+        )
+    bootstrap = report["bootstrap"]
+    lines += ["", f"group differences, {bootstrap['confidence']:.0%} bootstrap ci ({bootstrap['resamples']} resamples):"]
+    for diff in bootstrap["differences"]:
+        first, second = diff["groups"]
+        lines.append(
+            f"  {first} - {second}: {_fmt(diff['difference'], 3)} "
+            f"[{_fmt(diff['ci_low'], 3)}, {_fmt(diff['ci_high'], 3)}]  p={_fmt(diff['p_bootstrap'], 4)}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,776 @@
+import bisect
+import heapq
+import json
+import os
+import re
+import shutil
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from schema import SCHEMA_VERSION, decode_document, decode_response, encode_document, encode_response
+
+# response storage backends
+#
+# every backend exposes the same operations used by the main app:
+#   load()                              -> list of responses
+#   save(responses)                     -> persist the full list
+#   put(index, response, responses)     -> persist one saved response
+#   extend(responses)                   -> persist entries appended since the last write, in one batch
+#   delete(index, responses)            -> persist one deletion (responses is already updated)
+#   find(participant_number, responses) -> index of the participant or None
+#   sorted_participants(responses)      -> participant numbers in participant_sort_key order
+#   load_groups(groups)                 -> only the responses of the given participant groups
+#   data_files()                        -> files holding the persisted responses
+#   close()                             -> flush pending background work
+#   load_chunks()                       -> load() as successive lists, for filling the ui while
+#                                          a big study is still being read
+#   hand_over()                         -> take the data over from the previously configured backend
+#                                          (the first read does it, see below)
+#
+# a file that exists but cannot be read raises StoreLoadError, it is never treated as an empty
+# study (a later save would overwrite it).
+#
+# responses are dicts in memory and encoded with schema.py on disk; files written with an older
+# schema are read as well and upgraded when loaded.
+#
+# stores opened through make_store record their backend in <name>.backend.json. when the
+# configured backend differs from the recorded one, the first read moves the data the previous
+# backend holds into the new one, so switching back and forth never leaves saves behind.
+
+CONFIG_FILENAME = "config.json"
+RESPONSES_FILENAME = "questionnaire_responses.json"
+# unsaved form in progress, written by the autosave
+AUTOSAVE_FILENAME = "questionnaire_autosave.json"
+
+# rows fetched per chunk when the sqlite store is loaded in chunks
+LOAD_CHUNK_SIZE = 20000
+
+# sort number used for ids that do not match the letters+number pattern (sorted last)
+NO_NUMBER = 2 ** 63 - 1
+
+
+# the stored responses exist but could not be read
+class StoreLoadError(Exception):
+    pass
+
+
+# participant sorting
+def participant_sort_key(pn):
+    match = re.match(r'^([a-zA-Z]+)(\d+)$', pn)
+    if match:
+        group_letters = match.group(1).lower()
+        number_part = int(match.group(2))
+        return (group_letters, number_part)
+    else:
+        return ("zzz", float('inf'))
+
+
+# participant group: first character of the participant number, as used by the plots
+def participant_group(pn):
+    return pn[:1]
+
+
+# read a config file, errors are left to the caller (gui dialog or command line message)
+def read_config(path=CONFIG_FILENAME):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+# write json to a temp file and swap it in, so a crash never leaves a half written file
+def write_json_atomic(path, data, **dump_kwargs):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, **dump_kwargs)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+# same for text that is already serialized
+def write_text_atomic(path, text):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+# responses file in the current schema; a file in an older schema is upgraded and the original
+# kept as <name>.v<version>.json, or as v<version>/<name>.json in backup_root
+def read_responses_file(path, backup_root=None):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            responses, version = decode_document(json.load(f))
+    except (OSError, ValueError, TypeError, KeyError, IndexError) as e:
+        raise StoreLoadError(f"could not read {path}: {e}") from e
+    if version < SCHEMA_VERSION:
+        if backup_root is None:
+            base, ext = os.path.splitext(path)
+            backup_path = f"{base}.v{version}{ext}"
+        else:
+            backup_dir = os.path.join(backup_root, f"v{version}")
+            os.makedirs(backup_dir, exist_ok=True)
+            backup_path = os.path.join(backup_dir, os.path.basename(path))
+        # upgraded copy first, then the backup, then swap: a crash at any point leaves a readable
+        # responses file at path
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(encode_document(responses))
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.link(path, backup_path)
+        except OSError:
+            # no hard links here, or a backup left by an interrupted upgrade
+            shutil.copy2(path, backup_path)
+        os.replace(tmp_path, path)
+    return responses
+
+
+def backend_marker_path(path):
+    base, _ = os.path.splitext(path)
+    return f"{base}.backend.json"
+
+
+# backend that holds the current data of the responses at path, None when not recorded
+def read_backend_marker(path):
+    try:
+        with open(backend_marker_path(path), "r") as f:
+            return json.load(f)["backend"]
+    except (OSError, ValueError, TypeError, KeyError):
+        return None
+
+
+# shared behaviour for stores that keep everything in the in-memory list
+class ResponseStore:
+    backend = None
+    # set by make_store: check the recorded backend before the first read (see hand_over)
+    track_backend = False
+
+    # the configured backend changed since the data was last written: take the data over from the
+    # previous backend. an unreadable previous store raises before anything is written, so the
+    # next start tries again
+    def hand_over(self):
+        if not self.track_backend:
+            return
+        self.track_backend = False
+        previous = read_backend_marker(self.path)
+        if previous == self.backend:
+            return
+        if previous is not None:
+            old = _open_backend(previous, self.path)
+            try:
+                responses = old.load()
+            finally:
+                old.close()
+            self.save(responses)
+        write_json_atomic(backend_marker_path(self.path), {"backend": self.backend})
+
+    def find(self, participant_number, responses):
+        for idx, resp in enumerate(responses):
+            if resp["participant_number"] == participant_number:
+                return idx
+        return None
+
+    def sorted_participants(self, responses):
+        return sorted((resp["participant_number"] for resp in responses), key=participant_sort_key)
+
+    def extend(self, responses):
+        self.save(responses)
+
+    # how many leading entries of the in-memory list are in the store; stores that write the
+    # whole list on every change hold all of them
+    def saved_count(self, responses):
+        return len(responses)
+
+    def load_chunks(self):
+        yield self.load()
+
+    def data_files(self):
+        return [self.path]
+
+    def load_groups(self, groups):
+        groups = set(groups)
+        return [resp for resp in self.load() if participant_group(resp.get("participant_number", "")) in groups]
+
+    def close(self):
+        pass
+
+
+# plain json file, rewritten on every change (original behaviour)
+class JsonStore(ResponseStore):
+    backend = "json"
+
+    def __init__(self, path=RESPONSES_FILENAME):
+        self.path = path
+
+    def load(self):
+        self.hand_over()
+        if os.path.isfile(self.path):
+            return read_responses_file(self.path)
+        return []
+
+    def save(self, responses):
+        write_text_atomic(self.path, encode_document(responses))
+
+    def put(self, index, response, responses):
+        self.save(responses)
+
+    def delete(self, index, responses):
+        self.save(responses)
+
+
+# append-only journal: every save/delete appends one line to a jsonl log, a background
+# compaction folds the log into a snapshot. save cost does not depend on the study size.
+#
+# files (next to the responses file):
+#   <name>.snapshot.json     {"schema": 2, "seq": n, "responses": [rows]}
+#   <name>.log               one {"seq", "op", "index", ["response"]} record per line
+#   <name>.log.compacting    log being folded into the snapshot
+class JournalStore(ResponseStore):
+    backend = "journal"
+
+    def __init__(self, path=RESPONSES_FILENAME, compact_every=500):
+        self.path = path
+        base, _ = os.path.splitext(path)
+        self.snapshot_path = f"{base}.snapshot.json"
+        self.log_path = f"{base}.log"
+        self.compacting_path = f"{base}.log.compacting"
+        self.compact_every = compact_every
+        self.seq = 0
+        # number of leading entries of the in-memory list that are persisted
+        self.length = 0
+        self.log_records = 0
+        self.lock = threading.Lock()
+        self.compaction = None
+
+    def load(self):
+        self.hand_over()
+        snapshot_seq = 0
+        if os.path.isfile(self.snapshot_path):
+            try:
+                with open(self.snapshot_path, "r") as f:
+                    snapshot = json.load(f)
+                snapshot_seq = snapshot.get("seq", 0)
+                responses = [decode_response(row) for row in snapshot.get("responses", [])]
+            except (OSError, ValueError, TypeError, KeyError, IndexError, AttributeError) as e:
+                raise StoreLoadError(f"could not read {self.snapshot_path}: {e}") from e
+        else:
+            # first start in journal mode: seed from the plain responses file, and snapshot it
+            # right away so the log never depends on that file staying as it is
+            responses = JsonStore(self.path).load()
+            self._write_snapshot(responses, 0)
+        self.seq = snapshot_seq
+        self.log_records = 0
+        for log_path in (self.compacting_path, self.log_path):
+            for record in self._read_log(log_path):
+                if record["seq"] <= snapshot_seq:
+                    continue
+                self._apply(responses, record)
+                self.seq = max(self.seq, record["seq"])
+                self.log_records += 1
+        if os.path.isfile(self.compacting_path):
+            # a fold cut short by a crash: its records are only in the log being folded, so finish
+            # it before a new compaction takes that file name
+            self._write_snapshot(responses, self.seq)
+            for log_path in (self.compacting_path, self.log_path):
+                if os.path.isfile(log_path):
+                    os.remove(log_path)
+            self.log_records = 0
+        self.length = len(responses)
+        return responses
+
+    def save(self, responses):
+        self._wait_for_compaction()
+        with self.lock:
+            self.length = len(responses)
+            self.seq += 1
+            self._write_snapshot(list(responses), self.seq)
+            for log_path in (self.log_path, self.compacting_path):
+                if os.path.isfile(log_path):
+                    os.remove(log_path)
+            self.log_records = 0
+
+    def put(self, index, response, responses):
+        records = []
+        # unsaved entries in front of this one are persisted as well, like a full dump would
+        for i in range(self.length, index):
+            records.append({"op": "put", "index": i, "response": responses[i]})
+        records.append({"op": "put", "index": index, "response": response})
+        self._append(records)
+        self.length = max(self.length, index + 1)
+        self._maybe_compact(responses)
+
+    def extend(self, responses):
+        # one append and one fsync for the whole batch
+        records = [{"op": "put", "index": i, "response": responses[i]} for i in range(self.length, len(responses))]
+        if records:
+            self._append(records)
+            self.length = len(responses)
+            self._maybe_compact(responses)
+
+    def delete(self, index, responses):
+        if index >= self.length:
+            # the entry was never persisted
+            return
+        self._append([{"op": "delete", "index": index}])
+        self.length -= 1
+        self._maybe_compact(responses)
+
+    def saved_count(self, responses):
+        return self.length
+
+    def close(self):
+        self._wait_for_compaction()
+
+    def data_files(self):
+        return [self.snapshot_path, self.log_path, self.compacting_path]
+
+    def compact(self, responses):
+        self._wait_for_compaction()
+        with self.lock:
+            if self.log_records == 0:
+                return
+            if os.path.isfile(self.compacting_path) and os.path.isfile(self.log_path):
+                # left by a fold that failed: its records are not in the snapshot, keep them
+                with open(self.log_path, "rb") as src, open(self.compacting_path, "ab") as dst:
+                    shutil.copyfileobj(src, dst)
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                os.remove(self.log_path)
+            elif os.path.isfile(self.log_path):
+                os.replace(self.log_path, self.compacting_path)
+            self.log_records = 0
+            pending = list(responses[:self.length])
+            seq = self.seq
+        self.compaction = threading.Thread(target=self._fold, args=(pending, seq), daemon=True)
+        self.compaction.start()
+
+    def _maybe_compact(self, responses):
+        if self.log_records < self.compact_every:
+            return
+        if self.compaction is not None and self.compaction.is_alive():
+            return
+        self.compact(responses)
+
+    def _fold(self, pending, seq):
+        self._write_snapshot(pending, seq)
+        with self.lock:
+            if os.path.isfile(self.compacting_path):
+                os.remove(self.compacting_path)
+
+    def _wait_for_compaction(self):
+        if self.compaction is not None:
+            self.compaction.join()
+            self.compaction = None
+
+    def _write_snapshot(self, responses, seq):
+        write_json_atomic(self.snapshot_path, {
+            "schema": SCHEMA_VERSION, "seq": seq, "responses": [encode_response(resp) for resp in responses]
+        })
+
+    def _append(self, records):
+        with self.lock:
+            lines = []
+            for record in records:
+                self.seq += 1
+                record["seq"] = self.seq
+                if "response" in record:
+                    record["response"] = encode_response(record["response"])
+                lines.append(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+            with open(self.log_path, "a") as f:
+                f.write("".join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+            self.log_records += len(records)
+
+    @staticmethod
+    def _read_log(log_path):
+        if not os.path.isfile(log_path):
+            return
+        with open(log_path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # torn last line from a crash during append
+                    return
+
+    @staticmethod
+    def _apply(responses, record):
+        index = record["index"]
+        if record["op"] == "put":
+            if index < len(responses):
+                responses[index] = decode_response(record["response"])
+            else:
+                responses.append(decode_response(record["response"]))
+        elif record["op"] == "delete":
+            if index < len(responses):
+                del responses[index]
+
+
+# sqlite database with one row per response (stdlib sqlite3 only)
+#
+# participant lookups and the sorted participant list are answered from indexes, and every
+# save or delete is a single-row write in its own transaction.
+class SqliteStore(ResponseStore):
+    backend = "sqlite"
+
+    def __init__(self, path=RESPONSES_FILENAME, db_path=None):
+        self.path = path
+        base, _ = os.path.splitext(path)
+        self.db_path = db_path or f"{base}.db"
+        # row ids of the persisted leading entries of the in-memory list, ascending
+        self.rowids = []
+        # (sort_group, sort_number, id) of every stored row in the order of the sort index, and
+        # the participant numbers in the same order. read once, then kept in step by put and
+        # delete with a binary search, so a combobox refresh does not query the whole table
+        self.sorted_keys = None
+        self.sorted_numbers = None
+        # the app loads on a worker thread and uses the store from the tk thread afterwards,
+        # never both at once
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "id INTEGER PRIMARY KEY, "
+                "participant_number TEXT NOT NULL, "
+                "sort_group TEXT NOT NULL, "
+                "sort_number INTEGER NOT NULL, "
+                "data TEXT NOT NULL)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_participant_number ON responses (participant_number)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_participant_sort ON responses (sort_group, sort_number)"
+            )
+            # key/value flags, e.g. whether the database was already seeded from the json file
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    def load(self):
+        responses = []
+        for chunk in self.load_chunks():
+            responses.extend(chunk)
+        return responses
+
+    def load_chunks(self):
+        self.hand_over()
+        self.sorted_keys = self.sorted_numbers = None
+        cursor = self.conn.execute("SELECT id, data FROM responses ORDER BY id")
+        rows = cursor.fetchmany(LOAD_CHUNK_SIZE)
+        # seeded once only: a table emptied by deleting everyone must stay empty
+        if self.conn.execute("SELECT 1 FROM meta WHERE key = 'seeded'").fetchone() is None:
+            if not rows and os.path.isfile(self.path):
+                # first start in sqlite mode: seed from the plain responses file (an unreadable
+                # file raises before the flag is set, so the next start tries again)
+                responses = JsonStore(self.path).load()
+                self.save(responses)
+                yield responses
+                return
+            self._mark_seeded()
+        self.rowids = []
+        legacy = []
+        while rows:
+            chunk = []
+            for rowid, data in rows:
+                try:
+                    row = json.loads(data)
+                    chunk.append(decode_response(row))
+                except (ValueError, TypeError, KeyError, IndexError) as e:
+                    raise StoreLoadError(f"could not read response {rowid} in {self.db_path}: {e}") from e
+                if isinstance(row, dict):
+                    legacy.append((self._encode(row), rowid))
+                self.rowids.append(rowid)
+            yield chunk
+            rows = cursor.fetchmany(LOAD_CHUNK_SIZE)
+        if legacy:
+            # upgrade rows stored with the old schema
+            with self.conn:
+                self.conn.executemany("UPDATE responses SET data = ? WHERE id = ?", legacy)
+
+    # a full save replaces whatever the json file holds, so it also counts as the seed
+    def save(self, responses):
+        self.sorted_keys = self.sorted_numbers = None
+        with self.conn:
+            self.conn.execute("DELETE FROM responses")
+            self.rowids = [self._insert(resp) for resp in responses]
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('seeded', '1')")
+
+    def put(self, index, response, responses):
+        with self.conn:
+            if index < len(self.rowids):
+                rowid = self.rowids[index]
+                pn = response.get("participant_number", "")
+                sort_group, sort_number = self._sort_columns(pn)
+                self._unlist(rowid)
+                self.conn.execute(
+                    "UPDATE responses SET participant_number = ?, sort_group = ?, sort_number = ?, data = ? "
+                    "WHERE id = ?",
+                    (pn, sort_group, sort_number, self._encode(response), rowid)
+                )
+                self._list(rowid, pn)
+                return
+            # unsaved entries in front of this one are persisted as well, like a full dump would
+            for i in range(len(self.rowids), index):
+                self.rowids.append(self._insert(responses[i]))
+            self.rowids.append(self._insert(response))
+
+    def extend(self, responses):
+        # one transaction for the whole batch; the sorted list is read again afterwards rather
+        # than shifted once per row
+        self.sorted_keys = self.sorted_numbers = None
+        with self.conn:
+            for i in range(len(self.rowids), len(responses)):
+                self.rowids.append(self._insert(responses[i]))
+
+    def delete(self, index, responses):
+        if index >= len(self.rowids):
+            # the entry was never persisted
+            return
+        with self.conn:
+            self._unlist(self.rowids[index])
+            self.conn.execute("DELETE FROM responses WHERE id = ?", (self.rowids[index],))
+        del self.rowids[index]
+
+    def saved_count(self, responses):
+        return len(self.rowids)
+
+    def find(self, participant_number, responses):
+        row = self.conn.execute(
+            "SELECT MIN(id) FROM responses WHERE participant_number = ?", (participant_number,)
+        ).fetchone()
+        if row[0] is not None:
+            return bisect.bisect_left(self.rowids, row[0])
+        for idx in range(len(self.rowids), len(responses)):
+            if responses[idx]["participant_number"] == participant_number:
+                return idx
+        return None
+
+    # the cached list itself when nothing is unsaved: callers must not change it
+    def sorted_participants(self, responses):
+        if self.sorted_keys is None:
+            rows = self.conn.execute(
+                "SELECT sort_group, sort_number, id, participant_number FROM responses "
+                "ORDER BY sort_group, sort_number, id"
+            ).fetchall()
+            self.sorted_keys = [row[:3] for row in rows]
+            self.sorted_numbers = [row[3] for row in rows]
+        stored = self.sorted_numbers
+        unsaved = sorted(
+            (resp["participant_number"] for resp in responses[len(self.rowids):]),
+            key=participant_sort_key
+        )
+        if not unsaved:
+            return stored
+        return list(heapq.merge(stored, unsaved, key=participant_sort_key))
+
+    def close(self):
+        self.conn.close()
+
+    def data_files(self):
+        return [self.db_path, f"{self.db_path}-wal"]
+
+    def _insert(self, response):
+        pn = response.get("participant_number", "")
+        sort_group, sort_number = self._sort_columns(pn)
+        cursor = self.conn.execute(
+            "INSERT INTO responses (participant_number, sort_group, sort_number, data) VALUES (?, ?, ?, ?)",
+            (pn, sort_group, sort_number, self._encode(response))
+        )
+        self._list(cursor.lastrowid, pn)
+        return cursor.lastrowid
+
+    # add a stored row to the cached sorted list (if it was read)
+    def _list(self, rowid, pn):
+        if self.sorted_keys is None:
+            return
+        key = (*self._sort_columns(pn), rowid)
+        position = bisect.bisect_left(self.sorted_keys, key)
+        self.sorted_keys.insert(position, key)
+        self.sorted_numbers.insert(position, pn)
+
+    # drop a stored row from the cached sorted list, its sort columns come from the primary key
+    def _unlist(self, rowid):
+        if self.sorted_keys is None:
+            return
+        sort_group, sort_number = self.conn.execute(
+            "SELECT sort_group, sort_number FROM responses WHERE id = ?", (rowid,)
+        ).fetchone()
+        position = bisect.bisect_left(self.sorted_keys, (sort_group, sort_number, rowid))
+        del self.sorted_keys[position]
+        del self.sorted_numbers[position]
+
+    def _mark_seeded(self):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('seeded', '1')")
+
+    @staticmethod
+    def _encode(response):
+        return json.dumps(encode_response(response), ensure_ascii=False, separators=(",", ":"))
+
+    @staticmethod
+    def _sort_columns(pn):
+        sort_group, sort_number = participant_sort_key(pn)
+        if sort_number == float('inf'):
+            sort_number = NO_NUMBER
+        return sort_group, sort_number
+
+
+# one json file per participant group in a directory next to the responses file
+#
+#   responses/a.json, responses/b.json, ...   responses of the group, in entry order
+#   responses/_.json                           ids without a letter or digit in front (e.g. unnamed)
+#   responses/v1/*.json                        shards as they were before an upgrade of the schema
+#
+# a save or delete rewrites only the shards of the groups it touches, and shards are read on
+# a thread pool so disk reads overlap on startup. on load the responses come back grouped
+# by shard, in entry order within each group.
+class ShardedStore(ResponseStore):
+    backend = "sharded"
+
+    def __init__(self, path=RESPONSES_FILENAME, shard_dir=None, load_workers=None):
+        self.path = path
+        self.shard_dir = shard_dir or os.path.join(os.path.dirname(os.path.abspath(path)), "responses")
+        self.load_workers = load_workers
+        # shard names of the persisted leading entries of the in-memory list
+        self.shards = []
+
+    def load(self):
+        responses = []
+        for chunk in self.load_chunks():
+            responses.extend(chunk)
+        return responses
+
+    # one chunk per shard, in shard order
+    def load_chunks(self):
+        self.hand_over()
+        if not os.path.isdir(self.shard_dir):
+            # first start in sharded mode: seed from the plain responses file
+            responses = JsonStore(self.path).load()
+            if responses:
+                self.save(responses)
+            yield responses
+            return
+        self.shards = []
+        for name, shard in self._iter_shards(self._shard_names()):
+            self.shards.extend([name] * len(shard))
+            yield shard
+
+    # read just the shards holding the given groups; does not change what the store tracks
+    def load_groups(self, groups):
+        self.hand_over()
+        if not os.path.isdir(self.shard_dir):
+            return super().load_groups(groups)
+        groups = set(groups)
+        wanted = {self._shard_name(group) for group in groups}
+        names = [name for name in self._shard_names() if name in wanted]
+        # several groups can share a shard file (e.g. "A" and "a"), so filter on the exact group
+        return [
+            resp for _, shard in self._iter_shards(names) for resp in shard
+            if participant_group(resp.get("participant_number", "")) in groups
+        ]
+
+    def save(self, responses):
+        os.makedirs(self.shard_dir, exist_ok=True)
+        stale = set(self._shard_names())
+        self.shards = [self._shard_name_of(resp) for resp in responses]
+        self._write_shards(set(self.shards) | stale, responses)
+
+    def put(self, index, response, responses):
+        affected = set()
+        # unsaved entries in front of this one are persisted as well, like a full dump would
+        for i in range(len(self.shards), index):
+            self.shards.append(self._shard_name_of(responses[i]))
+            affected.add(self.shards[i])
+        name = self._shard_name_of(response)
+        if index < len(self.shards):
+            # the participant id may have moved the response to another group
+            affected.add(self.shards[index])
+            self.shards[index] = name
+        else:
+            self.shards.append(name)
+        affected.add(name)
+        os.makedirs(self.shard_dir, exist_ok=True)
+        self._write_shards(affected, responses)
+
+    def extend(self, responses):
+        # every touched shard is written once for the whole batch
+        first = len(self.shards)
+        self.shards.extend(self._shard_name_of(resp) for resp in responses[first:])
+        os.makedirs(self.shard_dir, exist_ok=True)
+        self._write_shards(set(self.shards[first:]), responses)
+
+    def delete(self, index, responses):
+        if index >= len(self.shards):
+            # the entry was never persisted
+            return
+        name = self.shards.pop(index)
+        self._write_shards({name}, responses)
+
+    def saved_count(self, responses):
+        return len(self.shards)
+
+    def data_files(self):
+        if not os.path.isdir(self.shard_dir):
+            return []
+        return [self._shard_path(name) for name in self._shard_names()]
+
+    def _shard_names(self):
+        return sorted(
+            filename[:-len(".json")] for filename in os.listdir(self.shard_dir) if filename.endswith(".json")
+        )
+
+    def _shard_path(self, name):
+        return os.path.join(self.shard_dir, f"{name}.json")
+
+    # (name, responses) per shard as soon as it and the shards before it are read
+    def _iter_shards(self, names):
+        def read(name):
+            return read_responses_file(self._shard_path(name), backup_root=self.shard_dir)
+
+        with ThreadPoolExecutor(max_workers=self.load_workers) as pool:
+            yield from zip(names, pool.map(read, names))
+
+    # rewrite the given shards from the persisted part of the in-memory list
+    def _write_shards(self, names, responses):
+        for name in names:
+            shard = [responses[i] for i, shard_name in enumerate(self.shards) if shard_name == name]
+            if shard:
+                write_text_atomic(self._shard_path(name), encode_document(shard))
+            elif os.path.isfile(self._shard_path(name)):
+                os.remove(self._shard_path(name))
+
+    @classmethod
+    def _shard_name_of(cls, response):
+        return cls._shard_name(participant_group(response.get("participant_number", "")))
+
+    # file names are lower case so "A" and "a" do not clash on case-insensitive file systems
+    @staticmethod
+    def _shard_name(group):
+        if group.isascii() and group.isalnum():
+            return group.lower()
+        return "_"
+
+
+# pick the storage backend configured in "storage_settings"
+def make_store(config_data, path=RESPONSES_FILENAME):
+    storage_settings = (config_data or {}).get("storage_settings", {})
+    store = _open_backend(storage_settings.get("backend", "json"), path, storage_settings.get("compact_every", 500))
+    store.track_backend = True
+    return store
+
+
+def _open_backend(backend, path, compact_every=500):
+    if backend == "sqlite":
+        return SqliteStore(path)
+    if backend == "sharded":
+        return ShardedStore(path)
+    if backend == "journal":
+        return JournalStore(path, compact_every=compact_every)
+    return JsonStore(path)
@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+# the modules live at the repository root, run with `python -m pytest` from there
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+NUM_RATINGS = 4
+NUM_OPEN = 2
+
+
+@pytest.fixture
+def config_data():
+    return {
+        "rating_settings": {
+            "default_rating_range": [1, 5],
+            "questions": [{"statement": f"statement {i}", "is_negative": i == 2} for i in range(1, NUM_RATINGS + 1)],
+        },
+        "open_questions_settings": {"questions": [f"question {i}" for i in range(1, NUM_OPEN + 1)]},
+    }
+
+
+def make_response(participant_number, seed=0):
+    return {
+        "participant_number": participant_number,
+        "ratings": {f"rating_{i}": (seed + i) % 5 + 1 for i in range(1, NUM_RATINGS + 1)},
+        "open_answers": {f"open_{i}": f"answer {seed} {i}" for i in range(1, NUM_OPEN + 1)},
+    }
+
+
+@pytest.fixture
+def responses():
+    return [make_response(pn, seed) for seed, pn in enumerate(["a1", "b1", "a2", "c10", "b2", "a3"])]
@@ -0,0 +1,31 @@
+from autosave import draft_target
+from conftest import make_response
+from storage import make_store
+
+
+def open_store(backend, tmp_path):
+    return make_store({"storage_settings": {"backend": backend}}, str(tmp_path / "questionnaire_responses.json"))
+
+
+# a2 was added after b1, the sharded reload puts it in front of b1: the draft follows a2
+def test_draft_follows_its_participant_after_sharded_reload(tmp_path):
+    store = open_store("sharded", tmp_path)
+    store.load()
+    current = []
+    for pn in ["a1", "b1", "a2"]:
+        current.append(make_response(pn))
+        store.put(len(current) - 1, current[-1], current)
+    draft = {"stored_participant": "a2", "response": make_response("a2", seed=3)}
+    store.close()
+
+    reloaded = open_store("sharded", tmp_path).load()
+    index = draft_target(draft, store, reloaded)
+    assert reloaded[index]["participant_number"] == "a2"
+
+
+def test_draft_of_new_or_deleted_entry_has_no_target(tmp_path, responses):
+    store = open_store("json", tmp_path)
+    assert draft_target({"stored_participant": None, "response": {}}, store, responses) is None
+    assert draft_target({"stored_participant": "z1", "response": {}}, store, responses) is None
+    # drafts written before the participant was recorded
+    assert draft_target({"index": 2, "response": {}}, store, responses) is None
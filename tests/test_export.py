@@ -0,0 +1,49 @@
+import os
+import threading
+
+import pytest
+
+from conftest import NUM_OPEN, NUM_RATINGS, make_response
+from export import EXPORT_CHUNK_SIZE, ExportCancelled, export_file
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+COUNT = EXPORT_CHUNK_SIZE * 2 + 7
+
+
+@pytest.fixture
+def many_responses():
+    responses = [make_response(f"a{i}", seed=i) for i in range(COUNT)]
+    responses[5]["ratings"]["rating_2"] = ""
+    return responses
+
+
+# several record batches read back as one frame with the csv columns and nullable ratings
+@pytest.mark.parametrize("file_format", ["parquet", "feather"])
+def test_columnar_export(tmp_path, config_data, many_responses, file_format):
+    path = str(tmp_path / f"out.{file_format}")
+    export_file(path, many_responses, config_data)
+    df = getattr(pd, f"read_{file_format}")(path)
+    assert df.shape == (COUNT, 1 + NUM_RATINGS + NUM_OPEN)
+    assert df["Participant Number"].tolist() == [resp["participant_number"] for resp in many_responses]
+    assert str(df["Rating 2"].dtype) == "Int64"
+    assert df["Rating 2"].isna().tolist() == [i == 5 for i in range(COUNT)]
+    assert df["Open Answer 1"][7] == many_responses[7]["open_answers"]["open_1"]
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "feather"])
+def test_columnar_export_without_responses(tmp_path, config_data, file_format):
+    path = str(tmp_path / f"out.{file_format}")
+    export_file(path, [], config_data)
+    assert getattr(pd, f"read_{file_format}")(path).shape == (0, 1 + NUM_RATINGS + NUM_OPEN)
+
+
+# cancelling between batches leaves neither the file nor the partial one
+@pytest.mark.parametrize("file_format", ["parquet", "feather"])
+def test_columnar_export_cancel(tmp_path, config_data, many_responses, file_format):
+    path = str(tmp_path / f"out.{file_format}")
+    cancel = threading.Event()
+    with pytest.raises(ExportCancelled):
+        export_file(path, many_responses, config_data, progress=lambda done, total: cancel.set(), cancel=cancel)
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,30 @@
+from keywords import count_keywords
+
+
+def answers(*texts):
+    return [
+        {"participant_number": f"a{i}", "ratings": {}, "open_answers": {"open_1": text}}
+        for i, text in enumerate(texts, start=1)
+    ]
+
+
+def config(keywords, case_sensitive=False):
+    return {
+        "open_questions_settings": {"questions": ["what did you use?"]},
+        "keyword_settings": {"keywords": keywords, "case_sensitive": case_sensitive},
+    }
+
+
+# terms starting or ending with a non-word character match as whole words too
+def test_terms_with_punctuation():
+    responses = answers("C++ and .NET, some c#", "c++11 is not c++", "dotnet.net")
+    counts = count_keywords(responses, config({"c++": [], ".net": [], "c#": []}))
+    assert counts.totals().tolist() == [2, 1, 1]
+
+
+def test_whole_words_and_synonyms():
+    responses = answers("Easy and simple", "uneasy, easygoing", "not so easy")
+    counts = count_keywords(responses, config({"easy": ["simple"]}))
+    assert counts.totals().tolist() == [3]
+    counts = count_keywords(responses, config(["easy"], case_sensitive=True))
+    assert counts.totals().tolist() == [1]
@@ -0,0 +1,65 @@
+import json
+import os
+
+import pytest
+
+from conftest import make_response
+from merge import iter_responses, merge_files, read_response
+from schema import encode_document
+from storage import JsonStore
+
+
+def write_station(path, responses):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(encode_document(responses))
+
+
+# byte ranges point at the element even with multi-byte text and elements cut at chunk ends
+@pytest.mark.parametrize("chunk_size", [5, 1 << 16])
+def test_offsets_read_back_each_response(tmp_path, responses, chunk_size):
+    responses[2]["open_answers"]["open_1"] = "größer als erwartet, été \U0001f600"
+    path = str(tmp_path / "station.json")
+    write_station(path, responses)
+    found = list(iter_responses(path, chunk_size=chunk_size, offsets=True))
+    assert [resp for resp, _, _ in found] == responses
+    with open(path, "rb") as f:
+        assert [read_response(f, offset, length) for _, offset, length in found] == responses
+
+
+def test_merge_with_state(tmp_path, responses):
+    station1 = str(tmp_path / "station1.json")
+    station2 = str(tmp_path / "station2.json")
+    out = str(tmp_path / "merged.json")
+    state = str(tmp_path / "merge_state.json")
+    write_station(station1, responses[:4])
+    write_station(station2, responses[2:] + [make_response("a1", seed=9)])
+
+    report = merge_files([station1, station2], out, state, on_conflict="first")
+    assert report["files_parsed"] == 2
+    assert report["duplicates"] == 2
+    assert list(report["conflicts"]) == ["a1"]
+    assert JsonStore(out).load() == sorted(responses, key=lambda resp: (resp["participant_number"][0], int(resp["participant_number"][1:])))
+    # the state refers to the records, it does not hold them
+    with open(state) as f:
+        assert "answer" not in f.read()
+
+    write_station(station2, [make_response("d1")])
+    report = merge_files([station1, station2], out, state)
+    assert (report["files_parsed"], report["files_unchanged"]) == (1, 1)
+    assert [resp["participant_number"] for resp in JsonStore(out).load()] == ["a1", "a2", "b1", "c10", "d1"]
+
+
+def test_state_of_another_format_is_ignored(tmp_path, responses):
+    station = str(tmp_path / "station.json")
+    state = str(tmp_path / "merge_state.json")
+    write_station(station, responses)
+    stat = os.stat(station)
+    # written before the state kept byte ranges: same size and mtime, but [participant, hash] entries
+    entries = [[resp["participant_number"], "0" * 64] for resp in responses]
+    with open(state, "w") as f:
+        json.dump({"files": {os.path.abspath(station): {
+            "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "records": entries
+        }}, "records": {}}, f)
+    report = merge_files([station], str(tmp_path / "merged.json"), state)
+    assert report["files_parsed"] == 1
+    assert report["participants"] == len(responses)
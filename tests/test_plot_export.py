@@ -0,0 +1,18 @@
+from conftest import make_response
+from plot_export import _group_names, plot_specs
+from ratings import RatingMatrix
+
+
+def test_group_names_differ_case_insensitively():
+    names = _group_names(["a", "A", "b", "!", "?"])
+    assert names == {"!": "_", "?": "__2", "A": "A", "a": "a_2", "b": "b"}
+    assert len({name.lower() for name in names.values()}) == len(names)
+
+
+# every plot of the export writes its own file, also with groups "A" and "a"
+def test_plot_names_unique(config_data):
+    responses = [make_response(pn) for pn in ["a1", "A1", "b1", "a2"]]
+    matrix = RatingMatrix.from_responses(responses, config_data)
+    names = [spec[0].lower() for spec in plot_specs(matrix, "viridis")]
+    assert len(set(names)) == len(names)
+    assert {"heatmap_group_a", "heatmap_group_a_2"} <= set(names)
@@ -0,0 +1,112 @@
+import json
+import os
+
+import pytest
+
+from conftest import make_response
+from merge import iter_responses, response_hash
+from schema import SCHEMA_VERSION, decode_document, decode_response, encode_document, encode_response
+from storage import JsonStore, ShardedStore, SqliteStore, StoreLoadError
+
+
+def write_v1(path, responses):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(responses, f, indent=4)
+
+
+def test_plain_response_is_positional():
+    response = make_response("a1")
+    row = encode_response(response)
+    assert row == ["a1", list(response["ratings"].values()), list(response["open_answers"].values())]
+    assert decode_response(row) == response
+
+
+# keys that do not fit the positional row come back through the extra dict
+@pytest.mark.parametrize("response", [
+    {"participant_number": "a1", "ratings": {"rating_1": 3, "rating_3": 5}, "open_answers": {}},
+    {"participant_number": "a1", "ratings": {"rating_1": "", "mood": 2}, "open_answers": {"open_1": "x"}},
+    {"participant_number": "b2", "ratings": {}, "open_answers": {"open_2": "y"}, "note": "late"},
+])
+def test_irregular_responses_round_trip(response):
+    row = encode_response(response)
+    assert len(row) == 4
+    assert decode_response(json.loads(json.dumps(row))) == response
+
+
+def test_decode_document_versions(responses):
+    assert decode_document(responses) == (responses, 1)
+    assert decode_document(json.loads(encode_document(responses))) == (responses, SCHEMA_VERSION)
+    with pytest.raises(ValueError):
+        decode_document([{"schema": SCHEMA_VERSION + 1}])
+
+
+def test_json_store_upgrades_v1_file(tmp_path, responses):
+    path = str(tmp_path / "questionnaire_responses.json")
+    write_v1(path, responses)
+    with open(path, "rb") as f:
+        original = f.read()
+
+    assert JsonStore(path).load() == responses
+    with open(tmp_path / "questionnaire_responses.v1.json", "rb") as f:
+        assert f.read() == original
+    with open(path, "r", encoding="utf-8") as f:
+        assert json.load(f)[0] == {"schema": SCHEMA_VERSION}
+    assert not os.path.exists(f"{path}.tmp")
+    # a second start reads the upgraded file and leaves the backup alone
+    assert JsonStore(path).load() == responses
+
+
+def test_unreadable_file_is_not_upgraded(tmp_path):
+    path = str(tmp_path / "questionnaire_responses.json")
+    with open(path, "w") as f:
+        f.write("[{")
+    with pytest.raises(StoreLoadError):
+        JsonStore(path).load()
+    assert os.listdir(tmp_path) == ["questionnaire_responses.json"]
+
+
+# shard backups go to a subdirectory, where they are not read as shards
+def test_sharded_store_upgrades_v1_shards(tmp_path, responses):
+    shard_dir = tmp_path / "responses"
+    shard_dir.mkdir()
+    a_group = [resp for resp in responses if resp["participant_number"].startswith("a")]
+    write_v1(str(shard_dir / "a.json"), a_group)
+    path = str(tmp_path / "questionnaire_responses.json")
+
+    assert ShardedStore(path).load() == a_group
+    assert sorted(os.listdir(shard_dir)) == ["a.json", "v1"]
+    assert os.listdir(shard_dir / "v1") == ["a.json"]
+    assert ShardedStore(path).load() == a_group
+
+
+def test_sqlite_upgrades_legacy_rows(tmp_path, responses):
+    path = str(tmp_path / "questionnaire_responses.json")
+    store = SqliteStore(path)
+    store.load()
+    with store.conn:
+        store.conn.execute(
+            "INSERT INTO responses (participant_number, sort_group, sort_number, data) VALUES (?, ?, ?, ?)",
+            ("a1", "a", 1, json.dumps(responses[0]))
+        )
+    store.close()
+
+    assert SqliteStore(path).load() == responses[:1]
+    store = SqliteStore(path)
+    (data,), = store.conn.execute("SELECT data FROM responses").fetchall()
+    assert json.loads(data) == encode_response(responses[0])
+    store.close()
+
+
+# merge hashes the decoded dicts, so a v1 and a v2 copy of a record are duplicates
+@pytest.mark.parametrize("chunk_size", [7, 1 << 16])
+def test_merge_reads_both_versions_alike(tmp_path, responses, chunk_size):
+    v1_path = str(tmp_path / "v1.json")
+    v2_path = str(tmp_path / "v2.json")
+    write_v1(v1_path, responses)
+    with open(v2_path, "w", encoding="utf-8") as f:
+        f.write(encode_document(responses))
+
+    v1 = list(iter_responses(v1_path, chunk_size=chunk_size))
+    v2 = list(iter_responses(v2_path, chunk_size=chunk_size))
+    assert v1 == v2 == responses
+    assert [response_hash(resp) for resp in v1] == [response_hash(resp) for resp in v2]
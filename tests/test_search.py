@@ -0,0 +1,26 @@
+from search import AnswerIndex
+
+OPEN_KEYS = ["open_1", "open_2"]
+
+
+def answer(pn, text):
+    return {"participant_number": pn, "ratings": {}, "open_answers": {"open_1": text, "open_2": ""}}
+
+
+def test_total_counts_every_match_beyond_limit():
+    responses = [answer(f"a{i}", "coffee was cold") for i in range(80)]
+    index = AnswerIndex.from_responses(responses, OPEN_KEYS)
+    hits, total = index.search("coffee", limit=50)
+    assert len(hits) == 50
+    assert total == 80
+    assert index.search("tea") == ([], 0)
+
+
+def test_hits_follow_deletes():
+    responses = [answer("a1", "tea"), answer("a2", "coffee"), answer("a3", "more coffee")]
+    index = AnswerIndex.from_responses(responses, OPEN_KEYS)
+    del responses[0]
+    index.delete(0)
+    hits, total = index.search("coffee")
+    assert total == 2
+    assert sorted(responses[i]["participant_number"] for i, _, _ in hits) == ["a2", "a3"]
@@ -0,0 +1,226 @@
+import os
+
+import pytest
+
+from conftest import make_response
+from storage import JournalStore, JsonStore, ShardedStore, SqliteStore, StoreLoadError, make_store, participant_group
+
+BACKENDS = ["json", "journal", "sqlite"]
+
+
+def open_store(backend, tmp_path, **settings):
+    return make_store({"storage_settings": dict(settings, backend=backend)}, str(tmp_path / "questionnaire_responses.json"))
+
+
+# save, edit and delete through one store, then check a fresh store reads the same list back
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_round_trip(backend, tmp_path, responses):
+    store = open_store(backend, tmp_path)
+    assert store.load() == []
+    current = []
+    for response in responses:
+        current.append(response)
+        store.put(len(current) - 1, response, current)
+    current[1] = make_response("b1", seed=42)
+    store.put(1, current[1], current)
+    del current[2]
+    store.delete(2, current)
+    store.extend(current + [make_response("d1")])
+    current.append(make_response("d1"))
+    store.close()
+
+    reopened = open_store(backend, tmp_path)
+    assert reopened.load() == current
+    reopened.close()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_save_replaces_everything(backend, tmp_path, responses):
+    store = open_store(backend, tmp_path)
+    store.load()
+    store.save(responses)
+    store.save(responses[:2])
+    store.close()
+    assert open_store(backend, tmp_path).load() == responses[:2]
+
+
+def test_journal_compaction_keeps_data(tmp_path, responses):
+    store = open_store("journal", tmp_path, compact_every=2)
+    current = []
+    store.load()
+    for response in responses * 3:
+        response = dict(response, participant_number=f"{response['participant_number']}{len(current)}")
+        current.append(response)
+        store.put(len(current) - 1, response, current)
+    store.close()
+    assert open_store("journal", tmp_path).load() == current
+
+
+# the first journal start snapshots the json data, so the log no longer depends on that file
+def test_journal_seed_does_not_depend_on_json_file(tmp_path, responses):
+    path = str(tmp_path / "questionnaire_responses.json")
+    JsonStore(path).save(responses)
+    store = JournalStore(path)
+    current = store.load()
+    assert current == responses
+    current[0] = make_response("z9")
+    store.put(0, current[0], current)
+    store.close()
+
+    os.rename(path, str(tmp_path / "moved.json"))
+    assert JournalStore(path).load() == current
+
+
+def test_sqlite_seeds_from_json_once(tmp_path, responses):
+    path = str(tmp_path / "questionnaire_responses.json")
+    JsonStore(path).save(responses)
+    store = SqliteStore(path)
+    current = store.load()
+    assert current == responses
+    while current:
+        current.pop()
+        store.delete(len(current), current)
+    store.close()
+    # everyone was deleted: the json file must not come back
+    assert SqliteStore(path).load() == []
+
+
+def by_shard(responses):
+    return sorted(responses, key=lambda resp: participant_group(resp["participant_number"]).lower())
+
+
+# the sharded store reads back grouped by shard, in entry order within each group
+def test_sharded_round_trip(tmp_path, responses):
+    store = open_store("sharded", tmp_path)
+    assert store.load() == []
+    current = []
+    for response in responses:
+        current.append(response)
+        store.put(len(current) - 1, response, current)
+    # a new id moves the entry to another shard
+    current[1] = make_response("c2", seed=42)
+    store.put(1, current[1], current)
+    del current[0]
+    store.delete(0, current)
+    store.close()
+
+    reopened = open_store("sharded", tmp_path)
+    assert reopened.load() == by_shard(current)
+    assert sorted(os.listdir(tmp_path / "responses")) == ["a.json", "b.json", "c.json"]
+
+
+def test_sharded_seeds_from_json_file(tmp_path, responses):
+    path = str(tmp_path / "questionnaire_responses.json")
+    JsonStore(path).save(responses)
+    assert ShardedStore(path).load() == responses
+    os.remove(path)
+    assert ShardedStore(path).load() == by_shard(responses)
+
+
+def test_sharded_load_groups(tmp_path, responses):
+    responses.append(make_response("A7"))
+    store = open_store("sharded", tmp_path)
+    store.save(responses)
+    # "A" and "a" share a shard file but are separate groups
+    assert store.load_groups(["a"]) == [resp for resp in responses if resp["participant_number"].startswith("a")]
+    assert store.load_groups(["A", "c"]) == [make_response("A7"), responses[3]]
+    assert store.load_groups(["z"]) == []
+
+
+# switching backend moves the data along, in both directions, so no save is left behind
+@pytest.mark.parametrize("backend", ["journal", "sqlite", "sharded"])
+def test_switching_backend_and_back(backend, tmp_path, responses):
+    store = open_store("json", tmp_path)
+    store.load()
+    store.save(responses[:3])
+
+    store = open_store(backend, tmp_path)
+    current = store.load()
+    assert by_shard(current) == by_shard(responses[:3])
+    current.append(responses[3])
+    store.put(3, responses[3], current)
+    store.close()
+
+    store = open_store("json", tmp_path)
+    current = store.load()
+    assert by_shard(current) == by_shard(responses[:4])
+    current.append(responses[4])
+    store.put(4, responses[4], current)
+
+    store = open_store(backend, tmp_path)
+    assert by_shard(store.load()) == by_shard(responses[:5])
+    store.close()
+
+
+def test_unreadable_previous_backend_is_retried(tmp_path, responses):
+    store = open_store("journal", tmp_path)
+    store.load()
+    store.save(responses)
+    store.close()
+    snapshot = tmp_path / "questionnaire_responses.snapshot.json"
+    snapshot.write_text("[{")
+
+    with pytest.raises(StoreLoadError):
+        open_store("json", tmp_path).load()
+    snapshot.unlink()
+    JournalStore(str(tmp_path / "questionnaire_responses.json")).save(responses)
+    assert open_store("json", tmp_path).load() == responses
+
+
+# records of a fold cut short by a crash survive the next start and the compactions after it
+def test_journal_finishes_interrupted_fold(tmp_path, responses):
+    path = str(tmp_path / "questionnaire_responses.json")
+    store = JournalStore(path)
+    current = store.load()
+    for response in responses[:4]:
+        current.append(response)
+        store.put(len(current) - 1, response, current)
+    # the crash: the log was moved aside, the snapshot never written
+    os.replace(store.log_path, store.compacting_path)
+
+    store = JournalStore(path, compact_every=1)
+    current = store.load()
+    assert current == responses[:4]
+    assert not os.path.exists(store.compacting_path)
+    current.append(responses[4])
+    store.put(4, responses[4], current)
+    store.close()
+    assert JournalStore(path).load() == responses[:5]
+
+
+def test_journal_failed_fold_keeps_records(tmp_path, responses, monkeypatch):
+    path = str(tmp_path / "questionnaire_responses.json")
+    store = JournalStore(path)
+    current = store.load()
+    current.append(responses[0])
+    store.put(0, responses[0], current)
+    # a fold that failed in this session leaves its log behind
+    os.replace(store.log_path, store.compacting_path)
+    current.append(responses[1])
+    store.put(1, responses[1], current)
+    # the next compaction moves the log, then the app crashes before the snapshot is written
+    monkeypatch.setattr(store, "_fold", lambda *args: None)
+    store.compact(current)
+    store.close()
+    assert JournalStore(path).load() == responses[:2]
+
+
+# the cached sorted list follows every kind of write like a fresh query does
+def test_sqlite_sorted_participants_cache(tmp_path, responses):
+    store = open_store("sqlite", tmp_path)
+    current = store.load()
+    current.extend(responses)
+    store.extend(current)
+    assert store.sorted_participants(current) == ["a1", "a2", "a3", "b1", "b2", "c10"]
+    current[0] = make_response("c2")
+    store.put(0, current[0], current)
+    del current[1]
+    store.delete(1, current)
+    current.append(make_response("a10"))
+    store.put(len(current) - 1, current[-1], current)
+    current.append(make_response("b3"))
+    expected = ["a2", "a3", "a10", "b2", "b3", "c2", "c10"]
+    assert store.sorted_participants(current) == expected
+    store.sorted_keys = None
+    assert store.sorted_participants(current) == expected
+    store.close()